@@ -0,0 +1,90 @@
+import math
+import numpy as np
+from bit_conversion import as_bit_array, as_byte_array
+from seeding import generator
+
+MODULATIONS = {"BPSK": 1, "QPSK": 2}  # Liczba bitów na symbol
+
+
+class AWGNChannel:
+    """Kanał z addytywnym szumem gaussowskim (AWGN) i modulacją BPSK albo QPSK (mapowanie Graya).
+
+    Bit 0 jest nadawany jako +1, bit 1 jako -1 (w QPSK osobno na składowej I i Q), więc energia na bit
+    kodowy wynosi 1, a na bit informacyjny 1 / code_rate. Odbiornik zwraca twarde decyzje albo
+    logarytmiczne ilorazy wiarygodności (LLR) kolejnych bitów: LLR > 0 oznacza bit 0, a |LLR| - pewność decyzji.
+    """
+
+    def __init__(self, ebn0_db, modulation="BPSK", code_rate=1.0, seed=None):
+        if modulation not in MODULATIONS:
+            raise ValueError(f"Nieznana modulacja: {modulation}")
+        if not 0 < code_rate <= 1:
+            raise ValueError("Sprawność kodu musi być z zakresu (0, 1]")
+        self.ebn0_db = ebn0_db  # Stosunek energii bitu informacyjnego do gęstości widmowej szumu [dB]
+        self.modulation = modulation
+        self.code_rate = code_rate  # Sprawność kodowania (bity informacyjne na bit kodowy)
+        # Wariancja szumu w każdej składowej: N0 / 2 przy energii bitu kodowego równej 1
+        self.noise_variance = 1 / (2 * code_rate * 10 ** (ebn0_db / 10))
+        self.rng = generator(seed, "channel")
+
+    def bit_error_probability(self):
+        """Teoretyczna stopa błędów bitu twardych decyzji: Q(sqrt(2 Ec / N0)), taka sama dla BPSK i QPSK."""
+        return 0.5 * math.erfc(math.sqrt(1 / (2 * self.noise_variance)))
+
+    def _receive(self, bits):
+        """Modulacja, szum i demodulacja; zwraca wartości odebrane dla kolejnych bitów (float32)."""
+        bits = as_bit_array(bits).reshape(-1)
+        symbols = 1 - 2 * bits.astype(np.float32)
+        if self.modulation == "QPSK":
+            # Pary bitów na składowych I i Q jednego symbolu zespolonego; nieparzysty bit dopełniany zerem
+            padded = np.append(symbols, np.float32(1)) if len(symbols) % 2 else symbols
+            iq = padded[0::2] + 1j * padded[1::2]
+            noise = self.rng.standard_normal((len(iq), 2), dtype=np.float32) @ np.array([1, 1j], dtype=np.complex64)
+            received = (iq + np.sqrt(self.noise_variance) * noise).astype(np.complex64)
+            samples = np.empty(len(padded), dtype=np.float32)
+            samples[0::2] = received.real
+            samples[1::2] = received.imag
+            return samples[:len(symbols)]
+        noise = self.rng.standard_normal(len(symbols), dtype=np.float32)
+        return symbols + np.float32(np.sqrt(self.noise_variance)) * noise
+
+    def transmit_bits_llr(self, bit_data):
+        """LLR kolejnych bitów po transmisji: 2y / sigma^2."""
+        return self._receive(bit_data) * np.float32(2 / self.noise_variance)
+
+    def transmit_bits(self, bit_data):
+        """Przesyłanie danych bitowych przez kanał (twarde decyzje)."""
+        return (self._receive(bit_data) < 0).astype(np.uint8)
+
+    def transmit_soft(self, data):
+        """Przesyłanie bajtów; zwraca bajty po twardych decyzjach oraz LLR bitów (tablica liczba bajtów x 8)."""
+        llrs = self.transmit_bits_llr(np.unpackbits(as_byte_array(data))).reshape(-1, 8)
+        return np.packbits(llrs < 0, axis=-1).reshape(-1).tobytes(), llrs
+
+    def transmit_reliability(self, data):
+        """Przesyłanie bajtów; zwraca bajty po twardych decyzjach oraz wiarygodność każdego z nich."""
+        transmitted_data, llrs = self.transmit_soft(data)
+        return transmitted_data, byte_reliability(llrs)
+
+    def transmit(self, data):
+        return np.packbits(self.transmit_bits(np.unpackbits(as_byte_array(data)))).tobytes()
+
+    def transmit_batch_soft(self, frames):
+        """Przesyłanie wielu ramek naraz; zwraca tablicę o kształcie frames i LLR o kształcie frames x 8."""
+        frames = np.asarray(frames, dtype=np.uint8)
+        llrs = self.transmit_bits_llr(np.unpackbits(frames)).reshape(frames.shape + (8,))
+        return np.packbits(llrs < 0, axis=-1).reshape(frames.shape), llrs
+
+    def transmit_batch_reliability(self, frames):
+        """Przesyłanie wielu ramek naraz; zwraca tablicę o kształcie frames i wiarygodność jej bajtów."""
+        transmitted_frames, llrs = self.transmit_batch_soft(frames)
+        return transmitted_frames, byte_reliability(llrs)
+
+    def transmit_batch(self, frames):
+        """Przesyłanie wielu ramek naraz; zwraca tablicę o kształcie frames."""
+        frames = np.asarray(frames, dtype=np.uint8)
+        return np.packbits(self.transmit_bits(np.unpackbits(frames)).reshape(-1, 8), axis=-1).reshape(frames.shape)
+
+
+def byte_reliability(llrs):
+    """Wiarygodność bajtów: najmniejsze |LLR| spośród ich 8 bitów (ostatnia oś tablicy LLR)."""
+    return np.abs(llrs).min(axis=-1)
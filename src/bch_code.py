@@ -0,0 +1,293 @@
+from functools import lru_cache
+import numpy as np
+from error_correction_code import ErrorCorrectionCode
+
+# Wielomiany pierwotne GF(2^m) według stopnia m
+PRIMITIVE_POLYS = {
+    3: 0x0B, 4: 0x13, 5: 0x25, 6: 0x43, 7: 0x89, 8: 0x11D, 9: 0x211, 10: 0x409, 11: 0x805, 12: 0x1053,
+    13: 0x201B, 14: 0x4443, 15: 0x8003, 16: 0x1100B,
+}
+
+
+@lru_cache(maxsize=None)
+def _gf_tables(m):
+    """Tablice antylogarytmów i logarytmów GF(2^m) (log[0] nieużywany)."""
+    order = (1 << m) - 1
+    gf_exp = np.zeros(order, dtype=np.int64)
+    gf_log = np.zeros(order + 1, dtype=np.int64)
+    x = 1
+    for i in range(order):
+        gf_exp[i] = x
+        gf_log[x] = i
+        x <<= 1
+        if x >> m:
+            x ^= PRIMITIVE_POLYS[m]
+    gf_exp.flags.writeable = False
+    gf_log.flags.writeable = False
+    return gf_exp, gf_log
+
+
+def _gf_mul(a, b, gf_exp, gf_log):
+    """Iloczyn elementów GF(2^m) dla całych tablic."""
+    product = gf_exp[(gf_log[a] + gf_log[b]) % len(gf_exp)]
+    return np.where((a != 0) & (b != 0), product, 0)
+
+
+def _gf_div(a, b, gf_exp, gf_log):
+    """Iloraz a / b dla całych tablic (b niezerowe)."""
+    return np.where(a != 0, gf_exp[(gf_log[a] - gf_log[b]) % len(gf_exp)], 0)
+
+
+def _poly_bits(value, length):
+    """Współczynniki wielomianu binarnego (liczba całkowita) od najwyższej potęgi, jako wektor length bitów."""
+    return [(value >> (length - 1 - i)) & 1 for i in range(length)]
+
+
+def _binary_poly_mul(p, q):
+    result = 0
+    while q:
+        if q & 1:
+            result ^= p
+        p <<= 1
+        q >>= 1
+    return result
+
+
+def _minimal_poly(power, m):
+    """Wielomian minimalny elementu alfa^power nad GF(2) jako liczba całkowita (bit i - współczynnik x^i)."""
+    gf_exp, gf_log = _gf_tables(m)
+    order = len(gf_exp)
+    coset = []
+    element = power % order
+    while element not in coset:
+        coset.append(element)
+        element = element * 2 % order
+    poly = [1]  # Współczynniki w GF(2^m) od najniższej potęgi
+    for exponent in coset:
+        root = int(gf_exp[exponent])
+        shifted = [0] + poly
+        for i, coef in enumerate(poly):
+            shifted[i] ^= int(_gf_mul(np.int64(coef), np.int64(root), gf_exp, gf_log))
+        poly = shifted
+    return sum(int(coef) << i for i, coef in enumerate(poly)), coset
+
+
+@lru_cache(maxsize=None)
+def _bch_tables(message_bits, parity_bits):
+    """Parametry skróconego kodu BCH dla wiadomości message_bits bitów i co najwyżej parity_bits bitów korekcyjnych.
+
+    Wybierane jest najmniejsze ciało GF(2^m), w którym mieści się słowo kodowe, i największa zdolność
+    korekcyjna t, dla której wielomian generujący ma stopień nie większy niż parity_bits.
+    Zwraca (m, t, stopień generatora, macierz bitów korekcyjnych, macierz syndromów nieparzystych).
+    """
+    m = next((m for m in PRIMITIVE_POLYS if message_bits + parity_bits <= (1 << m) - 1), None)
+    if m is None:
+        raise ValueError(f"Ramka ({message_bits} bitów) jest zbyt długa dla kodu BCH")
+    order = (1 << m) - 1
+    generator, t, covered = 1, 0, set()
+    while 2 * (t + 1) < order:
+        candidate, coset = generator, ()
+        if (2 * t + 1) % order not in covered:
+            minimal, coset = _minimal_poly(2 * t + 1, m)
+            candidate = _binary_poly_mul(generator, minimal)
+        if candidate.bit_length() - 1 > parity_bits:
+            break
+        generator = candidate
+        covered.update(coset)
+        t += 1
+    if t == 0:
+        raise ValueError(f"{parity_bits} bitów korekcyjnych nie wystarcza dla kodu BCH w GF(2^{m})")
+    degree = generator.bit_length() - 1
+    length = message_bits + degree
+
+    # Bity korekcyjne bitu wiadomości i: reszta z dzielenia x^(degree + message_bits - 1 - i) przez generator
+    parity_matrix = np.zeros((message_bits, degree), dtype=np.float32)
+    remainder = generator ^ (1 << degree)  # x^degree mod g(x)
+    for i in range(message_bits - 1, -1, -1):
+        parity_matrix[i] = _poly_bits(remainder, degree)
+        remainder <<= 1
+        if remainder >> degree:
+            remainder ^= generator
+
+    # Syndrom S_j = r(alfa^j) dla nieparzystych j: bit na pozycji i (potęga length - 1 - i) wnosi alfa^(j * potęga)
+    gf_exp, _ = _gf_tables(m)
+    powers = np.arange(length - 1, -1, -1)[:, None] * np.arange(1, 2 * t, 2)[None, :]
+    elements = gf_exp[powers % order]
+    syndrome_matrix = ((elements[..., None] >> np.arange(m)) & 1).reshape(length, t * m).astype(np.float32)
+
+    parity_matrix.flags.writeable = False
+    syndrome_matrix.flags.writeable = False
+    return m, t, degree, parity_matrix, syndrome_matrix
+
+
+def _berlekamp_massey(syndromes, gf_exp, gf_log):
+    """Algorytm Berlekampa-Masseya dla wielu słów naraz; zwraca wielomiany lokalizatora i ich stopnie."""
+    count, steps = syndromes.shape
+    locator = np.zeros((count, steps + 2), dtype=np.int64)
+    locator[:, 0] = 1
+    previous = locator.copy()
+    degree = np.zeros(count, dtype=np.int64)
+    previous_discrepancy = np.ones(count, dtype=np.int64)
+    for step in range(steps):
+        previous = np.hstack((np.zeros((count, 1), dtype=np.int64), previous[:, :-1]))  # x * B(x)
+        discrepancy = syndromes[:, step].copy()
+        if step:
+            terms = _gf_mul(locator[:, 1:step + 1], syndromes[:, step - 1::-1], gf_exp, gf_log)
+            discrepancy ^= np.bitwise_xor.reduce(terms, axis=1)
+        scale = _gf_div(discrepancy, previous_discrepancy, gf_exp, gf_log)
+        updated = locator ^ _gf_mul(scale[:, None], previous, gf_exp, gf_log)
+        grow = (discrepancy != 0) & (2 * degree <= step)
+        previous = np.where(grow[:, None], locator, previous)
+        previous_discrepancy = np.where(grow, discrepancy, previous_discrepancy)
+        degree = np.where(grow, step + 1 - degree, degree)
+        locator = updated
+    return locator, degree
+
+
+def _pack_parity(bits, symbols):
+    padded = np.zeros((bits.shape[0], symbols * 8), dtype=np.uint8)
+    padded[:, :bits.shape[1]] = bits
+    return np.packbits(padded, axis=-1)
+
+
+class BCHCode(ErrorCorrectionCode):
+    """Binarny kod BCH obejmujący całą ramkę; poprawia do t dowolnie rozmieszczonych błędnych bitów.
+
+    Przy symbols bajtach korekcyjnych t wynosi około 8 * symbols / m, gdzie GF(2^m) mieści słowo kodowe
+    (dla ramki 68 bajtów i 10 bajtów korekcyjnych: m = 10, t = 8). Przy pojedynczych przekłamaniach bitów
+    poprawia więcej błędów niż RS o tej samej liczbie bajtów korekcyjnych, przy paczkach błędów - mniej.
+    Syndromy i kodowanie to mnożenie macierzy bitów, a dekodowanie (Berlekamp-Massey, Chien) działa na całym wsadzie.
+    """
+
+    def _tables(self, frame_length):
+        return _bch_tables(frame_length * 8, self.symbols * 8)
+
+    def check_frame_length(self, frame_length):
+        self._tables(frame_length)
+
+    def encode_batch(self, frames):
+        frames = np.atleast_2d(np.asarray(frames, dtype=np.uint8))
+        _, _, _, parity_matrix, _ = self._tables(frames.shape[1])
+        parity_bits = (np.unpackbits(frames, axis=1).astype(np.float32) @ parity_matrix).astype(np.int64) & 1
+        return _pack_parity(parity_bits.astype(np.uint8), self.symbols)
+
+    def decode_batch(self, codewords, erase_pos=None):
+        self._check_erasures(erase_pos)
+        codewords = np.atleast_2d(np.asarray(codewords, dtype=np.uint8))
+        frame_length = codewords.shape[1] - self.symbols
+        m, t, degree, _, syndrome_matrix = self._tables(frame_length)
+        gf_exp, gf_log = _gf_tables(m)
+        order = len(gf_exp)
+        message_bits = frame_length * 8
+        bits = np.unpackbits(codewords, axis=1)[:, :message_bits + degree]
+        valid = np.ones(len(bits), dtype=bool)
+
+        odd = (bits.astype(np.float32) @ syndrome_matrix).astype(np.int64) & 1
+        odd = odd.reshape(len(bits), t, m) @ (1 << np.arange(m))
+        erroneous = np.flatnonzero(odd.any(axis=1))
+        if len(erroneous):
+            # Syndromy S_1..S_2t; dla kodu binarnego S_2j = S_j^2
+            syndromes = np.zeros((len(erroneous), 2 * t), dtype=np.int64)
+            for j in range(1, 2 * t + 1):
+                if j % 2:
+                    syndromes[:, j - 1] = odd[erroneous, j // 2]
+                else:
+                    half = syndromes[:, j // 2 - 1]
+                    syndromes[:, j - 1] = _gf_mul(half, half, gf_exp, gf_log)
+            locator, errors = _berlekamp_massey(syndromes, gf_exp, gf_log)
+
+            # Przeszukiwanie Chiena: błąd w potędze p, gdy lokalizator ma pierwiastek alfa^(-p)
+            length = bits.shape[1]
+            powers = np.arange(length)
+            values = np.ones((len(erroneous), length), dtype=np.int64)
+            for k in range(1, t + 1):
+                coef = locator[:, k:k + 1]
+                term = gf_exp[(gf_log[coef] - k * powers[None, :]) % order]
+                values ^= np.where(coef != 0, term, 0)
+            roots = values == 0
+            decoded = (errors <= t) & (roots.sum(axis=1) == errors)
+            bits[erroneous[decoded]] ^= roots[decoded, ::-1].astype(np.uint8)
+            valid[erroneous[~decoded]] = False
+        return np.packbits(bits[:, :message_bits], axis=1), valid
+
+
+@lru_cache(maxsize=None)
+def _hamming_tables(message_bits, parity_bits):
+    """Podział wiadomości na bloki kodu Hamminga mieszczące się w parity_bits bitach korekcyjnych.
+
+    Wybierana jest największa liczba bloków (każdy poprawia jeden bit); bit i wiadomości trafia do bloku
+    i mod liczba bloków, więc sąsiednie bity (np. w jednym bajcie) należą do różnych bloków.
+    Zwraca (m, liczba bloków, długość bloku, macierz kolumn bitów danych, tablica syndromów, maska dopełnienia).
+    """
+    best = None
+    for m in range(3, 17):
+        blocks = min(parity_bits // m, message_bits)
+        if blocks < 1:
+            continue
+        block_bits = -(-message_bits // blocks)
+        if block_bits + m <= (1 << m) - 1 and (best is None or blocks > best[1]):
+            best = (m, blocks, block_bits)
+    if best is None:
+        raise ValueError(f"{parity_bits} bitów korekcyjnych nie wystarcza dla kodu Hamminga")
+    m, blocks, block_bits = best
+
+    # Kolumny macierzy kontrolnej: bity danych - wartości o co najmniej dwóch jedynkach, bity korekcyjne - wektory jednostkowe
+    columns = [value for value in range(3, 1 << m) if value & (value - 1)][:block_bits]
+    column_matrix = ((np.array(columns)[:, None] >> np.arange(m)) & 1).astype(np.float32)
+    # Pozycja błędu dla syndromu: bit danych, -2 - brak błędu albo błąd bitu korekcyjnego,
+    # -1 - syndrom spoza kodu (błąd niepoprawialny)
+    syndrome_positions = np.full(1 << m, -1, dtype=np.int64)
+    syndrome_positions[columns] = np.arange(block_bits)
+    syndrome_positions[0] = -2
+    syndrome_positions[1 << np.arange(m)] = -2
+    padding = (np.arange(block_bits)[None, :] * blocks + np.arange(blocks)[:, None]) >= message_bits
+    for table in (column_matrix, syndrome_positions, padding):
+        table.flags.writeable = False
+    return m, blocks, block_bits, column_matrix, syndrome_positions, padding
+
+
+class HammingCode(ErrorCorrectionCode):
+    """Skrócone kody Hamminga dla bloków przeplecionych bitów ramki - tania korekcja jednego bitu w każdym bloku.
+
+    Bajty korekcyjne są dzielone na jak najwięcej bloków po m bitów; dekodowanie to wyznaczenie syndromu
+    (mnożenie macierzy) i odczyt pozycji błędu z tablicy, bez arytmetyki w ciele skończonym.
+    """
+
+    def check_frame_length(self, frame_length):
+        _hamming_tables(frame_length * 8, self.symbols * 8)
+
+    def _blocks(self, frames, block_bits, blocks):
+        """Bity ramek w układzie (ramka, blok, bit w bloku), dopełnione zerami."""
+        bits = np.zeros((frames.shape[0], block_bits * blocks), dtype=np.uint8)
+        bits[:, :frames.shape[1] * 8] = np.unpackbits(frames, axis=1)
+        return bits.reshape(-1, block_bits, blocks).transpose(0, 2, 1)
+
+    def encode_batch(self, frames):
+        frames = np.atleast_2d(np.asarray(frames, dtype=np.uint8))
+        m, blocks, block_bits, column_matrix, _, _ = _hamming_tables(frames.shape[1] * 8, self.symbols * 8)
+        data = self._blocks(frames, block_bits, blocks)
+        parity_bits = (data.astype(np.float32) @ column_matrix).astype(np.int64) & 1
+        return _pack_parity(parity_bits.reshape(len(frames), blocks * m).astype(np.uint8), self.symbols)
+
+    def decode_batch(self, codewords, erase_pos=None):
+        self._check_erasures(erase_pos)
+        codewords = np.atleast_2d(np.asarray(codewords, dtype=np.uint8))
+        frame_length = codewords.shape[1] - self.symbols
+        message_bits = frame_length * 8
+        m, blocks, block_bits, column_matrix, syndrome_positions, padding = _hamming_tables(
+            message_bits, self.symbols * 8
+        )
+        count = len(codewords)
+        data = self._blocks(codewords[:, :frame_length], block_bits, blocks)
+        parity_bits = np.unpackbits(codewords[:, frame_length:], axis=1)[:, :blocks * m].reshape(count, blocks, m)
+        syndrome_bits = ((data.astype(np.float32) @ column_matrix).astype(np.int64) ^ parity_bits) & 1
+        positions = syndrome_positions[syndrome_bits @ (1 << np.arange(m))]
+
+        rows, block_index = np.nonzero(positions >= 0)
+        bit_index = positions[rows, block_index]
+        shortened = padding[block_index, bit_index]  # Błąd wskazany na bicie spoza skróconego kodu
+        data[rows[~shortened], block_index[~shortened], bit_index[~shortened]] ^= 1
+        valid = ~(positions == -1).any(axis=1)
+        valid[rows[shortened]] = False
+        bits = data.transpose(0, 2, 1).reshape(count, -1)[:, :message_bits]
+        return np.packbits(bits, axis=1), valid
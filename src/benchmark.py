@@ -0,0 +1,305 @@
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from bit_conversion import bits_to_bytes, bytes_to_bits
+from channel import Channel
+from codec_registry import ERROR_CORRECTION_CODES, ERROR_DETECTION_CODES
+from pipeline import Pipeline
+
+SAMPLE_IMAGE = Path(__file__).resolve().parent.parent / "data" / "input" / "sample1.bmp"
+RESULTS_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+PACKET_SIZE = 64
+RS_SYMBOLS = (4, 10, 16, 32)
+
+
+class Benchmark:
+    """Pojedynczy pomiar: setup() przygotowuje dane i zwraca funkcję mierzoną bez argumentów."""
+
+    def __init__(self, name, setup, size_bytes, frames=None):
+        self.name = name
+        self.setup = setup
+        self.size_bytes = size_bytes  # Liczba bajtów danych użytkowych przetwarzanych w jednym wywołaniu
+        self.frames = frames  # Liczba ramek w jednym wywołaniu (None - pomiar nie dotyczy ramek)
+
+    def run(self, repeat, min_time):
+        """Mierzy czas wywołania; liczba wywołań w próbie jest dobierana tak, by próba trwała co najmniej min_time."""
+        func = self.setup()
+        func()  # Rozgrzewka (pamięci podręczne tablic, importy)
+        number = 1
+        while True:
+            elapsed = _time_calls(func, number)
+            if elapsed >= min_time:
+                break
+            number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+        samples = [elapsed / number] + [_time_calls(func, number) / number for _ in range(repeat - 1)]
+
+        best = min(samples)
+        result = {
+            "best": best,
+            "median": statistics.median(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "calls": number,
+            "repeat": repeat,
+            "bytes": self.size_bytes,
+            "mb_per_s": self.size_bytes / best / 1e6,
+        }
+        if self.frames is not None:
+            result["frames"] = self.frames
+            result["frames_per_s"] = self.frames / best
+        return result
+
+
+def _time_calls(func, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def _random_frames(count, size, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, size=(count, size), dtype=np.uint8)
+
+
+def _corrupt(codewords, errors, seed=0):
+    """Wprowadza dokładnie errors błędnych bajtów w każdym słowie kodowym."""
+    rng = np.random.default_rng(seed)
+    corrupted = codewords.copy()
+    for row in corrupted:
+        positions = rng.choice(len(row), size=errors, replace=False)
+        row[positions] ^= rng.integers(1, 256, size=errors, dtype=np.uint8)
+    return corrupted
+
+
+def converter_benchmarks(size):
+    data = _random_frames(1, size)[0].tobytes()
+
+    def setup_bytes_to_bits():
+        return lambda: bytes_to_bits(data)
+
+    def setup_bits_to_bytes():
+        bits = bytes_to_bits(data)
+        return lambda: bits_to_bytes(bits)
+
+    return [
+        Benchmark("convert.bytes_to_bits", setup_bytes_to_bits, size),
+        Benchmark("convert.bits_to_bytes", setup_bits_to_bytes, size),
+    ]
+
+
+def edc_benchmarks(frames):
+    benchmarks = []
+    for name, code_class in ERROR_DETECTION_CODES.items():
+        def setup_encode(code_class=code_class):
+            code = code_class()
+            data = _random_frames(frames, PACKET_SIZE)
+            return lambda: code.encode_batch(data)
+
+        def setup_decode(code_class=code_class):
+            code = code_class()
+            encoded = code.encode_batch(_random_frames(frames, PACKET_SIZE))
+            return lambda: code.decode_batch(encoded)
+
+        def setup_encode_single(code_class=code_class):
+            code = code_class()
+            packets = [frame.tobytes() for frame in _random_frames(frames // 16, PACKET_SIZE)]
+            return lambda: [code.encode(packet) for packet in packets]
+
+        benchmarks += [
+            Benchmark(f"edc.{name}.encode_batch", setup_encode, frames * PACKET_SIZE, frames),
+            Benchmark(f"edc.{name}.decode_batch", setup_decode, frames * PACKET_SIZE, frames),
+            Benchmark(f"edc.{name}.encode", setup_encode_single, frames // 16 * PACKET_SIZE, frames // 16),
+        ]
+    return benchmarks
+
+
+def ecc_benchmarks(frames):
+    """Pomiary wszystkich kodów korekcyjnych z rejestru (w tym z wtyczek) dla kilku liczb bajtów korekcyjnych.
+
+    Pomijane są połączenia kodu i liczby bajtów korekcyjnych, których kod nie obsługuje.
+    """
+    benchmarks = []
+    frame_size = PACKET_SIZE + 4  # Pakiet z sumą CRC32, tak jak w Pipeline
+    for (name, code_class), symbols in itertools.product(ERROR_CORRECTION_CODES.items(), RS_SYMBOLS):
+        try:
+            code_class(symbols).check_frame_length(frame_size)
+        except ValueError:
+            continue  # Kod nie obsługuje ramki tej długości z tyloma bajtami korekcyjnymi (np. splotowy z 4 bajtami)
+
+        def setup_encode(code_class=code_class, symbols=symbols):
+            code = code_class(symbols)
+            data = _random_frames(frames, frame_size)
+            return lambda: code.encode_batch(data)
+
+        def setup_decode_clean(code_class=code_class, symbols=symbols):
+            code = code_class(symbols)
+            data = _random_frames(frames, frame_size)
+            codewords = np.hstack((data, code.encode_batch(data)))
+            return lambda: code.decode_batch(codewords)
+
+        def setup_decode_errors(code_class=code_class, symbols=symbols, count=frames // 16):
+            code = code_class(symbols)
+            data = _random_frames(count, frame_size)
+            codewords = _corrupt(np.hstack((data, code.encode_batch(data))), symbols // 2)
+            return lambda: code.decode_batch(codewords)
+
+        prefix = f"ecc.{name.lower()}{symbols}"
+        benchmarks += [
+            Benchmark(f"{prefix}.encode_batch", setup_encode, frames * frame_size, frames),
+            Benchmark(f"{prefix}.decode_batch_clean", setup_decode_clean, frames * frame_size, frames),
+            Benchmark(f"{prefix}.decode_batch_errors", setup_decode_errors, frames // 16 * frame_size, frames // 16),
+        ]
+    return benchmarks
+
+
+def channel_benchmarks(size):
+    data = _random_frames(1, size)[0].tobytes()
+
+    def setup_bsc():
+        channel = Channel("BSC", ber=0.01)
+        return lambda: channel.channel_transmit(data)
+
+    def setup_gilbert_elliott():
+        channel = Channel("GilbertElliott", seed=0)
+        return lambda: channel.channel_transmit(data)
+
+    return [
+        Benchmark("channel.BSC.transmit", setup_bsc, size),
+        Benchmark("channel.GilbertElliott.transmit", setup_gilbert_elliott, size),
+    ]
+
+
+def _image_size(image_path):
+    with Image.open(image_path) as img:
+        width, height = img.size
+        return width * height * len(img.getbands())
+
+
+def pipeline_benchmarks(image_path, label):
+    pixels = _image_size(image_path)
+
+    def setup():
+        pipeline = Pipeline(image_path=str(image_path), output_path=None)
+        pipeline.configure(channel_type="GilbertElliott", channel_params={"seed": 0}, packet_size=PACKET_SIZE)
+        return pipeline.run_image_transmission
+
+    return [Benchmark(f"pipeline.{label}", setup, pixels, -(-pixels // PACKET_SIZE))]
+
+
+def write_synthetic_image(path, side):
+    """Losowy obraz RGB side x side zapisany jako BMP."""
+    pixels = np.random.default_rng(0).integers(0, 256, size=(side, side, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(path, format="bmp")
+    return path
+
+
+def collect_benchmarks(workdir, quick=False, large_side=1024):
+    frames = 1024 if quick else 8192
+    size = frames * PACKET_SIZE
+    benchmarks = converter_benchmarks(size) + edc_benchmarks(frames) + ecc_benchmarks(frames)
+    benchmarks += channel_benchmarks(size)
+    benchmarks += pipeline_benchmarks(SAMPLE_IMAGE, "sample1")
+    if large_side:
+        synthetic = write_synthetic_image(Path(workdir) / "synthetic.bmp", large_side)
+        benchmarks += pipeline_benchmarks(synthetic, f"synthetic{large_side}")
+    return benchmarks
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(filters=(), repeat=5, min_time=0.2, quick=False, large_side=1024):
+    """Uruchamia wybrane pomiary; zwraca słownik gotowy do zapisu jako JSON."""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for benchmark in collect_benchmarks(workdir, quick, large_side):
+            if filters and not any(pattern in benchmark.name for pattern in filters):
+                continue
+            results[benchmark.name] = result = benchmark.run(repeat, min_time)
+            frames_info = f"{result['frames_per_s']:12.0f} ramek/s" if "frames_per_s" in result else ""
+            print(f"{benchmark.name:40s} {result['best'] * 1e3:10.3f} ms {result['mb_per_s']:10.2f} MB/s {frames_info}")
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    """Porównuje dwa pliki wyników; zwraca nazwy pomiarów wolniejszych o więcej niż threshold.
+
+    Porównywana jest przepustowość (MB/s), więc pomiary wykonane na danych różnej wielkości (--quick) są porównywalne.
+    """
+    regressions = []
+    print(f"{'pomiar':40s} {'przed [MB/s]':>14s} {'po [MB/s]':>14s} {'zmiana':>8s}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["mb_per_s"]
+        after = result["mb_per_s"]
+        change = before / after - 1  # Względne wydłużenie czasu przetwarzania bajtu
+        marker = ""
+        if change > threshold:
+            regressions.append(name)
+            marker = "  REGRESJA"
+        print(f"{name:40s} {before:14.2f} {after:14.2f} {change:+8.1%}{marker}")
+    return regressions
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pomiary przepustowości kodów, kanałów i całej symulacji.",
+        epilog="Przykład: python benchmark.py --quick; python benchmark.py --compare stary.json nowy.json",
+    )
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="uruchom tylko pomiary zawierające podany tekst (można powtarzać)")
+    parser.add_argument("--repeat", type=int, default=5, help="liczba prób każdego pomiaru")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimalny czas jednej próby [s]")
+    parser.add_argument("--quick", action="store_true", help="mniejsze dane wejściowe")
+    parser.add_argument("--large-side", type=int, default=1024,
+                        help="bok syntetycznego obrazu w pikselach (0 - bez obrazu syntetycznego)")
+    parser.add_argument("--results", help=f"plik wynikowy JSON (domyślnie {RESULTS_DIR.name}/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="porównaj dwa pliki wyników zamiast uruchamiać pomiary")
+    parser.add_argument("--threshold", type=float, default=0.1, help="próg regresji przy porównaniu (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        regressions = compare(_load(args.compare[0]), _load(args.compare[1]), args.threshold)
+        return 1 if regressions else 0
+
+    report = run_benchmarks(args.filter, args.repeat, args.min_time, args.quick, args.large_side)
+    results_path = Path(args.results) if args.results else RESULTS_DIR / f"{report['commit']}.json"
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    results_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Wyniki zapisano w {results_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
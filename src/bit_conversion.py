@@ -0,0 +1,25 @@
+import numpy as np
+
+
+def as_byte_array(byte_data):
+    """Zwraca widok danych bajtowych jako tablicę np.uint8 (bez kopiowania, jeśli to możliwe)."""
+    if isinstance(byte_data, np.ndarray):
+        return byte_data.astype(np.uint8, copy=False)
+    if isinstance(byte_data, list):
+        return np.array(byte_data, dtype=np.uint8)
+    return np.frombuffer(memoryview(byte_data), dtype=np.uint8)
+
+
+def as_bit_array(bit_data):
+    """Zwraca tablicę bitów jako np.uint8 (bez kopiowania, jeśli to możliwe)."""
+    return np.asarray(bit_data, dtype=np.uint8)
+
+
+def bytes_to_bits(byte_data):
+    """Konwersja bajtów na tablicę bitów (MSB first)."""
+    return np.unpackbits(as_byte_array(byte_data))
+
+
+def bits_to_bytes(bit_data):
+    """Konwersja tablicy bitów na bajty; niepełny ostatni bajt jest dopełniany zerami."""
+    return np.packbits(as_bit_array(bit_data)).tobytes()
@@ -0,0 +1,57 @@
+import numpy as np
+from bit_conversion import as_bit_array, as_byte_array
+from seeding import generator
+
+
+class BinarySymmetricChannel:
+    def __init__(self, ber, seed=None):
+        if not 0 <= ber <= 1:
+            raise ValueError("Prawdopodobieństwo błędu bitu musi być z zakresu 0-1")
+        self.ber = ber  # Prawdopodobieństwo przekłamania pojedynczego bitu
+        self.rng = generator(seed, "channel")
+
+    def _error_positions(self, length):
+        """Losuje pozycje przekłamanych bitów.
+
+        Zamiast losować każdy bit osobno, losowane są odstępy między kolejnymi błędami (rozkład geometryczny),
+        więc koszt zależy od liczby błędów, a nie od liczby bitów.
+        """
+        if self.ber <= 0 or length == 0:
+            return np.empty(0, dtype=np.int64)
+        if self.ber >= 1:
+            return np.arange(length, dtype=np.int64)
+
+        chunks = []
+        last = -1  # Pozycja ostatniego wylosowanego błędu
+        while True:
+            # Oczekiwana liczba błędów w pozostałej części z zapasem kilku odchyleń standardowych
+            expected = (length - last) * self.ber
+            count = int(expected + 4 * np.sqrt(expected)) + 16
+            positions = last + np.cumsum(self.rng.geometric(self.ber, count))
+            if positions[-1] >= length:
+                chunks.append(positions[:np.searchsorted(positions, length)])
+                break
+            chunks.append(positions)
+            last = int(positions[-1])
+        return np.concatenate(chunks)
+
+    def _corrupt(self, byte_data):
+        """Nakłada maskę błędów na spakowane bajty (bit 0 pozycji to najstarszy bit bajtu)."""
+        transmitted = np.array(byte_data, dtype=np.uint8)
+        positions = self._error_positions(transmitted.size * 8)
+        flat = transmitted.reshape(-1)
+        np.bitwise_xor.at(flat, positions >> 3, (0x80 >> (positions & 7)).astype(np.uint8))
+        return transmitted
+
+    def transmit(self, data):
+        return self._corrupt(as_byte_array(data)).tobytes()
+
+    def transmit_batch(self, frames):
+        """Przesyłanie wielu ramek naraz; zwraca tablicę o kształcie frames."""
+        return self._corrupt(frames)
+
+    def transmit_bits(self, bit_data):
+        """Przesyłanie danych bitowych przez kanał."""
+        transmitted = as_bit_array(bit_data).copy()
+        transmitted[self._error_positions(len(transmitted))] ^= 1  # Zamiana bitu
+        return transmitted
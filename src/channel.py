@@ -1,5 +1,6 @@
-import komm
-import numpy as np
+from awgn_channel import AWGNChannel
+from bit_conversion import bits_to_bytes, bytes_to_bits
+from bsc_channel import BinarySymmetricChannel
 from gilbert_elliott_channel import GilbertElliottChannel
 
 
@@ -8,49 +9,63 @@ class Channel:
         self.channel_type = channel_type
 
         if channel_type == "BSC":
-            self.channel = komm.BinarySymmetricChannel(crossover_probability=kwargs.get("ber", 0.1))
+            self.channel = BinarySymmetricChannel(ber=kwargs.get("ber", 0.1), seed=kwargs.get("seed"))
         elif channel_type == "GilbertElliott":
             self.channel = GilbertElliottChannel(
                 good_to_bad=kwargs.get("good_to_bad", 0.05),
                 bad_to_good=kwargs.get("bad_to_good", 0.1),
                 good_error_prob=kwargs.get("good_error_prob", 0.01),
                 bad_error_prob=kwargs.get("bad_error_prob", 0.2),
+                seed=kwargs.get("seed"),
             )
+        elif channel_type == "AWGN":
+            self.channel = AWGNChannel(
+                ebn0_db=kwargs.get("ebn0_db", 6.0),
+                modulation=kwargs.get("modulation", "BPSK"),
+                code_rate=kwargs.get("code_rate", 1.0),
+                seed=kwargs.get("seed"),
+            )
+        else:
+            raise ValueError(f"Nieznany typ kanału: {channel_type}")
 
     def _bytes_to_bits(self, byte_data):
-        bit_list = []
-        for byte in byte_data:
-            for i in range(8):
-                bit_list.append((byte >> (7 - i)) & 1)
-        return np.array(bit_list)
+        return bytes_to_bits(byte_data)
 
     def _bits_to_bytes(self, bit_list):
-        # Dodaj padding, jeśli potrzeba, aby uzyskać pełne bajty
-        if len(bit_list) % 8 != 0:
-            padding = 8 - (len(bit_list) % 8)
-            bit_list = np.pad(bit_list, (0, padding), constant_values=0)
-
-        byte_list = []
-        for i in range(0, len(bit_list), 8):
-            byte = 0
-            for bit in bit_list[i:i + 8]:
-                byte = (byte << 1) | bit
-            byte_list.append(byte)
-        return bytes(byte_list)
+        return bits_to_bytes(bit_list)
 
     def channel_transmit(self, data, as_bits=False):
         """Przesyłanie danych przez kanał."""
         if as_bits:
             # Jeśli dane są w postaci bitowej
-            if self.channel_type == "BSC":
-                return list(self.channel(np.array(data)))  # komm obsługuje tablicę numpy
-            else:
-                return self.channel.transmit_bits(data)
-        else:
-            # Jeśli dane są w postaci bajtowej
-            if self.channel_type == "BSC":
-                bit_data = self._bytes_to_bits(data)
-                transmitted_bits = self.channel(bit_data)
-                return self._bits_to_bytes(transmitted_bits)
-            else:
-                return self.channel.transmit(data)
+            return self.channel.transmit_bits(data)
+        # Jeśli dane są w postaci bajtowej
+        return self.channel.transmit(data)
+
+    def channel_transmit_batch(self, frames):
+        """Przesyłanie wielu ramek (tablica uint8 o wymiarach liczba ramek x długość ramki) jednym wywołaniem."""
+        return self.channel.transmit_batch(frames)
+
+    @property
+    def soft_output(self):
+        """Czy kanał podaje wiarygodność odebranych bitów (LLR) - obecnie tylko AWGN."""
+        return isinstance(self.channel, AWGNChannel)
+
+    @property
+    def reports_reliability(self):
+        """Czy kanał podaje wiarygodność odebranych bajtów (AWGN - z LLR, Gilbert-Elliott - ze stanu kanału)."""
+        return hasattr(self.channel, "transmit_reliability")
+
+    def channel_transmit_reliability(self, data, batch=False):
+        """Przesyłanie z wiarygodnością bajtów (log-iloraz szans, że bajt odebrano poprawnie)."""
+        if batch:
+            return self.channel.transmit_batch_reliability(data)
+        return self.channel.transmit_reliability(data)
+
+    def channel_transmit_soft(self, data):
+        """Przesyłanie bajtów z wyjściem miękkim; zwraca bajty po twardych decyzjach i LLR bitów (bajty x 8)."""
+        return self.channel.transmit_soft(data)
+
+    def channel_transmit_batch_soft(self, frames):
+        """Wsadowe przesyłanie z wyjściem miękkim; zwraca tablicę o kształcie frames i LLR (frames x 8)."""
+        return self.channel.transmit_batch_soft(frames)
@@ -0,0 +1,96 @@
+import logging
+from importlib.metadata import entry_points
+from bch_code import BCHCode, HammingCode
+from convolutional_code import ConvolutionalCode
+from error_correction_code import ErrorCorrectionCode, ReedSolomonCode
+from error_detection_code import ERROR_DETECTION_CODES, ErrorDetectionCode
+
+logger = logging.getLogger(__name__)
+
+# Grupy punktów wejścia (entry points), w których zainstalowane pakiety rejestrują własne kody:
+# nazwa punktu wejścia to nazwa kodu, a obiekt - jego klasa
+DETECTION_PLUGIN_GROUP = "hybrid_arq.error_detection_codes"
+CORRECTION_PLUGIN_GROUP = "hybrid_arq.error_correction_codes"
+
+# Dostępne kody korekcyjne według nazwy; konstruktor przyjmuje liczbę bajtów korekcyjnych na ramkę
+ERROR_CORRECTION_CODES = {
+    "RS": ReedSolomonCode,
+    "Hamming": HammingCode,
+    "BCH": BCHCode,
+    "Convolutional": ConvolutionalCode,
+}
+
+
+def _register(registry, base, name, code_class):
+    if not (isinstance(code_class, type) and issubclass(code_class, base)):
+        raise TypeError(f"Kod {name} musi być klasą pochodną {base.__name__}")
+    if registry.get(name, code_class) is not code_class:
+        raise ValueError(f"Kod {name} jest już zarejestrowany")
+    registry[name] = code_class
+
+
+def register_error_detection_code(name, code_class):
+    """Dodaje kod detekcyjny (podklasę ErrorDetectionCode) do ERROR_DETECTION_CODES."""
+    _register(ERROR_DETECTION_CODES, ErrorDetectionCode, name, code_class)
+
+
+def register_error_correction_code(name, code_class):
+    """Dodaje kod korekcyjny (podklasę ErrorCorrectionCode) do ERROR_CORRECTION_CODES."""
+    _register(ERROR_CORRECTION_CODES, ErrorCorrectionCode, name, code_class)
+
+
+def load_plugins():
+    """Rejestruje kody z punktów wejścia zainstalowanych pakietów; błędne wtyczki są pomijane z ostrzeżeniem."""
+    for group, register in ((DETECTION_PLUGIN_GROUP, register_error_detection_code),
+                            (CORRECTION_PLUGIN_GROUP, register_error_correction_code)):
+        for entry_point in entry_points(group=group):
+            try:
+                register(entry_point.name, entry_point.load())
+            except Exception:
+                logger.warning("Nie udało się wczytać kodu %s (%s)", entry_point.name, entry_point.value, exc_info=True)
+
+
+def create_error_detection_code(name):
+    if name not in ERROR_DETECTION_CODES:
+        raise ValueError(f"Nieznany kod detekcyjny: {name}")
+    return ERROR_DETECTION_CODES[name]()
+
+
+def create_error_correction_code(name, symbols):
+    """Kod korekcyjny według nazwy z symbols bajtami korekcyjnymi na ramkę."""
+    if name not in ERROR_CORRECTION_CODES:
+        raise ValueError(f"Nieznany kod korekcyjny: {name}")
+    return ERROR_CORRECTION_CODES[name](symbols)
+
+
+def minimum_symbols(name, frame_length, limit=254):
+    """Najmniejsza liczba bajtów korekcyjnych, z jaką kod obsługuje ramki frame_length bajtów (albo None)."""
+    for symbols in range(1, limit + 1):
+        try:
+            create_error_correction_code(name, symbols).check_frame_length(frame_length)
+        except ValueError:
+            continue
+        return symbols
+    return None
+
+
+def codec_throughput(frame_length, symbols, bit_error_rate=1e-3, frames=1024):
+    """Przepustowość i odsetek odtworzonych ramek (ErrorCorrectionCode.throughput) dla każdego kodu korekcyjnego.
+
+    Dla kodów, które nie obsługują ramki o tej długości z tyloma bajtami korekcyjnymi, raport zawiera
+    powód pominięcia i najmniejszą wystarczającą liczbę bajtów korekcyjnych.
+    """
+    report = {}
+    for name, code_class in ERROR_CORRECTION_CODES.items():
+        try:
+            code = code_class(symbols)
+            code.check_frame_length(frame_length)
+        except ValueError as e:
+            logger.info("Pominięto kod %s: %s", name, e)
+            report[name] = {"skipped": str(e), "minimum_symbols": minimum_symbols(name, frame_length)}
+            continue
+        report[name] = code.throughput(frame_length, frames, bit_error_rate)
+    return report
+
+
+load_plugins()
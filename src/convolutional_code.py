@@ -0,0 +1,236 @@
+from functools import lru_cache
+import heapq
+import numpy as np
+from error_correction_code import ErrorCorrectionCode
+
+VITERBI_CHUNK = 256  # Liczba słów kodowych dekodowanych razem - ogranicza pamięć decyzji (słowa x bity x stany)
+MIN_FREE_DISTANCE = 3  # Najmniejsza odległość swobodna kodu po punktowaniu - poprawia co najmniej jeden błąd
+
+
+def _parity(value):
+    return bin(value).count("1") & 1
+
+
+@lru_cache(maxsize=None)
+def _trellis(constraint_length, feedback, feedforward):
+    """Krata rekurencyjnego kodu systematycznego: poprzednicy każdego stanu z bitem danych i bitem korekcyjnym przejścia.
+
+    Stan to constraint_length - 1 ostatnich bitów rejestru (najnowszy na najstarszej pozycji); bit
+    rejestru to bit danych z dodanym sprzężeniem zwrotnym (odczepy feedback), a bit korekcyjny to suma
+    bitów rejestru wskazanych przez feedforward.
+    """
+    states = 1 << (constraint_length - 1)
+    previous_state = np.zeros((states, 2), dtype=np.int64)
+    previous_bit = np.zeros((states, 2), dtype=np.uint8)
+    previous_parity = np.zeros((states, 2), dtype=np.uint8)
+    filled = np.zeros(states, dtype=np.int64)
+    for state in range(states):
+        for bit in (0, 1):
+            register_bit = bit ^ _parity(feedback & state)
+            register = (register_bit << (constraint_length - 1)) | state
+            next_state = register >> 1
+            previous_state[next_state, filled[next_state]] = state
+            previous_bit[next_state, filled[next_state]] = bit
+            previous_parity[next_state, filled[next_state]] = _parity(feedforward & register)
+            filled[next_state] += 1
+    for table in (previous_state, previous_bit, previous_parity):
+        table.flags.writeable = False
+    return previous_state, previous_bit, previous_parity
+
+
+@lru_cache(maxsize=None)
+def _free_distance(constraint_length, feedback, feedforward, period):
+    """Odległość swobodna kodu, gdy wysyłany jest co period-ty bit korekcyjny (najlżejsza ścieżka od stanu 0 do 0)."""
+    previous_state, previous_bit, previous_parity = _trellis(constraint_length, feedback, feedforward)
+    transitions = [[] for _ in previous_state]
+    for state in range(len(previous_state)):
+        for branch in (0, 1):
+            transitions[previous_state[state, branch]].append(
+                (state, int(previous_bit[state, branch]), int(previous_parity[state, branch])))
+    best = None
+    for phase in range(period):  # Ścieżka może odbiec od stanu 0 w dowolnej fazie wzorca punktowania
+        queue = [(bit + parity * (phase == 0), state, (phase + 1) % period)
+                 for state, bit, parity in transitions[0] if state != 0]
+        heapq.heapify(queue)
+        visited = set()
+        while queue:
+            weight, state, step = heapq.heappop(queue)
+            if state == 0:
+                best = weight if best is None else min(best, weight)
+                break
+            if (state, step) in visited:
+                continue
+            visited.add((state, step))
+            for next_state, bit, parity in transitions[state]:
+                heapq.heappush(queue, (weight + bit + parity * (step == 0), next_state, (step + 1) % period))
+    return best
+
+
+@lru_cache(maxsize=None)
+def _encoder_matrices(message_bits, constraint_length, feedback, feedforward):
+    """Macierze bitów korekcyjnych i stanu końcowego kodera; kod jest liniowy, więc wiersz i to odpowiedź
+    kodera na jedynkę na pozycji i."""
+    response = np.zeros(message_bits, dtype=np.float32)
+    states = np.zeros(message_bits, dtype=np.int64)
+    state = 0
+    for i in range(message_bits):
+        bit = 1 if i == 0 else 0
+        register_bit = bit ^ _parity(feedback & state)
+        register = (register_bit << (constraint_length - 1)) | state
+        response[i] = _parity(feedforward & register)
+        state = register >> 1
+        states[i] = state
+    parity_matrix = np.zeros((message_bits, message_bits), dtype=np.float32)
+    for i in range(message_bits):
+        parity_matrix[i, i:] = response[:message_bits - i]
+    # Stan po ostatnim bicie wiadomości: jedynka na pozycji i daje stan odpowiedzi po message_bits - i krokach
+    final_states = states[::-1]
+    state_matrix = ((final_states[:, None] >> np.arange(constraint_length - 1)) & 1).astype(np.float32)
+    parity_matrix.flags.writeable = False
+    state_matrix.flags.writeable = False
+    return parity_matrix, state_matrix
+
+
+@lru_cache(maxsize=None)
+def _tail_table(constraint_length, feedback, feedforward):
+    """Bity zakończenia dla każdego stanu końcowego: constraint_length - 1 bitów danych sprowadzających koder
+    do stanu 0, a po nich ich bity korekcyjne."""
+    memory = constraint_length - 1
+    table = np.zeros((1 << memory, 2 * memory), dtype=np.uint8)
+    for final_state in range(1 << memory):
+        state = final_state
+        for step in range(memory):
+            table[final_state, step] = _parity(feedback & state)  # Bit rejestru równy zeru
+            table[final_state, memory + step] = _parity(feedforward & state)
+            state >>= 1
+    table.flags.writeable = False
+    return table
+
+
+class ConvolutionalCode(ErrorCorrectionCode):
+    """Systematyczny rekurencyjny kod splotowy z dekodowaniem Viterbiego (twarde decyzje).
+
+    Ramka jest przesyłana bez zmian, a bajty korekcyjne niosą co period-ty bit korekcyjny kodu o sprawności
+    1/2 (okresowe punktowanie) oraz bity zakończenia, które sprowadzają koder do stanu zerowego.
+    Okres jest najmniejszy, przy którym wszystko mieści się w bajtach korekcyjnych; jeśli kod po punktowaniu
+    miałby odległość swobodną mniejszą niż MIN_FREE_DISTANCE, check_frame_length i kodowanie zgłaszają ValueError.
+    Ramka jest uznawana za niepoprawialną, gdy w którymś oknie constraint_length * period kroków kraty
+    dekoder zmienił co najmniej tyle bitów, ile wynosi odległość swobodna kodu; pozostałe błędne decyzje
+    dekodera (np. przy długich paczkach błędów) wykrywa kod detekcyjny.
+    """
+    constraint_length = 7
+    feedback = 0o171  # Wielomiany generujące kodu (171, 133) w postaci systematycznej rekurencyjnej
+    feedforward = 0o133
+
+    def _code(self):
+        return self.constraint_length, self.feedback, self.feedforward
+
+    @property
+    def tail_bits(self):
+        return 2 * (self.constraint_length - 1)
+
+    def _period(self, message_bits):
+        """Okres punktowania dla ramki message_bits bitów i jego odległość swobodna."""
+        budget = self.symbols * 8 - self.tail_bits
+        period = max(1, -(-message_bits // budget)) if budget > 0 else None
+        distance = _free_distance(*self._code(), period) if period is not None else None
+        if distance is None or distance < MIN_FREE_DISTANCE:
+            longest = 1  # Najrzadsze punktowanie zachowujące odległość swobodną
+            while _free_distance(*self._code(), longest + 1) >= MIN_FREE_DISTANCE:
+                longest += 1
+            required = -(-(-(-message_bits // longest) + self.tail_bits) // 8)
+            raise ValueError(f"Kod splotowy dla ramki {message_bits // 8} bajtów wymaga co najmniej {required} "
+                             f"bajtów korekcyjnych (podano {self.symbols})")
+        return period, distance
+
+    def check_frame_length(self, frame_length):
+        self._period(frame_length * 8)
+
+    def _parity_bits(self, message_bits, period):
+        """Wysyłane bity korekcyjne (punktowane i zakończenie) dla bitów ramek (jeden wiersz na ramkę)."""
+        parity_matrix, state_matrix = _encoder_matrices(message_bits.shape[1], *self._code())
+        message = message_bits.astype(np.float32)
+        parity_bits = (message @ parity_matrix).astype(np.int64)[:, ::period] & 1
+        final_state = ((message @ state_matrix).astype(np.int64) & 1) @ (1 << np.arange(self.constraint_length - 1))
+        return np.hstack((parity_bits.astype(np.uint8), _tail_table(*self._code())[final_state]))
+
+    def encode_batch(self, frames):
+        frames = np.atleast_2d(np.asarray(frames, dtype=np.uint8))
+        message_bits = np.unpackbits(frames, axis=1)
+        period, _ = self._period(message_bits.shape[1])
+        parity_bits = self._parity_bits(message_bits, period)
+        padded = np.zeros((len(frames), self.symbols * 8), dtype=np.uint8)
+        padded[:, :parity_bits.shape[1]] = parity_bits
+        return np.packbits(padded, axis=-1)
+
+    def decode_batch(self, codewords, erase_pos=None):
+        self._check_erasures(erase_pos)
+        codewords = np.atleast_2d(np.asarray(codewords, dtype=np.uint8))
+        frame_length = codewords.shape[1] - self.symbols
+        message_bits = np.unpackbits(codewords[:, :frame_length], axis=1)
+        length = message_bits.shape[1]
+        period, distance = self._period(length)
+        memory = self.constraint_length - 1
+        sent = -(-length // period) + self.tail_bits
+        received_parity = np.unpackbits(codewords[:, frame_length:], axis=1)[:, :sent]
+        valid = np.ones(len(codewords), dtype=bool)
+        # Słowa zgodne z kodem są same najbardziej prawdopodobną ścieżką - dekoder Viterbiego je pomija
+        erroneous = np.flatnonzero((self._parity_bits(message_bits, period) != received_parity).any(axis=1))
+        if not len(erroneous):
+            return np.packbits(message_bits, axis=1), valid
+
+        # Krata obejmuje bity wiadomości i bity zakończenia; bity korekcyjne pominięte przy punktowaniu są nieznane
+        steps = length + memory
+        data_bits = np.hstack((message_bits[erroneous], received_parity[erroneous, sent - 2 * memory:sent - memory]))
+        parity_bits = np.zeros((len(erroneous), steps), dtype=np.uint8)
+        parity_bits[:, :length:period] = received_parity[erroneous, :sent - self.tail_bits]
+        parity_bits[:, length:] = received_parity[erroneous, sent - memory:]
+        known = np.zeros(steps, dtype=bool)
+        known[:length:period] = True
+        known[length:] = True
+        decoded = np.empty_like(data_bits)
+        for start in range(0, len(erroneous), VITERBI_CHUNK):
+            rows = slice(start, start + VITERBI_CHUNK)
+            decoded[rows] = self._viterbi(data_bits[rows], parity_bits[rows], known)
+
+        # Zmiany dekodera w każdym kroku kraty; skupisko co najmniej distance zmian oznacza, że odebrane słowo
+        # leżało co najmniej tak samo blisko innej ścieżki - decyzja dekodera jest niewiarygodna
+        reencoded = self._parity_bits(decoded[:, :length], period)
+        changes = (decoded != data_bits).astype(np.int64)
+        changes[:, :length:period] += reencoded[:, :sent - self.tail_bits] != parity_bits[:, :length:period]
+        changes[:, length:] += reencoded[:, sent - memory:] != parity_bits[:, length:]
+        window = min(steps, self.constraint_length * period)
+        totals = np.cumsum(np.hstack((np.zeros((len(erroneous), 1), dtype=np.int64), changes)), axis=1)
+        valid[erroneous] = (totals[:, window:] - totals[:, :-window]).max(axis=1) < distance
+        message_bits[erroneous] = decoded[:, :length]
+        return np.packbits(message_bits, axis=1), valid
+
+    def _viterbi(self, message_bits, parity_bits, known):
+        """Ścieżka o najmniejszej odległości Hamminga od odebranych bitów kończąca się w stanie 0, dla wszystkich
+        słów naraz."""
+        previous_state, previous_bit, previous_parity = _trellis(*self._code())
+        count, length = message_bits.shape
+        # Koszt każdej z czterech etykiet przejścia (bit danych, bit korekcyjny) w każdym kroku
+        bit_costs = np.stack((message_bits, 1 - message_bits), axis=2).astype(np.int32)
+        parity_costs = np.stack((parity_bits, 1 - parity_bits), axis=2).astype(np.int32) * known[None, :, None]
+        costs = (bit_costs[..., :, None] + parity_costs[..., None, :]).reshape(count, length, 4).transpose(1, 0, 2)
+        costs = np.ascontiguousarray(costs)
+        labels = 2 * previous_bit.astype(np.int64) + previous_parity
+
+        metrics = np.full((count, len(previous_state)), 2 * length + 1, dtype=np.int32)
+        metrics[:, 0] = 0  # Koder startuje ze stanu zerowego
+        decisions = np.empty((length, count, len(previous_state)), dtype=bool)
+        for t in range(length):
+            first = metrics[:, previous_state[:, 0]] + costs[t][:, labels[:, 0]]
+            second = metrics[:, previous_state[:, 1]] + costs[t][:, labels[:, 1]]
+            np.less(second, first, out=decisions[t])
+            metrics = np.minimum(first, second)
+
+        rows = np.arange(count)
+        state = np.zeros(count, dtype=np.int64)  # Bity zakończenia sprowadzają koder do stanu zerowego
+        decoded = np.empty((count, length), dtype=np.uint8)
+        for t in range(length - 1, -1, -1):
+            branch = decisions[t, rows, state].astype(np.int64)
+            decoded[:, t] = previous_bit[state, branch]
+            state = previous_state[state, branch]
+        return decoded
@@ -0,0 +1,149 @@
+from functools import lru_cache
+import zlib
+import crcmod
+import numpy as np
+
+
+def _reflect(value, width):
+    return int(format(value, f"0{width}b")[::-1], 2)
+
+
+@lru_cache(maxsize=None)
+def crc_tables(width, poly, reflect):
+    """Tablice slicing-by-8 (8 x 256, uint64) dla danej szerokości i wielomianu - liczone raz na proces.
+
+    Wiersz j zawiera CRC bajtu, po którym następuje j bajtów zerowych; wiersz 0 to klasyczna tablica bajtowa.
+    """
+    mask = (1 << width) - 1
+    tables = [[0] * 256 for _ in range(8)]
+    if reflect:
+        reflected_poly = _reflect(poly & mask, width)
+        for byte in range(256):
+            crc = byte
+            for _ in range(8):
+                crc = (crc >> 1) ^ reflected_poly if crc & 1 else crc >> 1
+            tables[0][byte] = crc
+        for j in range(1, 8):
+            for byte in range(256):
+                previous = tables[j - 1][byte]
+                tables[j][byte] = (previous >> 8) ^ tables[0][previous & 0xFF]
+    else:
+        top_bit = 1 << (width - 1)
+        for byte in range(256):
+            crc = byte << (width - 8)
+            for _ in range(8):
+                crc = ((crc << 1) ^ poly) & mask if crc & top_bit else (crc << 1) & mask
+            tables[0][byte] = crc
+        for j in range(1, 8):
+            for byte in range(256):
+                previous = tables[j - 1][byte]
+                tables[j][byte] = ((previous << 8) & mask) ^ tables[0][previous >> (width - 8)]
+    result = np.array(tables, dtype=np.uint64)
+    result.flags.writeable = False
+    return result
+
+
+NATIVE_MIN_LENGTH = 512  # Od tej długości ramki wsadowe CRC korzysta z implementacji w C
+
+
+@lru_cache(maxsize=None)
+def _native_function(width, poly, init_crc, reflect):
+    """Funkcja CRC z rozszerzenia C biblioteki crcmod (szerokości 8, 16, 24, 32 i 64), tworzona raz na proces."""
+    if width not in (8, 16, 24, 32, 64):
+        return None
+    return crcmod.mkCrcFun(poly | (1 << width), initCrc=init_crc, xorOut=0, rev=reflect)
+
+
+class CRC:
+    """Uniwersalny CRC o dowolnej szerokości (do 64 bitów) i wielomianie, z tablicami wspólnymi dla procesu.
+
+    poly podaje się bez najstarszego bitu (np. 0x1021 dla CRC-16), reflect oznacza algorytm odbity (LSB first).
+    Algorytm nieodbity wymaga szerokości co najmniej 8 bitów.
+    """
+
+    def __init__(self, width, poly, init_crc=0, xor_out=0, reflect=True):
+        if not 1 <= width <= 64:
+            raise ValueError("Szerokość CRC musi być z zakresu 1-64 bitów")
+        if not reflect and width < 8:
+            raise ValueError("Nieodbity CRC wymaga szerokości co najmniej 8 bitów")
+        self.width = width
+        self.mask = (1 << width) - 1
+        self.poly = poly & self.mask
+        self.init_crc = init_crc & self.mask
+        self.xor_out = xor_out & self.mask
+        self.reflect = reflect
+        self.tables = crc_tables(width, self.poly, reflect)
+        self._table_lists = self.tables.tolist()
+        self._word_tables = self.tables[::-1]  # Tablica dla k-tego bajtu słowa (w kolejności w pamięci) to 7 - k
+        self._word_dtype = np.dtype("<u8") if reflect else np.dtype(">u8")
+        if (width, self.poly, self.init_crc, self.xor_out, reflect) == (32, 0x04C11DB7, self.mask, self.mask, True):
+            self._native = zlib.crc32  # Standardowy CRC-32 (zlib)
+        else:
+            function = _native_function(width, self.poly, self.init_crc, reflect)
+            if function is None or not self.xor_out:
+                self._native = function
+            else:
+                self._native = lambda data: function(data) ^ self.xor_out
+
+    def checksum(self, data):
+        """CRC pojedynczej wiadomości (obiekt z interfejsem bufora); korzysta z implementacji w C, jeśli jest dostępna."""
+        if self._native is not None:
+            return self._native(data)
+        return self.checksum_slicing(data)
+
+    def checksum_slicing(self, data):
+        """CRC pojedynczej wiadomości w czystym Pythonie - algorytm slicing-by-8 (osiem bajtów na krok)."""
+        data = bytes(data)
+        t0, t1, t2, t3, t4, t5, t6, t7 = self._table_lists
+        crc = self.init_crc
+        words = len(data) // 8
+        if self.reflect:
+            for i in range(0, words * 8, 8):
+                x = crc ^ int.from_bytes(data[i:i + 8], "little")
+                crc = (t7[x & 0xFF] ^ t6[(x >> 8) & 0xFF] ^ t5[(x >> 16) & 0xFF] ^ t4[(x >> 24) & 0xFF]
+                       ^ t3[(x >> 32) & 0xFF] ^ t2[(x >> 40) & 0xFF] ^ t1[(x >> 48) & 0xFF] ^ t0[x >> 56])
+            for byte in data[words * 8:]:
+                crc = t0[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+        else:
+            shift = 64 - self.width
+            for i in range(0, words * 8, 8):
+                x = (crc << shift) ^ int.from_bytes(data[i:i + 8], "big")
+                crc = (t7[x >> 56] ^ t6[(x >> 48) & 0xFF] ^ t5[(x >> 40) & 0xFF] ^ t4[(x >> 32) & 0xFF]
+                       ^ t3[(x >> 24) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t0[x & 0xFF])
+            for byte in data[words * 8:]:
+                crc = ((crc << 8) & self.mask) ^ t0[(crc >> (self.width - 8)) ^ byte]
+        return crc ^ self.xor_out
+
+    def checksum_batch(self, frames):
+        """CRC wszystkich wierszy tablicy ramek (2-D uint8) naraz - slicing-by-8 po ośmiu kolumnach."""
+        frames = np.atleast_2d(np.asarray(frames, dtype=np.uint8))
+        rows, length = frames.shape
+        if self._native is not None and length >= NATIVE_MIN_LENGTH:
+            # Długie ramki: implementacja w C dla każdego wiersza jest szybsza niż operacje na kolumnach
+            return np.fromiter((self._native(row.tobytes()) for row in frames), dtype=np.uint64, count=rows)
+
+        crc = np.full(rows, self.init_crc, dtype=np.uint64)
+        words = length // 8
+        if words:
+            word_data = np.ascontiguousarray(frames[:, :words * 8]).view(self._word_dtype)
+            shift = np.uint64(0 if self.reflect else 64 - self.width)
+            for column in word_data.T:
+                # Osiem bajtów słowa indeksuje osiem tablic; wyniki są łączone operacją XOR
+                x = ((crc << shift) ^ column).astype(self._word_dtype, copy=False)
+                word_bytes = x.view(np.uint8).reshape(rows, 8)
+                crc = self._word_tables[0][word_bytes[:, 0]]
+                for k in range(1, 8):
+                    crc ^= self._word_tables[k][word_bytes[:, k]]
+        table = self.tables[0]
+        for column in frames[:, words * 8:].T:
+            if self.reflect:
+                crc = table[(crc ^ column) & np.uint64(0xFF)] ^ (crc >> np.uint64(8))
+            else:
+                crc = ((crc << np.uint64(8)) & np.uint64(self.mask)) ^ table[(crc >> np.uint64(self.width - 8)) ^ column]
+        return crc ^ np.uint64(self.xor_out)
+
+
+@lru_cache(maxsize=None)
+def get_crc(width, poly, init_crc=0, xor_out=0, reflect=True):
+    """Wspólna dla procesu instancja CRC o podanych parametrach."""
+    return CRC(width, poly, init_crc, xor_out, reflect)
@@ -0,0 +1,94 @@
+import numpy as np
+from error_detection_code import CRC8
+
+# Źródła informacji o niewiarygodnych bajtach przekazywanych dekoderowi RS jako wymazania
+ERASURE_SOURCES = ("channel", "subblock")
+
+
+class SubblockChecksums:
+    """Sumy kontrolne CRC8 bloków słowa kodowego (ramka i symbole korekcyjne), wysyłane z symbolami korekcyjnymi.
+
+    Bloki, których suma kontrolna po stronie odbiorcy się nie zgadza, są wymazywane w całości.
+    """
+
+    def __init__(self, block_size=8):
+        if block_size < 1:
+            raise ValueError("Rozmiar bloku musi być dodatni")
+        self.block_size = block_size
+        self.crc = CRC8()
+
+    def size(self, length):
+        """Liczba sum kontrolnych (bajtów) dla słowa kodowego o długości length."""
+        return -(-length // self.block_size)
+
+    def _blocks(self, codewords):
+        codewords = np.atleast_2d(np.asarray(codewords, dtype=np.uint8))
+        count, length = codewords.shape
+        padded = np.zeros((count, self.size(length) * self.block_size), dtype=np.uint8)
+        padded[:, :length] = codewords  # Ostatni blok dopełniany zerami
+        return padded.reshape(-1, self.block_size), count
+
+    def calculate_batch(self, codewords):
+        """Sumy kontrolne bloków dla wielu słów kodowych naraz (jeden wiersz na słowo)."""
+        blocks, count = self._blocks(codewords)
+        return self.crc.calculate_checksum_batch(blocks).astype(np.uint8).reshape(count, -1)
+
+    def erasures(self, codewords, checksums, max_erasures):
+        """Pozycje bajtów w blokach z niezgodną sumą kontrolną - jedna próba w formacie reliability_erasures.
+
+        Słowo z większą liczbą takich bajtów niż max_erasures dostaje pustą listę - nie da się go poprawić
+        samymi wymazaniami, a wymazanie części bloków nie wskazuje, które bajty są błędne.
+        """
+        codewords = np.atleast_2d(np.asarray(codewords, dtype=np.uint8))
+        length = codewords.shape[1]
+        failed = self.calculate_batch(codewords) != np.atleast_2d(checksums)
+        positions = []
+        for row in failed:
+            erased = (np.flatnonzero(row)[:, None] * self.block_size + np.arange(self.block_size)).reshape(-1)
+            erased = erased[erased < length]
+            positions.append(erased.tolist() if len(erased) <= max_erasures else [])
+        return [positions]
+
+
+def reliability_erasures(reliability, symbols):
+    """Kolejne zestawy wymazań z wiarygodności bajtów (Generalized Minimum Distance).
+
+    Próba k wymazuje k * step najmniej wiarygodnych bajtów słowa (do symbols), pomijając bajty
+    o nieskończonej wiarygodności. Zwraca listę prób, każda to lista pozycji dla każdego słowa.
+    """
+    reliability = np.atleast_2d(reliability)
+    order = np.argsort(reliability, axis=1, kind="stable")
+    finite = np.isfinite(reliability).sum(axis=1)
+    step = 2 * max(1, symbols // 16)  # Najwyżej 8 prób niezależnie od liczby symboli korekcyjnych
+    attempts = []
+    for count in range(step, symbols + 1, step):
+        attempts.append([sorted(row[:min(count, limit)].tolist()) for row, limit in zip(order, finite)])
+    return attempts
+
+
+def decode_with_erasures(error_correction_code, error_detection_code, codewords, attempts):
+    """Dekodowanie RS najpierw bez wymazań, a dla słów nieprzechodzących detekcji - z kolejnymi zestawami wymazań.
+
+    Wynik dekodowania z wymazaniami jest przyjmowany tylko wtedy, gdy zgadza się suma kontrolna ramki
+    (przy wielu wymazaniach dekoder może zwrócić błędne słowo kodowe).
+    Zwraca (ramki, maska poprawnie zdekodowanych, maska słów poprawionych dzięki wymazaniom).
+    """
+    codewords = np.atleast_2d(np.asarray(codewords, dtype=np.uint8))
+    frames, rs_valid = error_correction_code.decode_batch(codewords)
+    _, checksum_valid = error_detection_code.decode_batch(frames)
+    rescued = np.zeros(len(codewords), dtype=bool)
+    pending = np.flatnonzero(~(rs_valid & checksum_valid))
+    for erase_pos in attempts:
+        rows = np.array([row for row in pending if len(erase_pos[row])], dtype=np.int64)
+        if not len(rows):
+            continue
+        decoded, valid = error_correction_code.decode_batch(codewords[rows], [erase_pos[row] for row in rows])
+        _, checksum_valid = error_detection_code.decode_batch(decoded)
+        accepted = valid & checksum_valid
+        frames[rows[accepted]] = decoded[accepted]
+        rs_valid[rows[accepted]] = True
+        rescued[rows[accepted]] = True
+        pending = np.setdiff1d(pending, rows[accepted])
+        if not len(pending):
+            break
+    return frames, rs_valid, rescued
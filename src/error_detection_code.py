@@ -1,9 +1,18 @@
 from abc import ABC, abstractmethod
-import zlib
-import crcmod
+import logging
+import numpy as np
+from bit_conversion import as_bit_array, bits_to_bytes, bytes_to_bits
+from crc import get_crc
+
+logger = logging.getLogger(__name__)
+
+# Tablica translacji bajtu na jego najmłodszy bit - parzystość liczona w C przez bytes.translate i bytes.count
+_LOW_BIT = bytes(range(2)) * 128
 
 
 class ErrorDetectionCode(ABC):
+    checksum_size = 1  # Długość sumy kontrolnej w bajtach
+
     @abstractmethod
     def encode(self, data):
         pass
@@ -24,52 +33,69 @@ class ErrorDetectionCode(ABC):
     def calculate_checksum(self, data):
         pass
 
+    @abstractmethod
+    def calculate_checksum_batch(self, frames):
+        pass
+
+    def encode_batch(self, frames):
+        """Kodowanie detekcyjne wielu ramek naraz (tablica 2-D uint8, jedna ramka na wiersz)."""
+        frames = np.asarray(frames, dtype=np.uint8)
+        checksums = self.calculate_checksum_batch(frames)
+        return np.hstack((frames, self._checksum_bytes(checksums)))
+
+    def decode_batch(self, frames):
+        """Dekodowanie detekcyjne wielu ramek naraz; zwraca dane ramek oraz maskę poprawności."""
+        frames = np.asarray(frames, dtype=np.uint8)
+        original_data = frames[:, :-self.checksum_size]
+        received_checksums = np.zeros(frames.shape[0], dtype=np.uint64)
+        for column in frames[:, -self.checksum_size:].T:
+            received_checksums = (received_checksums << np.uint64(8)) | column
+        valid = self.calculate_checksum_batch(original_data) == received_checksums
+        return original_data, valid
+
+    def _checksum_bytes(self, checksums):
+        """Zamienia sumy kontrolne na kolumny bajtów w kolejności big-endian."""
+        shifts = np.arange(self.checksum_size - 1, -1, -1, dtype=np.uint64) * np.uint64(8)
+        return ((checksums[:, None] >> shifts) & np.uint64(0xFF)).astype(np.uint8)
+
     @staticmethod
     def bits_to_bytes(bit_array):
         """Konwersja bitów na bajty."""
-        byte_array = bytearray()
-        for i in range(0, len(bit_array), 8):
-            byte = 0
-            for bit in bit_array[i:i + 8]:
-                byte = (byte << 1) | bit
-            byte_array.append(byte)
-        return bytes(byte_array)
+        return bits_to_bytes(bit_array)
 
     @staticmethod
     def bytes_to_bits(byte_array):
         """Konwersja bajtów na bity."""
-        bit_array = []
-        for byte in byte_array:
-            for i in range(7, -1, -1):
-                bit_array.append((byte >> i) & 1)
-        return bit_array
+        return bytes_to_bits(byte_array)
 
 
 class ParityCode(ErrorDetectionCode):
     def encode(self, data):
-        parity_bit = sum(data) % 2
+        parity_bit = self.calculate_checksum(data)
         return data + bytes([parity_bit])
 
     def decode(self, data):
         if not data:
-            print("Błąd: brak danych do dekodowania w ParityCode.")
+            logger.warning("Błąd: brak danych do dekodowania w ParityCode.")
             return None
         original_data, parity_bit = data[:-1], data[-1]
-        if sum(original_data) % 2 == parity_bit:
+        if self.calculate_checksum(original_data) == parity_bit:
             return original_data
         else:
-            print("Błąd detekcji w kodzie parzystości.")
+            logger.debug("Błąd detekcji w kodzie parzystości.")
             return None
 
     def encode_bits(self, bit_array):
         """Kodowanie detekcyjne dla bitów."""
-        parity_bit = sum(bit_array) % 2
-        return bit_array + [parity_bit]
+        bit_array = as_bit_array(bit_array)
+        parity_bit = self.calculate_checksum(bit_array)
+        return np.append(bit_array, np.uint8(parity_bit))
 
     def decode_bits(self, bit_array):
         """Dekodowanie detekcyjne dla bitów."""
-        if not bit_array:
-            print("Błąd: brak danych do dekodowania w ParityCode.")
+        bit_array = as_bit_array(bit_array)
+        if len(bit_array) == 0:
+            logger.warning("Błąd: brak danych do dekodowania w ParityCode.")
             return None
 
         original_data, parity_bit = bit_array[:-1], bit_array[-1]
@@ -77,115 +103,110 @@ class ParityCode(ErrorDetectionCode):
         if self.calculate_checksum(original_data) == parity_bit:
             return original_data
         else:
-            print("Błąd detekcji w kodzie parzystości.")
+            logger.debug("Błąd detekcji w kodzie parzystości.")
             return None
 
     def calculate_checksum(self, data):
-        return sum(data) % 2
+        # Parzystość sumy wartości = parzystość liczby bajtów nieparzystych
+        return bytes(data).translate(_LOW_BIT).count(1) & 1
+
+    def calculate_checksum_batch(self, frames):
+        return (np.bitwise_xor.reduce(frames, axis=1) & 1).astype(np.uint64)
+
+
+class CRCCode(ErrorDetectionCode):
+    """Kod CRC o parametrach zdefiniowanych w podklasie; tablice są wspólne dla wszystkich instancji."""
+    width = 8
+    poly = 0x07  # Wielomian bez najstarszego bitu
+    init_crc = 0
+    xor_out = 0
+    reflect = True
+
+    checksum_size = 1
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.checksum_size = (cls.width + 7) // 8
 
-class CRC8(ErrorDetectionCode):
     def __init__(self):
-        self.crc8_fun = crcmod.mkCrcFun(0x107, initCrc=0x00, xorOut=0x00)
+        self.crc = get_crc(self.width, self.poly, self.init_crc, self.xor_out, self.reflect)
 
     def encode(self, data):
         checksum = self.calculate_checksum(data)
-        # Dołączamy sumę kontrolną jako 1 bajt za pomocą to_bytes
-        return data + checksum.to_bytes(1, byteorder='big')
+        # Dołączamy sumę kontrolną w kolejności big-endian
+        return data + checksum.to_bytes(self.checksum_size, byteorder='big')
 
     def decode(self, data):
         # Rozdzielamy dane i sumę kontrolną
-        original_data, checksum = data[:-1], int.from_bytes(data[-1:], byteorder='big')
+        original_data = data[:-self.checksum_size]
+        checksum = int.from_bytes(data[-self.checksum_size:], byteorder='big')
         # Porównujemy obliczoną sumę kontrolną z przesłaną
         if self.calculate_checksum(original_data) == checksum:
             return original_data
         else:
-            print("Błąd detekcji CRC8.")
+            logger.debug("Błąd detekcji %s.", type(self).__name__)
             return None
 
     def encode_bits(self, bit_array):
-        """Zakoduj tablicę bitów za pomocą CRC8."""
+        """Zakoduj tablicę bitów za pomocą CRC."""
         byte_data = self.bits_to_bytes(bit_array)
         encoded_data = self.encode(byte_data)
         return self.bytes_to_bits(encoded_data)
 
     def decode_bits(self, bit_array):
-        """Dekoduj tablicę bitów za pomocą CRC8."""
+        """Dekoduj tablicę bitów za pomocą CRC."""
         byte_data = self.bits_to_bytes(bit_array)
         decoded_data = self.decode(byte_data)
         return self.bytes_to_bits(decoded_data) if decoded_data else None
 
     def calculate_checksum(self, data):
-        return self.crc8_fun(data)
+        return self.crc.checksum(data)
 
+    def calculate_checksum_batch(self, frames):
+        return self.crc.checksum_batch(frames)
 
-class CRC16(ErrorDetectionCode):
 
-    def __init__(self):
-        # Definicja wielomianu CRC-16: x^16 + x^12 + x^5 + 1
-        self.crc16_fun = crcmod.mkCrcFun(0x11021, initCrc=0x0000, xorOut=0x0000)
+class CRC8(CRCCode):
+    width = 8
+    poly = 0x07
 
-    def encode(self, data):
-        checksum = self.calculate_checksum(data)
-        return data + checksum.to_bytes(2, byteorder='big')
 
-    def decode(self, data):
-        # Oryginalne dane (wszystkie poza ostatnimi dwoma bajtami)
-        original_data = data[:-2]
-        # Sumę kontrolną odczytujemy z dwóch ostatnich bajtów
-        checksum = int.from_bytes(data[-2:], byteorder='big')  # Konwersja z 2 bajtów na liczbę całkowitą
-        # Sprawdzamy, czy obliczona suma zgadza się z przesłaną
-        if self.calculate_checksum(original_data) == checksum:
-            return original_data
-        else:
-            print("Błąd detekcji CRC16.")
-            return None
+class CRC16(CRCCode):
+    # Wielomian CRC-16: x^16 + x^12 + x^5 + 1
+    width = 16
+    poly = 0x1021
 
-    def encode_bits(self, bit_array):
-        """Zakoduj tablicę bitów za pomocą CRC16."""
-        byte_data = self.bits_to_bytes(bit_array)
-        encoded_data = self.encode(byte_data)
-        return self.bytes_to_bits(encoded_data)
 
-    def decode_bits(self, bit_array):
-        """Dekoduj tablicę bitów za pomocą CRC16."""
-        byte_data = self.bits_to_bytes(bit_array)
-        decoded_data = self.decode(byte_data)
-        return self.bytes_to_bits(decoded_data) if decoded_data else None
+class CRC24(CRCCode):
+    # CRC-24/OpenPGP (RFC 4880)
+    width = 24
+    poly = 0x864CFB
+    init_crc = 0xB704CE
+    reflect = False
 
-    def calculate_checksum(self, data):
-        return self.crc16_fun(data)
 
+class CRC32(CRCCode):
+    # Parametry zgodne z zlib.crc32
+    width = 32
+    poly = 0x04C11DB7
+    init_crc = 0xFFFFFFFF
+    xor_out = 0xFFFFFFFF
 
-class CRC32(ErrorDetectionCode):
-    def encode(self, data):
-        checksum = self.calculate_checksum(data)
-        # Dołączamy sumę kontrolną jako 4 bajty
-        return data + checksum.to_bytes(4, byteorder='big')
 
-    def decode(self, data):
-        # Oryginalne dane (wszystkie poza ostatnimi czterema bajtami)
-        original_data = data[:-4]
-        # Odczytujemy sumę kontrolną z 4 ostatnich bajtów
-        checksum = int.from_bytes(data[-4:], byteorder='big')
-        # Porównujemy obliczoną sumę kontrolną z przesłaną
-        if self.calculate_checksum(original_data) == checksum:
-            return original_data
-        else:
-            print("Błąd detekcji CRC32.")
-            return None
+class CRC64(CRCCode):
+    # CRC-64/XZ
+    width = 64
+    poly = 0x42F0E1EBA9EA3693
+    init_crc = 0xFFFFFFFFFFFFFFFF
+    xor_out = 0xFFFFFFFFFFFFFFFF
 
-    def encode_bits(self, bit_array):
-        """Zakoduj tablicę bitów za pomocą CRC32."""
-        byte_data = self.bits_to_bytes(bit_array)
-        encoded_data = self.encode(byte_data)
-        return self.bytes_to_bits(encoded_data)
 
-    def decode_bits(self, bit_array):
-        """Dekoduj tablicę bitów za pomocą CRC32."""
-        byte_data = self.bits_to_bytes(bit_array)
-        decoded_data = self.decode(byte_data)
-        return self.bytes_to_bits(decoded_data) if decoded_data else None
-
-    def calculate_checksum(self, data):
-        return zlib.crc32(data)
+# Dostępne kody detekcyjne według nazwy (konfiguracja nieinteraktywna)
+ERROR_DETECTION_CODES = {
+    "Parity": ParityCode,
+    "CRC8": CRC8,
+    "CRC16": CRC16,
+    "CRC24": CRC24,
+    "CRC32": CRC32,
+    "CRC64": CRC64,
+}
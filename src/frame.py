@@ -1,11 +1,122 @@
+import struct
+
+# Nagłówek ramki: numer pakietu (uint32), długość danych (uint16), długość sumy kontrolnej (uint8)
+# i liczba symboli korekcyjnych (uint8)
+HEADER = struct.Struct("<IHBB")
+
+
 class Frame:
-    def __init__(self, packet_num, data, encoding_info, checksum):
-        self.packet_num = packet_num      # Numer pakietu
-        self.data = data                  # Dane (np. fragment obrazu)
-        self.encoding_info = encoding_info # Informacje o kodowaniu
-        self.checksum = checksum          # Suma kontrolna (np. CRC)
+    """Ramka zapisana w buforze o stałym układzie, bez osobnych obiektów bytes na dane i sumę kontrolną.
+
+    Układ bufora: nagłówek | dane | suma kontrolna | symbole korekcyjne | obszar odbiorczy (ramka
+    i symbole korekcyjne odebrane z kanału). Właściwości zwracają widoki (memoryview) na fragmenty bufora.
+    """
+
+    __slots__ = ("buffer", "packet_size", "checksum_size", "parity_size", "encoding_info", "checksum")
+
+    def __init__(self, buffer, packet_size, checksum_size, parity_size=0, encoding_info=None):
+        self.buffer = buffer  # memoryview na bufor o długości Frame.frame_size(...)
+        self.packet_size = packet_size  # Maksymalna długość danych
+        self.checksum_size = checksum_size
+        self.parity_size = parity_size
+        self.encoding_info = encoding_info  # Informacje o kodowaniu (nazwa kodu detekcyjnego)
+        self.checksum = None  # Suma kontrolna (np. CRC)
 
     @staticmethod
-    def create_frame(packet_num, data, error_detection_code):
-        checksum = error_detection_code.calculate_checksum(data)
-        return Frame(packet_num, data, encoding_info=type(error_detection_code).__name__, checksum=checksum)
+    def frame_size(packet_size, checksum_size, parity_size=0):
+        return HEADER.size + 2 * (packet_size + checksum_size + parity_size)
+
+    @staticmethod
+    def create_frame(packet_num, data, error_detection_code, parity_size=0):
+        """Pojedyncza ramka z własnym buforem (poza pulą)."""
+        checksum_size = error_detection_code.checksum_size
+        buffer = memoryview(bytearray(Frame.frame_size(len(data), checksum_size, parity_size)))
+        frame = Frame(buffer, len(data), checksum_size, parity_size, type(error_detection_code).__name__)
+        frame.fill(packet_num, data, error_detection_code)
+        return frame
+
+    def fill(self, packet_num, data, error_detection_code):
+        """Zapisuje w miejscu nagłówek, dane i sumę kontrolną."""
+        length = len(data)
+        if length > self.packet_size:
+            raise ValueError(f"Pakiet ma {length} bajtów, a ramka mieści {self.packet_size}")
+        HEADER.pack_into(self.buffer, 0, packet_num, length, self.checksum_size, self.parity_size)
+        end = HEADER.size + length
+        self.buffer[HEADER.size:end] = data
+        self.checksum = error_detection_code.calculate_checksum(self.buffer[HEADER.size:end])
+        self.buffer[end:end + self.checksum_size] = self.checksum.to_bytes(self.checksum_size, byteorder="big")
+
+    @property
+    def packet_num(self):
+        return HEADER.unpack_from(self.buffer)[0]
+
+    @property
+    def length(self):
+        return HEADER.unpack_from(self.buffer)[1]
+
+    @property
+    def data(self):
+        return self.buffer[HEADER.size:HEADER.size + self.length]
+
+    @property
+    def encoded(self):
+        """Dane z sumą kontrolną - ramka wysyłana przy każdej próbie."""
+        return self.buffer[HEADER.size:HEADER.size + self.length + self.checksum_size]
+
+    @property
+    def parity(self):
+        start = HEADER.size + self.length + self.checksum_size
+        return self.buffer[start:start + self.parity_size]
+
+    @property
+    def codeword(self):
+        """Dane, suma kontrolna i symbole korekcyjne."""
+        return self.buffer[HEADER.size:HEADER.size + self.length + self.checksum_size + self.parity_size]
+
+    def encode_correction(self, error_correction_code):
+        """Zapisuje w miejscu symbole korekcyjne ramki; zwraca widok na nie."""
+        parity = self.parity
+        parity[:] = error_correction_code.encode(self.encoded)
+        return parity
+
+    def receive(self, transmitted_data, transmitted_parity=b""):
+        """Składa w obszarze odbiorczym ramkę i symbole korekcyjne odebrane z kanału; zwraca widok na całość."""
+        start = HEADER.size + self.packet_size + self.checksum_size + self.parity_size
+        middle = start + len(transmitted_data)
+        end = middle + len(transmitted_parity)
+        self.buffer[start:middle] = transmitted_data
+        self.buffer[middle:end] = transmitted_parity
+        return self.buffer[start:end]
+
+
+class FramePool:
+    """Pula ramek z buforami w jednym obszarze pamięci przydzielanym partiami; zwolnione ramki są używane ponownie."""
+
+    def __init__(self, error_detection_code, packet_size, parity_size=0, capacity=64):
+        self.error_detection_code = error_detection_code
+        self.packet_size = packet_size
+        self.parity_size = parity_size
+        self.frame_size = Frame.frame_size(packet_size, error_detection_code.checksum_size, parity_size)
+        self.allocated = 0
+        self.free = []
+        self._grow(capacity)
+
+    def _grow(self, count):
+        storage = memoryview(bytearray(count * self.frame_size))
+        encoding_info = type(self.error_detection_code).__name__
+        frames = [Frame(storage[i * self.frame_size:(i + 1) * self.frame_size], self.packet_size,
+                        self.error_detection_code.checksum_size, self.parity_size, encoding_info)
+                  for i in range(count)]
+        self.free.extend(reversed(frames))  # Pierwsze wydawane są ramki z początku obszaru
+        self.allocated += count
+
+    def acquire(self, packet_num, data):
+        """Wydaje ramkę z puli i zapisuje w niej pakiet; pula podwaja się, gdy brakuje wolnych ramek."""
+        if not self.free:
+            self._grow(max(1, self.allocated))
+        frame = self.free.pop()
+        frame.fill(packet_num, data, self.error_detection_code)
+        return frame
+
+    def release(self, frame):
+        self.free.append(frame)
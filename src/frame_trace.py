@@ -0,0 +1,31 @@
+import json
+import time
+
+
+class FrameTrace:
+    """Zapis przebiegu transmisji w formacie JSON Lines - jeden rekord na każdą próbę przesłania ramki."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+        self.start = time.perf_counter()
+
+    def record(self, packet_num, attempt, result, **fields):
+        """Zapisuje wynik próby: ok, corrected, rs_failed, edc_failed, out_of_order albo lost."""
+        entry = {
+            "time": round(time.perf_counter() - self.start, 6),
+            "packet": packet_num,
+            "attempt": attempt,
+            "result": result,
+        }
+        entry.update(fields)
+        self.file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
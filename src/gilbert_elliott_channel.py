@@ -1,61 +1,115 @@
-import random
+import math
+import numpy as np
+from bit_conversion import as_bit_array, as_byte_array
+from seeding import generator
 
 
 class GilbertElliottChannel:
-    def __init__(self, good_to_bad, bad_to_good, good_error_prob, bad_error_prob):
+    def __init__(self, good_to_bad, bad_to_good, good_error_prob, bad_error_prob, seed=None):
         # Inicjalizacja kanału i parametrów przejść
         self.good_to_bad = good_to_bad
         self.bad_to_good = bad_to_good
         self.good_error_prob = good_error_prob
         self.bad_error_prob = bad_error_prob
+        self.rng = generator(seed, "channel")
         self.state = "good"  # Początkowy stan kanału
         self.good_state_count = 0  # Licznik czasu w stanie dobrym
         self.bad_state_count = 0  # Licznik czasu w stanie złym
 
+    def _sojourn_times(self, leave_prob, size, limit):
+        """Losuje długości pobytu w stanie (liczba symboli przed zmianą stanu)."""
+        if leave_prob <= 0:
+            return np.full(size, limit, dtype=np.int64)
+        return np.minimum(self.rng.geometric(leave_prob, size), limit)
+
+    def _generate_states(self, length):
+        """Generuje sekwencję stanów kanału (True = stan zły) dla kolejnych symboli."""
+        states = np.empty(length, dtype=bool)
+        position = 0
+        while position < length:
+            remaining = length - position
+            bad = self.state == "bad"
+            leave_current = self.bad_to_good if bad else self.good_to_bad
+            leave_other = self.good_to_bad if bad else self.bad_to_good
+
+            # Szacowana liczba par pobytów (obecny stan + przeciwny) potrzebna do pokrycia reszty danych
+            mean_cycle = sum(1 / p if p > 0 else remaining for p in (leave_current, leave_other))
+            pairs = int(remaining / mean_cycle) + 16
+
+            runs = np.empty(2 * pairs, dtype=np.int64)
+            # Ograniczenie do remaining + 1 zachowuje informację, że pobyt wykracza poza koniec danych
+            runs[0::2] = self._sojourn_times(leave_current, pairs, remaining + 1)
+            runs[1::2] = self._sojourn_times(leave_other, pairs, remaining + 1)
+            run_flags = np.empty(2 * pairs, dtype=bool)
+            run_flags[0::2] = bad
+            run_flags[1::2] = not bad
+
+            run_ends = np.cumsum(runs)
+            last = int(np.searchsorted(run_ends, remaining))
+            if last == len(runs):
+                # Pobyty nie pokryły całych danych - parzysta liczba pobytów kończy się w stanie wyjściowym
+                states[position:position + run_ends[-1]] = np.repeat(run_flags, runs)
+                position += int(run_ends[-1])
+                continue
+
+            # Ostatni pobyt jest przycinany; jeśli kończy się dokładnie na końcu danych, kanał zmienia stan
+            runs = runs[:last + 1].copy()
+            overshoot = int(run_ends[last]) - remaining
+            runs[-1] -= overshoot
+            states[position:] = np.repeat(run_flags[:last + 1], runs)
+            last_bad = bool(run_flags[last])
+            if overshoot == 0:
+                last_bad = not last_bad
+            self.state = "bad" if last_bad else "good"
+            position = length
+        return states
+
+    def _error_mask(self, length):
+        """Wyznacza maskę błędów dla kolejnych symboli i aktualizuje statystyki stanów; zwraca maskę i stany."""
+        states = self._generate_states(length)
+        bad_count = int(np.count_nonzero(states))
+        self.bad_state_count += bad_count
+        self.good_state_count += length - bad_count
+        error_probs = np.where(states, self.bad_error_prob, self.good_error_prob)
+        return self.rng.random(length) < error_probs, states
+
+    def _corrupt(self, byte_data):
+        """Przekłamuje bajty zgodnie z maską błędów; zwraca odebrane bajty (tablica) i stany kanału."""
+        errors, states = self._error_mask(len(byte_data))
+        # Przekłamanie bajtu losową niezerową maską bitową, jeśli wystąpił błąd
+        noise = self.rng.integers(1, 256, size=len(byte_data), dtype=np.uint8)
+        return byte_data ^ np.where(errors, noise, np.uint8(0)), states
+
+    def _state_reliability(self, states):
+        """Wiarygodność bajtów log((1 - p) / p); p - prawdopodobieństwo błędu w stanie, w którym je wysłano."""
+        reliability = [math.inf if p <= 0 else -math.inf if p >= 1 else math.log((1 - p) / p)
+                       for p in (self.good_error_prob, self.bad_error_prob)]
+        return np.where(states, np.float32(reliability[1]), np.float32(reliability[0]))
+
     def transmit(self, data):
-        transmitted_data = bytearray()
-        for byte in data:
-            if self.state == "good":
-                self.good_state_count += 1
-                if random.random() < self.good_error_prob:
-                    corrupted_byte = byte ^ random.randint(1, 255)
-                    transmitted_data.append(corrupted_byte)  # Przełącz bit, jeśli jest błąd
-                else:
-                    transmitted_data.append(byte)
-                if random.random() < self.good_to_bad:
-                    self.state = "bad"
-            else:  # Stan zły
-                self.bad_state_count += 1
-                if random.random() < self.bad_error_prob:
-                    corrupted_byte = byte ^ random.randint(1, 255)
-                    transmitted_data.append(corrupted_byte)  # Przełącz bit, jeśli jest błąd
-                else:
-                    transmitted_data.append(byte)
-                if random.random() < self.bad_to_good:
-                    self.state = "good"
-        return bytes(transmitted_data)
+        return self._corrupt(as_byte_array(data))[0].tobytes()
+
+    def transmit_reliability(self, data):
+        """Przesyłanie bajtów; zwraca odebrane bajty oraz wiarygodność każdego z nich (stan kanału)."""
+        transmitted_data, states = self._corrupt(as_byte_array(data))
+        return transmitted_data.tobytes(), self._state_reliability(states)
+
+    def transmit_batch(self, frames):
+        """Przesyłanie wielu ramek naraz; zwraca tablicę o kształcie frames."""
+        frames = np.asarray(frames, dtype=np.uint8)
+        return self._corrupt(frames.reshape(-1))[0].reshape(frames.shape)
+
+    def transmit_batch_reliability(self, frames):
+        """Przesyłanie wielu ramek naraz; zwraca tablicę o kształcie frames i wiarygodność jej bajtów."""
+        frames = np.asarray(frames, dtype=np.uint8)
+        transmitted_frames, states = self._corrupt(frames.reshape(-1))
+        return transmitted_frames.reshape(frames.shape), self._state_reliability(states).reshape(frames.shape)
 
     def transmit_bits(self, bit_data):
         """Przesyłanie danych bitowych przez kanał."""
-        transmitted_bits = []
-        for bit in bit_data:
-            if self.state == "good":
-                self.good_state_count += 1
-                if random.random() < self.good_error_prob:
-                    transmitted_bits.append(1 - bit)  # Zamiana bitu
-                else:
-                    transmitted_bits.append(bit)
-                if random.random() < self.good_to_bad:
-                    self.state = "bad"
-            else:  # Stan zły
-                self.bad_state_count += 1
-                if random.random() < self.bad_error_prob:
-                    transmitted_bits.append(1 - bit)
-                else:
-                    transmitted_bits.append(bit)
-                if random.random() < self.bad_to_good:
-                    self.state = "good"
-        return transmitted_bits
+        bit_data = as_bit_array(bit_data)
+        errors, _ = self._error_mask(len(bit_data))
+        return bit_data ^ errors.astype(np.uint8)  # Zamiana bitu
 
     def get_channel_statistics(self):
         total = self.good_state_count + self.bad_state_count
@@ -0,0 +1,171 @@
+import json
+import time
+import numpy as np
+from awgn_channel import AWGNChannel
+from error_detection_code import ERROR_DETECTION_CODES
+from monte_carlo import MonteCarloSimulation
+from run_simulation import build_parser, build_pipeline, build_scenario, configure_logging
+
+
+def transition_matrix(good_to_bad, bad_to_good):
+    """Macierz przejść łańcucha stanów kanału (0 - stan dobry, 1 - stan zły) między kolejnymi symbolami."""
+    return np.array([[1 - good_to_bad, good_to_bad], [bad_to_good, 1 - bad_to_good]])
+
+
+def stationary_distribution(good_to_bad, bad_to_good):
+    total = good_to_bad + bad_to_good
+    if total == 0:
+        return np.array([1.0, 0.0])  # Kanał nie zmienia stanu - pozostaje w stanie początkowym (dobrym)
+    return np.array([bad_to_good, good_to_bad]) / total
+
+
+def error_count_distribution(transition, error_probs, length, max_errors):
+    """Rozkład liczby przekłamanych symboli w bloku length symboli (rekurencja w przód po łańcuchu Markowa).
+
+    Zwraca tablicę [stan przed blokiem, stan po bloku, liczba błędów] o długości ostatniej osi max_errors + 2;
+    ostatnia pozycja obejmuje wszystkie bloki z więcej niż max_errors błędami.
+    Tak jak w GilbertElliottChannel, stan przed i po bloku to stan kanału dla następnego symbolu.
+    """
+    error_probs = np.asarray(error_probs, dtype=float)
+    correct = (1 - error_probs)[:, None] * transition  # Symbol bez błędu, a potem przejście stanu
+    wrong = error_probs[:, None] * transition
+    distribution = np.zeros((2, 2, max_errors + 2))
+    distribution[0, 0, 0] = distribution[1, 1, 0] = 1.0
+    shifted = np.zeros_like(distribution)
+    for _ in range(length):
+        shifted[:, :, 1:] = distribution[:, :, :-1]
+        shifted[:, :, -1] += distribution[:, :, -1]
+        distribution = (np.einsum("ask,sb->abk", distribution, correct)
+                        + np.einsum("ask,sb->abk", shifted, wrong))
+    return distribution
+
+
+def estimate_transmission(good_to_bad, bad_to_good, good_error_prob, bad_error_prob, packet_size=64, symbols=10,
+                          checksum_size=4, max_retries=10):
+    """Dokładne prawdopodobieństwa przebiegu transmisji Hybrid ARQ (jak Pipeline.transmit_data) w kanale G-E.
+
+    Symbolem kanału jest bajt. Pakiet jest poprawiany kodem RS, gdy błędów w ramce i symbolach korekcyjnych
+    jest najwyżej symbols // 2; detekcja błędów jest traktowana jako idealna (bez błędów niewykrytych).
+    Kolejność symboli odpowiada Pipeline: pierwsza próba wszystkich pakietów jest wysyłana wsadowo, więc
+    ramka i jej symbole korekcyjne są od siebie odległe (niezależne, stan stacjonarny); kolejne próby pakietu
+    następują bezpośrednio po sobie, więc zależność między nimi wynika z łańcucha stanów.
+    Wynik retransmission_probabilities ma znaczenie indeksów jak retransmission_counts w wynikach symulacji.
+    """
+    if max_retries < 1:
+        raise ValueError("Liczba prób musi być dodatnia")
+    transition = transition_matrix(good_to_bad, bad_to_good)
+    error_probs = (good_error_prob, bad_error_prob)
+    start = stationary_distribution(good_to_bad, bad_to_good)
+    frame_length = packet_size + checksum_size
+    correctable = symbols // 2
+
+    frame = error_count_distribution(transition, error_probs, frame_length, correctable)
+    parity = error_count_distribution(transition, error_probs, symbols, correctable)
+    codeword = error_count_distribution(transition, error_probs, frame_length + symbols, correctable)
+
+    # Macierze przejść stanu kanału dla wyniku jednej próby (ramka, a po błędzie detekcji symbole korekcyjne)
+    ok = frame[:, :, 0]
+    parity_within = np.cumsum(parity, axis=2)  # Najwyżej k błędów w symbolach korekcyjnych
+    corrected = sum((frame[:, :, errors] @ parity_within[:, :, correctable - errors]
+                     for errors in range(1, correctable + 1)), start=np.zeros((2, 2)))
+    failed = (frame.sum(axis=2) - ok) @ parity.sum(axis=2) - corrected
+
+    delivered_ok = np.zeros(max_retries + 1)  # Indeks - numer próby
+    delivered_corrected = np.zeros(max_retries + 1)
+    delivered_ok[1] = start @ ok.sum(axis=1)
+    parity_start = start @ parity_within.sum(axis=1)  # Symbole korekcyjne wysłane osobno, od stanu stacjonarnego
+    delivered_corrected[1] = sum((start @ frame[:, :, errors].sum(axis=1)) * parity_start[correctable - errors]
+                                 for errors in range(1, correctable + 1))
+    state = start * (1 - delivered_ok[1] - delivered_corrected[1])
+    for attempt in range(2, max_retries + 1):
+        delivered_ok[attempt] = state @ ok.sum(axis=1)
+        delivered_corrected[attempt] = state @ corrected.sum(axis=1)
+        state = state @ failed
+    lost = float(state.sum())
+
+    retransmission_probabilities = np.zeros(max_retries + 2)
+    retransmission_probabilities[:-1] += delivered_ok
+    retransmission_probabilities[1:] += delivered_corrected  # Poprawienie kodem RS liczy się jak kolejna próba
+    attempts = np.arange(max_retries + 1)
+    expected_attempts = float(attempts @ (delivered_ok + delivered_corrected)) + lost * max_retries
+    expected_transmissions = float(np.arange(max_retries + 2) @ retransmission_probabilities) + lost * max_retries
+    return {
+        "packet_error_probability": float(1 - start @ ok.sum(axis=1)),
+        "rs_failure_probability": float(start @ codeword[:, :, -1].sum(axis=1)),
+        "bad_state_probability": float(start[1]),
+        "retransmission_probabilities": retransmission_probabilities.tolist(),
+        "residual_error_rate": lost,
+        "expected_attempts": expected_attempts,
+        "expected_retransmissions": expected_attempts - 1,
+        "expected_transmissions": expected_transmissions,
+        "throughput": (1 - lost) / expected_transmissions,
+    }
+
+
+def estimate_scenario(scenario):
+    """Estymacja dla scenariusza run_simulation; kanały BSC i AWGN są traktowane jak G-E bez zmian stanu."""
+    if scenario.get("arq", "stop_and_wait") != "stop_and_wait":
+        raise ValueError("Estymacja analityczna dotyczy tylko protokołu stop-and-wait")
+    if scenario.get("staged"):
+        raise ValueError("Estymacja analityczna nie uwzględnia potoku etapów (staged)")
+    if scenario.get("adaptive"):
+        raise ValueError("Estymacja analityczna nie uwzględnia adaptacji łącza")
+    if scenario.get("erasures") is not None:
+        raise ValueError("Estymacja analityczna nie uwzględnia dekodowania z wymazaniami")
+    if scenario.get("interleaver") is not None:
+        raise ValueError("Estymacja analityczna nie uwzględnia przeplotu")
+    if scenario.get("ecc", "RS") != "RS":
+        raise ValueError("Estymacja analityczna dotyczy tylko kodu Reed-Solomon")
+    channel = scenario["channel"]
+    if channel["type"] == "GilbertElliott":
+        params = (channel.get("good_to_bad", 0.05), channel.get("bad_to_good", 0.1),
+                  channel.get("good_error_prob", 0.01), channel.get("bad_error_prob", 0.2))
+    else:
+        if channel["type"] == "AWGN":
+            ber = AWGNChannel(channel.get("ebn0_db", 6.0), channel.get("modulation", "BPSK"),
+                              channel.get("code_rate", 1.0)).bit_error_probability()
+        else:
+            ber = channel.get("ber", 0.1)
+        byte_error_prob = 1 - (1 - ber) ** 8  # Symbolem kanału jest bajt
+        params = (0.0, 0.0, byte_error_prob, byte_error_prob)
+    return estimate_transmission(*params, packet_size=scenario["packet_size"], symbols=scenario["rs_symbols"],
+                                 checksum_size=ERROR_DETECTION_CODES[scenario["edc"]].checksum_size,
+                                 max_retries=scenario["max_retries"])
+
+
+def cross_validate(scenario, max_packets=200_000, target_relative_ci=0.02, confidence=0.99):
+    """Porównuje estymację z symulacją Monte-Carlo; zwraca obie wartości i informację o zgodności."""
+    start = time.perf_counter()
+    estimate = estimate_scenario(scenario)
+    estimate_time = time.perf_counter() - start
+    simulation = MonteCarloSimulation(build_pipeline(scenario), confidence=confidence,
+                                      target_relative_ci=target_relative_ci, max_packets=max_packets,
+                                      seed=scenario["channel"].get("seed")).run()
+    comparison = {}
+    for name, simulated, interval in (
+            ("packet_error_probability", "packet_error_rate", "packet_error_rate_ci"),
+            ("throughput", "throughput", "throughput_ci")):
+        low, high = simulation[interval]
+        comparison[name] = {
+            "estimate": estimate[name],
+            "simulation": simulation[simulated],
+            "interval": [low, high],
+            "consistent": low <= estimate[name] <= high,
+        }
+    return {"estimate_time": estimate_time, "simulation_time": simulation["elapsed"],
+            "packets": simulation["packets"], "comparison": comparison}
+
+
+def main(argv=None):
+    parser = build_parser(description="Analityczna estymacja stopy błędów pakietów i retransmisji (bez symulacji).")
+    parser.add_argument("--validate", action="store_true", help="porównaj z symulacją Monte-Carlo")
+    parser.add_argument("--max-packets", type=int, default=200_000, help="limit pakietów symulacji przy --validate")
+    args = parser.parse_args(argv)
+    configure_logging(args.verbose)
+    scenario = build_scenario(args)
+    results = cross_validate(scenario, args.max_packets) if args.validate else estimate_scenario(scenario)
+    print(json.dumps({"scenario": scenario, "results": results}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
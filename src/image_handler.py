@@ -1,5 +1,12 @@
 from PIL import Image
+import contextlib
 import io
+import logging
+import os
+import tempfile
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 
 class ImageHandler:
@@ -9,11 +16,11 @@ class ImageHandler:
     def image_to_bytes(self):
         """Konwertuje obraz na bajty."""
         with Image.open(self.image_path) as img:
-            print(f"Wymiary oryginalnego obrazu: {img.size}, Format: {img.format}")  # debug print
+            logger.debug("Wymiary oryginalnego obrazu: %s, Format: %s", img.size, img.format)
             with io.BytesIO() as byte_io:
                 img.save(byte_io, format="bmp")  # Zapis obrazu jako png
                 data = byte_io.getvalue()  # debug statement
-                print(f"Rozmiar danych BMP: {len(data)} bajtów")  # debug print
+                logger.debug("Rozmiar danych BMP: %d bajtów", len(data))
                 return byte_io.getvalue()  # Zwraca bajty obrazu
 
     # def image_to_bytes(self):
@@ -26,3 +33,41 @@ class ImageHandler:
         with io.BytesIO(byte_data) as byte_io:
             img = Image.open(byte_io)
             img.save(output_path)
+
+    @contextlib.contextmanager
+    def open_pixel_data(self):
+        """Mapuje plik BMP do pamięci; zwraca (nagłówek, dane pikseli) bez wczytywania całego pliku.
+
+        Obrazy w innych formatach są najpierw jednorazowo konwertowane do tymczasowego pliku BMP.
+        """
+        path = self.image_path
+        temporary_path = None
+        with open(path, "rb") as file:
+            is_bmp = file.read(2) == b"BM"
+        if not is_bmp:
+            fd, temporary_path = tempfile.mkstemp(suffix=".bmp")
+            os.close(fd)
+            with Image.open(path) as img:
+                img.save(temporary_path, format="bmp")
+            path = temporary_path
+
+        try:
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+            pixel_offset = int.from_bytes(data[10:14].tobytes(), byteorder="little")  # Pole bfOffBits
+            yield data[:pixel_offset].tobytes(), data[pixel_offset:]
+        finally:
+            if temporary_path is not None:
+                os.remove(temporary_path)
+
+    @staticmethod
+    def iter_packets(pixel_data, packet_size):
+        """Generator kolejnych pakietów danych pikseli."""
+        for i in range(0, len(pixel_data), packet_size):
+            yield pixel_data[i:i + packet_size]
+
+    @staticmethod
+    def create_output_image(output_path, header, pixel_data_size):
+        """Tworzy plik wyjściowy o docelowym rozmiarze i mapuje go do pamięci; nagłówek jest zapisywany od razu."""
+        output = np.memmap(output_path, dtype=np.uint8, mode="w+", shape=(len(header) + pixel_data_size,))
+        output[:len(header)] = np.frombuffer(header, dtype=np.uint8)
+        return output
@@ -0,0 +1,201 @@
+import contextlib
+import logging
+import numpy as np
+from reed_solomon import ReedSolomonCodec
+from seeding import generator
+
+logger = logging.getLogger(__name__)
+
+
+def combine_copies(copies):
+    """Łączy odebrane kopie tych samych bajtów głosowaniem większościowym bitów (remis - najnowsza kopia)."""
+    if len(copies) == 1:
+        return copies[0]
+    bits = np.unpackbits(np.stack(copies), axis=-1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2
+    majority = (votes > len(copies)) | ((votes == len(copies)) & bits[-1].astype(bool))
+    return np.packbits(majority, axis=-1)
+
+
+def disagreement(copies):
+    """Maska bajtów, w których odebrane kopie się różnią (kandydaci na wymazania)."""
+    if len(copies) == 1:
+        return np.zeros(copies[0].shape, dtype=bool)
+    return (np.stack(copies[1:]) != copies[0]).any(axis=0)
+
+
+class IncrementalRedundancyHARQ:
+    """Hybrydowe ARQ typu II z nadmiarowością przyrostową (IR) i łączeniem kopii (chase combining).
+
+    Pierwsza próba to ramka z sumą kontrolną. Każda kolejna próba wysyła tylko następny blok increment
+    symboli korekcyjnych kodu RS o parity_symbols symbolach; symbole jeszcze nieodebrane są dla dekodera
+    wymazaniami, więc każdy blok zwiększa zdolność korekcyjną bez ponownego wysyłania danych.
+    Po wysłaniu wszystkich bloków cykl zaczyna się od nowa, a powtórzone kopie danych i symboli są łączone
+    głosowaniem większościowym. Bajty, w których kopie się różnią, mogą zostać dodatkowo uznane za wymazania.
+    """
+
+    def __init__(self, channel, error_detection_code, parity_symbols=32, increment=8, max_retries=10,
+                 seed=None, frame_trace=None, metrics=None):
+        if not 0 < increment <= parity_symbols:
+            raise ValueError("Rozmiar bloku symboli korekcyjnych musi być z zakresu 1-parity_symbols")
+        self.channel = channel
+        self.error_detection_code = error_detection_code
+        self.codec = ReedSolomonCodec(parity_symbols)
+        self.parity_symbols = parity_symbols
+        self.increment = increment
+        self.blocks = -(-parity_symbols // increment)  # Liczba bloków symboli korekcyjnych w jednym cyklu
+        self.max_retries = max_retries
+        self.rng = generator(seed, "noise")  # Szum w miejsce utraconych pakietów
+        self.frame_trace = frame_trace
+        self.metrics = metrics  # Opcjonalne liczniki i czasy etapów (MetricsCollector)
+
+    def transmit_data(self, data, packet_size, first_packet_num=1):
+        """Przesyła dane pakietami; zwraca odebrane dane i statystyki, w tym liczbę przesłanych bajtów."""
+        data = np.frombuffer(bytes(data), dtype=np.uint8)
+        full_packets = len(data) // packet_size
+        groups = [(0, data[:full_packets * packet_size].reshape(full_packets, packet_size))]
+        if len(data) % packet_size:
+            groups.append((full_packets, data[full_packets * packet_size:][None, :]))  # Krótszy ostatni pakiet
+
+        received = np.empty_like(data)
+        retransmission_counts = [0] * (self.max_retries + 2)
+        errors_detected = 0
+        transmitted_bytes = 0
+        first_attempt_bytes = 0
+        for start, packets in groups:
+            if not len(packets):
+                continue
+            decoded, attempts, sent = self._transmit_group(packets, first_packet_num + start)
+            transmitted_bytes += sent
+            first_attempt_bytes += len(packets) * (packets.shape[1] + self.error_detection_code.checksum_size)
+            lost = attempts == 0
+            errors_detected += int(np.count_nonzero(lost))
+            for attempt, count in zip(*np.unique(attempts[~lost], return_counts=True)):
+                retransmission_counts[int(attempt)] += int(count)
+            decoded[lost] = self.rng.integers(0, 256, size=(int(lost.sum()), packets.shape[1]),
+                                              dtype=np.uint8)  # Szum zamiast utraconych
+            offset = start * packet_size
+            received[offset:offset + decoded.size] = decoded.reshape(-1)
+
+        packets_count = -(-len(data) // packet_size)
+        delivered = packets_count - errors_detected
+        retransmitted_bytes = transmitted_bytes - first_attempt_bytes
+        results = {
+            "packets": packets_count,
+            "packet_size": packet_size,
+            "errors_detected": errors_detected,
+            "retransmission_counts": retransmission_counts,
+            "transmitted_bytes": transmitted_bytes,
+            "retransmitted_bytes": retransmitted_bytes,
+            "retransmitted_bytes_per_packet": retransmitted_bytes / delivered if delivered else None,
+            "channel_statistics": None,
+        }
+        return received.tobytes(), results
+
+    def _transmit_group(self, packets, first_packet_num):
+        """Transmisja pakietów jednej długości; wszystkie aktywne pakiety przechodzą kolejne próby równolegle.
+
+        Zwraca (zdekodowane dane, numer udanej próby lub 0 dla utraconych, liczba przesłanych bajtów).
+        """
+        with self._stage("edc_encode", len(packets)):
+            frames = self.error_detection_code.encode_batch(packets)
+        with self._stage("rs_encode", len(packets)):
+            parity = self.codec.parity_batch(frames)
+        decoded = np.zeros_like(packets)
+        attempts = np.zeros(len(packets), dtype=np.int64)
+        active = np.arange(len(packets))
+        data_copies = []
+        parity_copies = [[] for _ in range(self.blocks)]
+        sent = 0
+
+        for attempt in range(1, self.max_retries + 1):
+            step = (attempt - 1) % (self.blocks + 1)  # 0 - dane, 1..blocks - kolejne bloki symboli korekcyjnych
+            if step == 0:
+                payload = frames[active]
+                data_copies.append(self._channel_transmit(payload))
+            else:
+                block = slice((step - 1) * self.increment, min(step * self.increment, self.parity_symbols))
+                payload = parity[active, block]
+                parity_copies[step - 1].append(self._channel_transmit(payload))
+            sent += payload.size
+
+            with self._stage("rs_decode", len(active)):
+                messages, valid, corrected = self._decode(data_copies, parity_copies)
+            if self.metrics is not None:
+                self.metrics.count("frames_delivered", np.count_nonzero(valid))
+                self.metrics.count("rs_corrections", np.count_nonzero(corrected))
+                self.metrics.count("undetected_errors",
+                                   np.count_nonzero((messages[valid] != packets[active[valid]]).any(axis=1)))
+            if self.frame_trace is not None:
+                for row, index in enumerate(active):
+                    result = ("corrected" if corrected[row] else "ok") if valid[row] else "edc_failed"
+                    self.frame_trace.record(first_packet_num + int(index), attempt, result)
+            decoded[active[valid]] = messages[valid]
+            attempts[active[valid]] = attempt
+
+            keep = ~valid
+            active = active[keep]
+            if not len(active):
+                break
+            data_copies = [copy[keep] for copy in data_copies]
+            parity_copies = [[copy[keep] for copy in copies] for copies in parity_copies]
+
+        if self.frame_trace is not None:
+            for index in active:
+                self.frame_trace.record(first_packet_num + int(index), self.max_retries, "lost")
+        if self.metrics is not None:
+            self.metrics.count("frames_lost", len(active))
+        return decoded, attempts, sent
+
+    def _stage(self, stage, frames=1):
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.time(stage, frames)
+
+    def _channel_transmit(self, payload):
+        with self._stage("channel", len(payload)):
+            transmitted = self.channel.channel_transmit_batch(payload)
+        if self.metrics is not None:
+            self.metrics.count_channel(payload, transmitted)
+        return transmitted
+
+    def _decode(self, data_copies, parity_copies):
+        """Dekoduje połączone kopie; zwraca (dane bez sumy kontrolnej, maska poprawnych, maska poprawionych)."""
+        data = combine_copies(data_copies)
+        messages, valid = self.error_detection_code.decode_batch(data)
+        corrected = np.zeros(len(data), dtype=bool)
+        received_blocks = [copies for copies in parity_copies if copies]
+        if not received_blocks or valid.all():
+            return messages, valid, corrected
+
+        # Słowo kodowe z dotychczas odebranymi symbolami korekcyjnymi; brakujące symbole są wymazaniami
+        rows = np.flatnonzero(~valid)
+        parity = np.zeros((len(rows), self.parity_symbols), dtype=np.uint8)
+        unreliable = np.zeros((len(rows), data.shape[1] + self.parity_symbols), dtype=bool)
+        unreliable[:, :data.shape[1]] = disagreement([copy[rows] for copy in data_copies])
+        position = 0
+        for copies in received_blocks:
+            block = [copy[rows] for copy in copies]
+            width = block[0].shape[1]
+            parity[:, position:position + width] = combine_copies(block)
+            unreliable[:, data.shape[1] + position:data.shape[1] + position + width] = disagreement(block)
+            position += width
+        codewords = np.hstack((data[rows], parity))
+        missing = list(range(data.shape[1] + position, codewords.shape[1]))
+
+        rs_messages, rs_valid, _ = self.codec.decode_batch(codewords, [missing] * len(rows))
+        # Druga próba dla nieudanych: bajty, w których kopie się różnią, również jako wymazania
+        for row in np.flatnonzero(~rs_valid):
+            erasures = np.flatnonzero(unreliable[row]).tolist()
+            if erasures and len(erasures) + len(missing) <= self.parity_symbols:
+                retry, retry_valid, _ = self.codec.decode_batch(codewords[row:row + 1], [missing + erasures])
+                rs_messages[row] = retry[0]
+                rs_valid[row] = retry_valid[0]
+
+        rs_data, checksum_valid = self.error_detection_code.decode_batch(rs_messages)
+        rs_valid &= checksum_valid
+        messages = messages.copy()  # Widok na odebraną kopię danych - nie może zostać nadpisany
+        messages[rows[rs_valid]] = rs_data[rs_valid]
+        valid[rows[rs_valid]] = True
+        corrected[rows[rs_valid]] = True
+        return messages, valid, corrected
@@ -0,0 +1,103 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+import numpy as np
+
+INTERLEAVERS = ("block", "convolutional")
+
+
+@lru_cache(maxsize=64)
+def _block_positions(depth, count, length):
+    """Pozycje w strumieniu kanału kolejnych bajtów wsadu count ramek po length bajtów (przeplot blokowy)."""
+    rows = np.arange(count)[:, None]
+    columns = np.arange(length)[None, :]
+    group = rows // depth
+    group_rows = np.minimum(depth, count - group * depth)  # Ostatnia grupa może mieć mniej ramek
+    positions = (group * depth * length + columns * group_rows + rows % depth).reshape(-1)
+    positions.flags.writeable = False
+    return positions
+
+
+@lru_cache(maxsize=64)
+def _convolutional_positions(branches, delay, size):
+    """Pozycje w strumieniu kanału kolejnych bajtów dla przeplotu splotowego (Forneya)."""
+    index = np.arange(size)
+    positions = index + (index % branches) * delay * branches
+    positions.flags.writeable = False
+    return positions
+
+
+class Interleaver(ABC):
+    """Przeplot bajtów wsadu ramek przed kanałem, rozpraszający paczki błędów na wiele ramek.
+
+    Przeplot i rozplot to indeksowanie tablicą pozycji liczoną raz dla danego kształtu wsadu.
+    """
+
+    @abstractmethod
+    def positions(self, shape):
+        """Pozycje w strumieniu kanału kolejnych bajtów wsadu o kształcie shape."""
+
+    def stream_length(self, shape):
+        """Liczba bajtów przesyłanych kanałem dla wsadu o kształcie shape (z dopełnieniem)."""
+        return int(np.prod(shape))
+
+    def interleave(self, frames):
+        """Wsad ramek (tablica 2-D) jako jeden strumień bajtów w kolejności nadawania."""
+        frames = np.asarray(frames, dtype=np.uint8)
+        stream = np.zeros(self.stream_length(frames.shape), dtype=np.uint8)
+        stream[self.positions(frames.shape)] = frames.reshape(-1)
+        return stream
+
+    def deinterleave(self, stream, shape):
+        """Odtwarza wsad ramek o kształcie shape ze strumienia odebranego z kanału (także wiarygodności bajtów)."""
+        return np.asarray(stream)[self.positions(shape)].reshape(shape)
+
+
+class BlockInterleaver(Interleaver):
+    """Przeplot blokowy: grupa depth ramek jest zapisywana wierszami, a wysyłana kolumnami.
+
+    Paczka błędów o długości b bajtów trafia do depth ramek, po około b / depth bajtów w każdej.
+    """
+
+    def __init__(self, depth):
+        if depth < 1:
+            raise ValueError("Głębokość przeplotu musi być dodatnia")
+        self.depth = depth
+
+    def positions(self, shape):
+        return _block_positions(self.depth, *shape)
+
+
+class ConvolutionalInterleaver(Interleaver):
+    """Przeplot splotowy: bajt trafia do gałęzi (numer mod branches) opóźniającej o numer gałęzi * delay bajtów.
+
+    Sąsiednie bajty strumienia są odległe o co najmniej delay * branches - 1 pozycji wejściowych, przy
+    mniejszym opóźnieniu niż w przeplocie blokowym o tym samym rozproszeniu. Domyślne opóźnienie
+    (delay=None) wynika z długości ramki, tak aby sąsiednie bajty strumienia należały do różnych ramek.
+    Strumień jest dopełniany (branches - 1) * delay * branches bajtami, które są przesyłane, ale nie niosą danych.
+    """
+
+    def __init__(self, branches, delay=None):
+        if branches < 1 or (delay is not None and delay < 1):
+            raise ValueError("Liczba gałęzi i opóźnienie przeplotu muszą być dodatnie")
+        self.branches = branches
+        self.delay = delay
+
+    def _delay(self, shape):
+        if self.delay is not None:
+            return self.delay
+        return -(-(shape[-1] + 1) // self.branches)
+
+    def positions(self, shape):
+        return _convolutional_positions(self.branches, self._delay(shape), int(np.prod(shape)))
+
+    def stream_length(self, shape):
+        return int(np.prod(shape)) + (self.branches - 1) * self._delay(shape) * self.branches
+
+
+def create_interleaver(kind, depth, delay=None):
+    """Przeplot według nazwy z INTERLEAVERS; depth to liczba ramek w bloku albo gałęzi przeplotu splotowego."""
+    if kind == "block":
+        return BlockInterleaver(depth)
+    if kind == "convolutional":
+        return ConvolutionalInterleaver(depth, delay)
+    raise ValueError(f"Nieznany rodzaj przeplotu: {kind}")
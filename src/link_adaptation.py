@@ -0,0 +1,155 @@
+import bisect
+import logging
+import math
+from functools import lru_cache
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PACKET_SIZES = (16, 32, 64, 128, 192)
+DEFAULT_RS_SYMBOLS = (2, 4, 8, 16, 32)
+FAST_MEMORY_RATIO = 8  # Stosunek długiej i krótkiej pamięci estymaty stopy błędów
+PROBE_PACKETS = 4  # Długość pierwszej porcji po zmianie parametrów; kolejne są dwukrotnie dłuższe
+# Siatka stóp błędów bajtu, dla której tablica adaptacji jest liczona z góry
+ERROR_RATES = tuple(np.logspace(-6, np.log10(0.3), 64).tolist())
+
+
+def goodput(error_rate, packet_size, rs_symbols, checksum_size, max_retries):
+    """Oczekiwany goodput (bajty danych dostarczonych na bajt wysłany) dla kanału bez pamięci.
+
+    Model odpowiada Pipeline.transmit_data: każda próba to ramka (dane i suma kontrolna), a po błędzie
+    detekcji - symbole korekcyjne; kod RS poprawia do rs_symbols // 2 bajtów w ramce i symbolach korekcyjnych.
+    """
+    frame_length = packet_size + checksum_size
+    correctable = rs_symbols // 2
+    frame_errors = np.array([math.comb(frame_length, k) * error_rate ** k * (1 - error_rate) ** (frame_length - k)
+                             for k in range(correctable + 1)])
+    parity_errors = np.array([math.comb(rs_symbols, k) * error_rate ** k * (1 - error_rate) ** (rs_symbols - k)
+                              for k in range(correctable + 1)])
+    frame_ok = frame_errors[0]
+    corrected = sum(frame_errors[k] * parity_errors[:correctable - k + 1].sum() for k in range(1, correctable + 1))
+    success = frame_ok + corrected  # Pakiet dostarczony w danej próbie
+    delivered = -math.expm1(max_retries * math.log1p(-success)) if success < 1 else 1.0
+    attempts = delivered / success if delivered > 0 else max_retries  # Średnia liczba prób (najwyżej max_retries)
+    sent = attempts * (frame_length + (1 - frame_ok) * rs_symbols)
+    return packet_size * delivered / sent
+
+
+@lru_cache(maxsize=None)
+def _failure_curve(length, correctable):
+    """Prawdopodobieństwo więcej niż correctable błędów w length bajtach dla każdej stopy błędów z ERROR_RATES."""
+    rates = np.array(ERROR_RATES)
+    counts = np.arange(correctable + 1)
+    log_comb = np.array([math.lgamma(length + 1) - math.lgamma(k + 1) - math.lgamma(length - k + 1) for k in counts])
+    log_probs = log_comb + counts * np.log(rates)[:, None] + (length - counts) * np.log1p(-rates)[:, None]
+    curve = 1 - np.exp(log_probs).sum(axis=1)
+    curve.flags.writeable = False
+    return curve
+
+
+def _invert_failure_rate(fraction, length, correctable):
+    """Stopa błędów bajtu, przy której odsetek bloków z więcej niż correctable błędami wynosi fraction."""
+    return float(np.interp(fraction, _failure_curve(length, correctable), ERROR_RATES))
+
+
+@lru_cache(maxsize=None)
+def _goodput_table(packet_sizes, rs_symbols, checksum_size, max_retries):
+    options = [(size, symbols) for size in packet_sizes for symbols in rs_symbols
+               if size + checksum_size + symbols <= 255]  # Słowo kodowe RS mieści się w 255 bajtach
+    if not options:
+        raise ValueError("Żadna kombinacja rozmiaru pakietu i liczby symboli nie mieści się w słowie kodowym RS")
+    table = np.array([[goodput(rate, size, symbols, checksum_size, max_retries) for size, symbols in options]
+                      for rate in ERROR_RATES])
+    table.flags.writeable = False
+    return tuple(options), table
+
+
+class AdaptiveLinkController:
+    """Dobór rozmiaru pakietu i liczby symboli RS na podstawie bieżącej estymaty stopy błędów bajtu.
+
+    Obserwacje odbiornika (liczby bajtów poprawionych przez dekoder RS, błędów detekcji i niepowodzeń
+    korekcji) są uśredniane wykładniczo z pamięcią memory bajtów. Wybierana jest opcja o największym
+    goodpucie z tablicy liczonej z góry; zmiana następuje tylko przy zysku większym niż hysteresis.
+    Po każdej zmianie porcje danych są krótkie (PROBE_PACKETS pakietów) i rosną dwukrotnie do interval
+    pakietów, więc źle dobrane parametry kosztują najwyżej kilka pakietów.
+    """
+
+    def __init__(self, checksum_size, max_retries, packet_sizes=DEFAULT_PACKET_SIZES, rs_symbols=DEFAULT_RS_SYMBOLS,
+                 interval=64, memory=16384, hysteresis=0.02, initial_error_rate=1e-2):
+        self.options, self.table = _goodput_table(tuple(packet_sizes), tuple(rs_symbols), checksum_size, max_retries)
+        self.interval = interval
+        self.block_packets = min(PROBE_PACKETS, interval)  # Liczba pakietów następnej porcji
+        self.memory = memory
+        self.hysteresis = hysteresis
+        # Dwie skale czasu: długa pamięć stabilizuje estymatę, krótka pozwala szybko zareagować na pogorszenie
+        self.memories = np.array([memory, memory / FAST_MEMORY_RATIO])
+        # Ważone sumy obserwacji (dla każdej skali czasu): bajty, poprawione bajty, ramki, ramki z błędem
+        # detekcji i ramki, których nie poprawił kod RS
+        self.bytes = self.memories.copy()
+        self.errors = initial_error_rate * self.memories
+        self.frames = np.zeros(2)
+        self.failed_frames = np.zeros(2)
+        self.rs_failures = np.zeros(2)
+        self.frame_length = None  # Parametry ostatnio obserwowanych ramek
+        self.rs_symbols = None
+        self.current = None  # Bieżący wybór (rozmiar pakietu, liczba symboli RS)
+        self.estimate = None  # Estymata stopy błędów, na podstawie której go dokonano
+        self.schedule = []  # Kolejne decyzje kontrolera
+
+    def observe(self, frame_length, rs_symbols, frames, failed_frames, corrected_bytes, rs_failures):
+        """Dodaje obserwacje z porcji ramek o długości frame_length (dane i suma kontrolna)."""
+        if frames == 0:
+            return
+        observed = frames * frame_length
+        decay = np.exp(-observed / self.memories)
+        self.bytes = self.bytes * decay + observed
+        self.errors = self.errors * decay + corrected_bytes
+        self.frames = self.frames * decay + frames
+        self.failed_frames = self.failed_frames * decay + failed_frames
+        self.rs_failures = self.rs_failures * decay + rs_failures
+        self.frame_length = frame_length
+        self.rs_symbols = rs_symbols
+
+    def error_rate(self):
+        """Estymata stopy błędów bajtu - największa z trzech estymat i obu skal czasu.
+
+        Liczba poprawionych bajtów jest dokładna przy małej stopie błędów, ale pomija ramki niepoprawione
+        przez RS; odsetki błędów detekcji i niepowodzeń korekcji są odwracane przez rozkład dwumianowy
+        i nie zaniżają wyniku, gdy większość ramek nie daje się poprawić.
+        """
+        rates = [self.errors / self.bytes]
+        if self.frame_length:
+            frames = self.frames + 1  # Odsetek mniejszy od 1, także gdy wszystkie ramki były błędne
+            for fraction in self.failed_frames / frames:
+                rates.append(_invert_failure_rate(fraction, self.frame_length, 0))
+            for fraction in self.rs_failures / frames:
+                rates.append(_invert_failure_rate(fraction, self.frame_length + self.rs_symbols, self.rs_symbols // 2))
+        return float(np.max(np.concatenate([np.ravel(rate) for rate in rates])))
+
+    def select(self):
+        """Zwraca (rozmiar pakietu, liczba symboli RS) dla następnej porcji danych o długości block_packets."""
+        rate = self.error_rate()
+        row = self.table[min(bisect.bisect_left(ERROR_RATES, rate), len(ERROR_RATES) - 1)]
+        best = int(np.argmax(row))
+        if self.current is not None:
+            current = self.options.index(self.current)
+            if row[best] <= row[current] * (1 + self.hysteresis):
+                best = current
+        choice = self.options[best]
+        if self.current is not None:
+            self.block_packets = min(self.interval, 2 * self.block_packets if choice == self.current else PROBE_PACKETS)
+        if choice != self.current:
+            logger.info("Adaptacja łącza: stopa błędów bajtu %.2e - pakiet %d B, %d symboli RS", rate, *choice)
+        self.current = choice
+        self.estimate = rate
+        return choice
+
+    def record(self, first_packet, packets):
+        """Zapisuje bieżący wybór w harmonogramie; kolejne porcje o tych samych parametrach są scalane."""
+        packet_size, rs_symbols = self.current
+        last = self.schedule[-1] if self.schedule else None
+        if last is not None and (last["packet_size"], last["rs_symbols"]) == self.current:
+            last["packets"] += packets
+            return
+        self.schedule.append({"first_packet": first_packet, "packets": packets, "packet_size": packet_size,
+                              "rs_symbols": rs_symbols, "error_rate_estimate": self.estimate})
@@ -1,6 +1,8 @@
+import logging
 from pipeline import Pipeline
-from error_correction_code import ErrorCorrectionCode
+from error_correction_code import ReedSolomonCode
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     image_path = "../data/input/sample1.bmp"  # Ścieżka do obrazu wejściowego
     output_path = "../data/output/output_image.bmp"  # Ścieżka do obrazu po transmisji
     pipeline = Pipeline(image_path=image_path, output_path=output_path)
@@ -8,10 +10,10 @@ def main():
 
 
 def test_no_errors():
-    ecc = ErrorCorrectionCode(symbols=10)
+    ecc = ReedSolomonCode(symbols=10)
     original_data = b'Test data for Reed-Solomon coding.'
     encoded_data = ecc.encode(original_data)
-    decoded_data = ecc.decode(encoded_data)
+    decoded_data = ecc.decode(original_data + encoded_data)
 
     if decoded_data == original_data:
         print("Test bez błędów: Sukces")
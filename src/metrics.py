@@ -0,0 +1,205 @@
+import contextlib
+import csv
+import math
+import os
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from bit_conversion import as_byte_array
+
+# Liczniki zbierane przez Pipeline
+COUNTERS = (
+    "frames_sent",  # Ramki (i bloki korekcyjne) wysłane do kanału
+    "frames_delivered",  # Pakiety przyjęte przez odbiorcę
+    "frames_lost",  # Pakiety porzucone po max_retries próbach
+    "bit_errors",  # Bity przekłamane przez kanał
+    "undetected_errors",  # Pakiety przyjęte z błędnymi danymi
+    "rs_corrections",  # Pakiety poprawione kodem Reeda-Solomona
+    "erasure_corrections",  # Pakiety poprawione dopiero dekodowaniem z wymazaniami
+    "bytes_on_wire",  # Bajty przesłane kanałem (dane, sumy kontrolne i symbole korekcyjne)
+)
+
+# Etapy przetwarzania, dla których mierzony jest czas
+STAGES = ("edc_encode", "channel", "edc_decode", "rs_encode", "rs_decode")
+
+# Granice przedziałów histogramu czasu [s]: 1 µs - 10 s, cztery przedziały na dekadę
+DEFAULT_BUCKETS = tuple(10 ** (exponent / 4) for exponent in range(-24, 5))
+
+
+class Histogram:
+    """Histogram o stałych granicach przedziałów (zgodny z typem histogram formatu Prometheus)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Ostatni przedział: powyżej największej granicy
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value, count=1):
+        """Dodaje count obserwacji o wartości value (np. czas jednej ramki z pomiaru całej partii)."""
+        low, high = 0, len(self.buckets)
+        while low < high:
+            middle = (low + high) // 2
+            if value <= self.buckets[middle]:
+                high = middle
+            else:
+                low = middle + 1
+        self.counts[low] += count
+        self.count += count
+        self.sum += value * count
+
+    def quantile(self, q):
+        """Przybliżony kwantyl - górna granica przedziału, w którym wypada."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return math.inf
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            # Liczności przedziałów według górnej granicy (etykieta le jak w formacie Prometheus)
+            "buckets": {_bound_label(bound): count for bound, count in zip(self.buckets + (math.inf,), self.counts)},
+        }
+
+
+def _bound_label(bound):
+    return "+Inf" if math.isinf(bound) else f"{bound:.6g}"
+
+
+class MetricsCollector:
+    """Liczniki i histogramy czasu etapów; bezpieczne dla wątków, z migawkami dostępnymi w trakcie symulacji."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {stage: Histogram(buckets) for stage in STAGES}
+        self.reporter = None
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def observe(self, stage, seconds, count=1):
+        with self.lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram(self.histograms[STAGES[0]].buckets)
+            self.histograms[stage].observe(seconds, count)
+
+    @contextlib.contextmanager
+    def time(self, stage, frames=1):
+        """Mierzy czas bloku; przy przetwarzaniu wsadowym zapisuje średni czas na ramkę frames razy."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if frames:
+                self.observe(stage, (time.perf_counter() - start) / frames, frames)
+
+    def count_channel(self, sent, received):
+        """Zlicza ramki, bajty i przekłamane bity jednej transmisji przez kanał."""
+        sent = as_byte_array(sent)
+        received = as_byte_array(received)
+        frames = sent.shape[0] if sent.ndim == 2 else 1
+        bit_errors = int(np.unpackbits(sent ^ received).sum(dtype=np.int64))
+        with self.lock:
+            self.counters["frames_sent"] += frames
+            self.counters["bytes_on_wire"] += sent.size
+            self.counters["bit_errors"] += bit_errors
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "timestamp": time.time(),
+                "elapsed": time.perf_counter() - self.start,
+                "counters": dict(self.counters),
+                "stages": {stage: histogram.snapshot() for stage, histogram in self.histograms.items()},
+            }
+
+    def to_prometheus(self, prefix="harq"):
+        """Migawka w formacie tekstowym Prometheus."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in snapshot["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        metric = f"{prefix}_stage_duration_seconds"
+        lines.append(f"# HELP {metric} Czas przetwarzania jednej ramki na etapie symulacji.")
+        lines.append(f"# TYPE {metric} histogram")
+        for stage, histogram in snapshot["stages"].items():
+            cumulative = 0
+            for le, count in histogram["buckets"].items():
+                cumulative += count
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram["sum"]:.9g}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {histogram["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def csv_row(self):
+        """Migawka jako jeden wiersz CSV: liczniki oraz liczba, średnia i 95. percentyl czasu każdego etapu."""
+        snapshot = self.snapshot()
+        row = {"timestamp": snapshot["timestamp"], "elapsed": snapshot["elapsed"]}
+        row.update(snapshot["counters"])
+        for stage, histogram in snapshot["stages"].items():
+            row[f"{stage}_count"] = histogram["count"]
+            row[f"{stage}_mean"] = histogram["mean"]
+            row[f"{stage}_p95"] = histogram["p95"]
+        return row
+
+    def export(self, path):
+        """Zapisuje migawkę do pliku: CSV (dopisywany wiersz) dla .csv, w przeciwnym razie format Prometheus."""
+        path = Path(path)
+        if path.suffix == ".csv":
+            row = self.csv_row()
+            new_file = not path.exists() or path.stat().st_size == 0
+            with path.open("a", newline="", encoding="utf-8") as file:
+                writer = csv.DictWriter(file, fieldnames=list(row))
+                if new_file:
+                    writer.writeheader()
+                writer.writerow(row)
+        else:
+            # Zapis przez plik tymczasowy - czytelnik (np. node_exporter) nigdy nie widzi niepełnego pliku
+            temporary = path.with_name(path.name + ".tmp")
+            temporary.write_text(self.to_prometheus(), encoding="utf-8")
+            os.replace(temporary, path)
+
+    def start_reporter(self, path, interval=5.0):
+        """Uruchamia wątek zapisujący migawkę do pliku co interval sekund (podgląd długich symulacji)."""
+        self.stop_reporter()
+        self.reporter = MetricsReporter(self, path, interval)
+        self.reporter.start()
+
+    def stop_reporter(self):
+        if self.reporter is not None:
+            self.reporter.stop()
+            self.reporter = None
+
+
+class MetricsReporter(threading.Thread):
+    def __init__(self, metrics, path, interval):
+        super().__init__(name="metrics-reporter", daemon=True)
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.metrics.export(self.path)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.metrics.export(self.path)  # Końcowa migawka
@@ -0,0 +1,169 @@
+import json
+import math
+import time
+from pathlib import Path
+from statistics import NormalDist
+import numpy as np
+from frame_trace import FrameTrace
+from seeding import generator
+from run_simulation import build_parser, build_scenario, build_pipeline, configure_logging
+
+
+def wilson_interval(successes, trials, confidence):
+    """Przedział ufności Wilsona dla prawdopodobieństwa (działa także dla zera sukcesów)."""
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def batch_means_interval(values, weights, confidence):
+    """Przedział ufności estymatora ilorazowego metodą średnich z partii (partie traktowane jako niezależne)."""
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    estimate = float(np.sum(values * weights) / np.sum(weights))
+    if len(values) < 2:
+        return estimate, (0.0, math.inf)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    normalized = weights / weights.mean()
+    variance = np.sum((normalized * (values - estimate)) ** 2) / (len(values) - 1)
+    half_width = z * math.sqrt(variance / len(values))
+    return estimate, (estimate - half_width, estimate + half_width)
+
+
+def relative_half_width(estimate, interval):
+    if estimate <= 0:
+        return math.inf
+    return (interval[1] - interval[0]) / 2 / estimate
+
+
+class MonteCarloSimulation:
+    """Symulacja Monte-Carlo pętli ramek Pipeline z zatrzymaniem po osiągnięciu zadanej dokładności.
+
+    Ramki są wysyłane partiami; po każdej partii wyznaczane są przedziały ufności dla stopy błędów
+    pakietów (PER) i przepustowości. Symulacja kończy się, gdy oba względne półszerokości przedziałów
+    spadną poniżej target_relative_ci, gdy liczba błędnych pakietów osiągnie min_errors
+    lub po wysłaniu max_packets pakietów.
+    """
+
+    def __init__(self, pipeline, batch_packets=1024, confidence=0.95, target_relative_ci=0.1,
+                 min_errors=None, min_batches=2, max_packets=10_000_000, seed=None):
+        if batch_packets < 1 or max_packets < 1:
+            raise ValueError("Rozmiar partii i maksymalna liczba pakietów muszą być dodatnie")
+        self.pipeline = pipeline
+        self.batch_packets = batch_packets
+        self.confidence = confidence
+        self.target_relative_ci = target_relative_ci
+        self.min_errors = min_errors
+        self.min_batches = min_batches
+        self.max_packets = max_packets
+        self.rng = generator(seed, "payload")  # Generator losowych danych użytkowych
+
+    def run_batch(self):
+        """Wysyła jedną partię losowych pakietów; zwraca liczniki tej partii."""
+        packet_size = self.pipeline.packet_size
+        payload = self.rng.integers(0, 256, size=self.batch_packets * packet_size, dtype=np.uint8)
+        received, results = self.pipeline.transmit_data(payload.tobytes())
+
+        counts = results["retransmission_counts"]
+        transmissions = sum(attempt * count for attempt, count in enumerate(counts))
+        transmissions += results["errors_detected"] * self.pipeline.max_retries
+        sent = payload.reshape(self.batch_packets, packet_size)
+        received = np.frombuffer(received, dtype=np.uint8).reshape(self.batch_packets, packet_size)
+        corrupted = int(np.count_nonzero((sent != received).any(axis=1)))
+        return {
+            "packets": results["packets"],
+            "packet_errors": results["packets"] - counts[1],  # Pakiety odrzucone przy pierwszej próbie
+            "delivered": results["packets"] - results["errors_detected"],
+            "transmissions": transmissions,
+            "undetected_errors": max(0, corrupted - results["errors_detected"]),
+        }
+
+    def run(self):
+        start = time.perf_counter()
+        batches = []
+        totals = dict.fromkeys(("packets", "packet_errors", "delivered", "transmissions", "undetected_errors"), 0)
+        converged = False
+        while totals["packets"] < self.max_packets:
+            batch = self.run_batch()
+            batches.append(batch)
+            for key in totals:
+                totals[key] += batch[key]
+
+            estimates = self._estimates(batches, totals)
+            if len(batches) < self.min_batches:
+                continue
+            if self.min_errors is not None and totals["packet_errors"] >= self.min_errors:
+                converged = True
+                break
+            if max(estimates["packet_error_rate_relative_ci"], estimates["throughput_relative_ci"]) \
+                    <= self.target_relative_ci:
+                converged = True
+                break
+
+        estimates.update(totals)
+        estimates.update(batches=len(batches), converged=converged, elapsed=time.perf_counter() - start)
+        return estimates
+
+    def _estimates(self, batches, totals):
+        per_interval = wilson_interval(totals["packet_errors"], totals["packets"], self.confidence)
+        per = totals["packet_errors"] / totals["packets"]
+        throughput, throughput_interval = batch_means_interval(
+            [batch["delivered"] / batch["transmissions"] for batch in batches],
+            [batch["transmissions"] for batch in batches],
+            self.confidence,
+        )
+        residual_interval = wilson_interval(totals["undetected_errors"], totals["packets"], self.confidence)
+        return {
+            "packet_error_rate": per,
+            "packet_error_rate_ci": per_interval,
+            "packet_error_rate_relative_ci": relative_half_width(per, per_interval),
+            "throughput": throughput,
+            "throughput_ci": throughput_interval,
+            "throughput_relative_ci": relative_half_width(throughput, throughput_interval),
+            "undetected_error_rate": totals["undetected_errors"] / totals["packets"],
+            "undetected_error_rate_ci": residual_interval,
+            "confidence": self.confidence,
+        }
+
+
+def main(argv=None):
+    parser = build_parser(description="Symulacja Monte-Carlo z zatrzymaniem po osiągnięciu przedziału ufności.")
+    parser.add_argument("--batch-packets", type=int, default=1024, help="liczba pakietów w partii")
+    parser.add_argument("--confidence", type=float, default=0.95, help="poziom ufności")
+    parser.add_argument("--target-ci", type=float, default=0.1, help="docelowa względna półszerokość przedziału")
+    parser.add_argument("--min-errors", type=int, help="zatrzymanie po tylu błędnych pakietach")
+    parser.add_argument("--max-packets", type=int, default=10_000_000, help="maksymalna liczba pakietów")
+    args = parser.parse_args(argv)
+    configure_logging(args.verbose)
+
+    scenario = build_scenario(args)
+    simulation = MonteCarloSimulation(
+        build_pipeline(scenario),
+        batch_packets=args.batch_packets,
+        confidence=args.confidence,
+        target_relative_ci=args.target_ci,
+        min_errors=args.min_errors,
+        max_packets=args.max_packets,
+        seed=scenario["channel"].get("seed"),
+    )
+    if args.trace:
+        with FrameTrace(args.trace) as trace:
+            simulation.pipeline.frame_trace = trace
+            results = simulation.run()
+    else:
+        results = simulation.run()
+
+    output = json.dumps({"scenario": scenario, "results": results}, indent=2, ensure_ascii=False)
+    if scenario["results"]:
+        Path(scenario["results"]).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,23 @@
-import random
+import contextlib
+import logging
+import numpy as np
+from pathlib import Path
 from channel import Channel
-from error_detection_code import ErrorDetectionCode, ParityCode, CRC8, CRC16, CRC32
-from error_correction_code import ErrorCorrectionCode
+from codec_registry import (ERROR_CORRECTION_CODES, ERROR_DETECTION_CODES, create_error_correction_code,
+                            create_error_detection_code)
+from error_correction_code import ReedSolomonCode
+from erasures import ERASURE_SOURCES, SubblockChecksums, decode_with_erasures, reliability_erasures
 from image_handler import ImageHandler
 from gilbert_elliott_channel import GilbertElliottChannel
-from frame import Frame
+from frame import FramePool
+from incremental_redundancy import IncrementalRedundancyHARQ
+from interleaver import INTERLEAVERS, create_interleaver
+from link_adaptation import DEFAULT_PACKET_SIZES, DEFAULT_RS_SYMBOLS, AdaptiveLinkController
+from sliding_window_arq import SlidingWindowARQ
+from seeding import generator
+from staged_pipeline import StagedPipeline
+
+logger = logging.getLogger(__name__)
 
 
 class Pipeline:
@@ -14,6 +27,70 @@ class Pipeline:
         self.channel = None
         self.error_detection_code = None
         self.error_correction_code = None
+        self.packet_size = 64  # Rozmiar pakietu w bajtach
+        self.max_retries = 10  # Maksymalna liczba prób przesłania pakietu
+        self.frame_trace = None  # Opcjonalny zapis przebiegu transmisji ramek (FrameTrace)
+        self.metrics = None  # Opcjonalne liczniki i czasy etapów (MetricsCollector)
+        self.frame_pool = None  # Pula buforów ramek używana przez transmit_data
+        self.seed = None  # Ziarno symulacji; strumienie liczb losowych są z niego wyprowadzane (moduł seeding)
+        self.rng = generator(None, "noise")  # Szum w miejsce utraconych pakietów
+        self.erasures = None  # Źródło wymazań dla dekodera RS: None, "channel" albo "subblock"
+        self.subblock_checksums = None  # Sumy kontrolne bloków dla wymazań "subblock"
+        self.link_controller = None  # Kontroler adaptacji łącza zbierający obserwacje odbiornika
+        self.interleaver = None  # Przeplot wsadów ramek przed kanałem (Interleaver)
+        self.interleaver_padding = 0  # Bajty dopełnienia przeplotu przesłane kanałem
+
+    def configure(self, channel_type="BSC", channel_params=None, error_detection_code="CRC32",
+                  rs_symbols=10, packet_size=64, max_retries=10, seed=None, erasures=None, subblock_size=8,
+                  interleaver=None, interleaver_depth=8, interleaver_delay=None, error_correction_code="RS"):
+        """Konfiguracja symulacji bez interakcji z użytkownikiem; seed domyślnie pochodzi z channel_params.
+
+        Kody są wybierane według nazw z rejestru (codec_registry); rs_symbols to liczba bajtów korekcyjnych
+        na ramkę dla każdego kodu korekcyjnego (dla RS - liczba symboli).
+
+        erasures wybiera źródło pozycji wymazań dla dekodera RS: "channel" - wiarygodność bajtów podawana
+        przez kanał (AWGN, Gilbert-Elliott), "subblock" - sumy kontrolne bloków po subblock_size bajtów.
+        interleaver ("block" albo "convolutional") włącza przeplot wsadów ramek o głębokości interleaver_depth.
+        """
+        detection_code = create_error_detection_code(error_detection_code)
+        correction_code = create_error_correction_code(error_correction_code, rs_symbols)
+        # Przed transmisją: np. kod splotowy wymaga minimalnej liczby bajtów korekcyjnych dla długości ramki
+        correction_code.check_frame_length(packet_size + detection_code.checksum_size)
+        if erasures is not None and erasures not in ERASURE_SOURCES:
+            raise ValueError(f"Nieznane źródło wymazań: {erasures}")
+        if erasures is not None and not correction_code.supports_erasures:
+            raise ValueError(f"Kod korekcyjny {error_correction_code} nie obsługuje wymazań")
+        if interleaver is not None and interleaver not in INTERLEAVERS:
+            raise ValueError(f"Nieznany rodzaj przeplotu: {interleaver}")
+        if max_retries < 1:
+            raise ValueError("Maksymalna liczba prób musi być dodatnia")  # Pierwsza próba zawsze jest wykonywana
+        channel_params = dict(channel_params or {})
+        if seed is None:
+            seed = channel_params.get("seed")
+        channel_params["seed"] = seed
+        self.seed = seed
+        self.rng = generator(seed, "noise")
+        self.channel = Channel(channel_type=channel_type, **channel_params)
+        if erasures == "channel" and not self.channel.reports_reliability:
+            raise ValueError(f"Kanał {channel_type} nie podaje wiarygodności bajtów")
+        self.erasures = erasures
+        self.subblock_checksums = SubblockChecksums(subblock_size) if erasures == "subblock" else None
+        self.interleaver = None
+        if interleaver is not None:
+            self.interleaver = create_interleaver(interleaver, interleaver_depth, interleaver_delay)
+        self.error_detection_code = detection_code
+        self.error_correction_code = correction_code
+        self.packet_size = packet_size
+        self.max_retries = max_retries
+
+    def _ensure_configured(self):
+        """Pyta użytkownika tylko o elementy, które nie zostały skonfigurowane wcześniej."""
+        if self.channel is None:
+            self.select_channel()
+        if self.error_detection_code is None:
+            self.select_error_detection_code()
+        if self.error_correction_code is None:
+            self.select_error_correction_code()
 
     def select_type(self):
         choice = 0
@@ -34,6 +111,7 @@ class Pipeline:
         print("Wybierz kanał transmisji:")
         print("1. Binary Symmetric Channel (BSC)")
         print("2. Gilbert-Elliott Channel")
+        print("3. AWGN (BPSK/QPSK)")
         choice = int(input("Twój wybór: "))
 
         if choice == 1:
@@ -51,212 +129,683 @@ class Pipeline:
                 good_error_prob=good_error_prob,
                 bad_error_prob=bad_error_prob,
             )
+        elif choice == 3:
+            ebn0_db = float(input("Podaj Eb/N0 w dB: "))
+            modulation = input("Podaj modulację (BPSK/QPSK): ").strip().upper() or "BPSK"
+            self.channel = Channel(channel_type="AWGN", ebn0_db=ebn0_db, modulation=modulation)
         else:
             print("Niepoprawny wybór kanału transmisji.")
             return False
         return True
 
     def select_error_detection_code(self):
+        names = list(ERROR_DETECTION_CODES)
         print("Wybierz kod detekcyjny:")
-        print("1. Bit parzystości")
-        print("2. CRC8")
-        print("3. CRC16")
-        print("4. CRC32")
+        for number, name in enumerate(names, start=1):
+            print(f"{number}. {name}")
         choice = int(input("Twój wybór: "))
 
-        if choice == 1:
-            self.error_detection_code = ParityCode()
-        elif choice == 2:
-            self.error_detection_code = CRC8()
-        elif choice == 3:
-            self.error_detection_code = CRC16()
-        elif choice == 4:
-            self.error_detection_code = CRC32()
+        if 1 <= choice <= len(names):
+            self.error_detection_code = create_error_detection_code(names[choice - 1])
         else:
             print("Niepoprawny wybór kodu detekcyjnego.")
             return False
         return True
 
     def select_error_correction_code(self):
+        names = list(ERROR_CORRECTION_CODES)
         print("Wybierz kod korekcyjny:")
-        print("1. Reed-Solomon")
+        for number, name in enumerate(names, start=1):
+            print(f"{number}. {name}")
         choice = int(input("Twój wybór: "))
         correction_number = int(input("Wpisz wybraną długość kodu korekcyjnego w bajtach: "))
 
-        if choice == 1:
-            self.error_correction_code = ErrorCorrectionCode(correction_number)  # Liczba symboli korekcyjnych (długość kodu w bajtach) RS
+        if 1 <= choice <= len(names):
+            self.error_correction_code = create_error_correction_code(names[choice - 1], correction_number)
         else:
             print("Niepoprawny wybór kodu korekcyjnego.")
             return False
         return True
 
-    def bit_array_transmission(self):
-        self.select_channel()
-        self.select_error_detection_code()
-        self.select_error_correction_code()
+    def bit_array_transmission(self, bit_array=None):
+        self._ensure_configured()
 
-        # Pobieranie tablicy bitów od użytkownika
-        print("Wprowadź tablicę bitów, oddzielając je spacjami (np. 1 0 1 0 1):")
-        bit_array = list(map(int, input().split()))
-        print("Oryginalne bity:", bit_array)
+        if bit_array is None:
+            # Pobieranie tablicy bitów od użytkownika
+            print("Wprowadź tablicę bitów, oddzielając je spacjami (np. 1 0 1 0 1):")
+            bit_array = input().split()
+        bit_array = np.array(bit_array, dtype=np.uint8)
+        logger.info("Oryginalne bity: %s", bit_array)
+        corrected = False
 
         # Kodowanie detekcyjne
         detected_bits = self.error_detection_code.encode_bits(bit_array)
-        print("Zakodowane bity detekcyjne:", detected_bits)
+        logger.info("Zakodowane bity detekcyjne: %s", detected_bits)
 
         # Transmisja przez kanał
         transmitted_bits = self.channel.channel_transmit(detected_bits, as_bits=True)
-        transmitted_bits = list(map(int, transmitted_bits))
-        print("Bity po transmisji przez kanał:", transmitted_bits)
+        logger.info("Bity po transmisji przez kanał: %s", transmitted_bits)
 
         # Dekodowanie detekcyjne
         decoded_bits = self.error_detection_code.decode_bits(transmitted_bits)
-        print("Bity po dekodowaniu detekcyjnym:", decoded_bits)
+        logger.info("Bity po dekodowaniu detekcyjnym: %s", decoded_bits)
 
         if decoded_bits is None:
-            print("Błąd detekcji. Generowanie i retransmisja kodów korekcyjnych...")
+            logger.info("Błąd detekcji. Generowanie i retransmisja kodów korekcyjnych...")
 
             # Kodowanie korekcyjne
             correction_bits = self.error_correction_code.encode_bits(bit_array)
-            print("Kody korekcyjne:", correction_bits)
+            logger.info("Kody korekcyjne: %s", correction_bits)
 
             # Transmisja kodów korekcyjnych
             transmitted_correction_bits = self.channel.channel_transmit(correction_bits, as_bits=True)
-            transmitted_correction_bits = list(map(int, transmitted_correction_bits))  # Konwersja NumPy do listy
 
-            print("Kody korekcyjne po transmisji:", transmitted_correction_bits)
+            logger.info("Kody korekcyjne po transmisji: %s", transmitted_correction_bits)
 
             # Połączenie danych i kodów korekcyjnych
-            combined_bits = transmitted_bits + transmitted_correction_bits
-            print("Połączone bity:", combined_bits)
+            combined_bits = np.concatenate((transmitted_bits, transmitted_correction_bits))
+            logger.info("Połączone bity: %s", combined_bits)
 
             # Dekodowanie korekcyjne
             decoded_bits = self.error_correction_code.decode_bits(combined_bits, bit_array)
             if decoded_bits is None:
-                print("Nie udało się poprawić danych nawet po korekcji!")
-                return
+                logger.info("Nie udało się poprawić danych nawet po korekcji!")
+                return {"success": False, "corrected": False, "received_bits": None}
+            corrected = True
 
         # Wyświetlanie ostatecznych wyników
-        print("Ostateczne zdekodowane bity:", decoded_bits)
+        logger.info("Ostateczne zdekodowane bity: %s", decoded_bits)
 
         # Porównanie oryginalnych i zdekodowanych bitów
-        if decoded_bits == bit_array:
-            print("Dane zostały poprawnie przesłane!")
+        success = np.array_equal(decoded_bits, bit_array)
+        if success:
+            logger.info("Dane zostały poprawnie przesłane!")
         else:
-            print("Niektóre dane zostały utracone lub zmodyfikowane.")
-
-
+            logger.info("Niektóre dane zostały utracone lub zmodyfikowane.")
+        return {"success": success, "corrected": corrected, "received_bits": decoded_bits.tolist()}
 
     def run_image_transmission(self):
-        self.select_channel()
-        self.select_error_detection_code()
-        self.select_error_correction_code()
+        self._ensure_configured()
 
         data = self.image_handler.image_to_bytes()  # Załaduj obraz i konwertuj na dane bajtowe
         header = data[:54]
         pixel_data = data[54:]
-        print("Uruchamianie symulacji transmisji obrazu...")
-
-        packets = [
-            pixel_data[i : i + 64] for i in range(0, len(pixel_data), 64)
-        ]  # Dzielenie danych na pakiety 64-bajtowe
-        print(f"Rozmiar danych: {len(pixel_data)} bajtów")
-        print(f"Liczba pakietów: {len(packets)}")
-        retransmission_counts = [0] * 12  # Licznik transmisji za X razem
-        errors_detected = 0  # Liczba pakietów, które nie zostały poprawnie odebrane
-        received_data = bytearray(header)  # Inicjalizuj otrzymane dane nagłówkiem
+        logger.info("Uruchamianie symulacji transmisji obrazu...")
 
-        for packet_num, packet in enumerate(packets, start=1):
-            print(f"\n--- Pakiet nr {packet_num} ---")
-            print("Dane oryginalne:", packet)
+        received_pixels, results = self.transmit_data(pixel_data)
+        retransmission_counts = results["retransmission_counts"]
 
-            frame = Frame.create_frame(packet_num, packet, self.error_detection_code)
+        # Wyświetlanie wyników
+        logger.info("Ilość pakietów przepuszczonych z błędem: %d", results["errors_detected"])
+        logger.info("Statystyka pakietów przesyłanych za X razem:")
+        for i, count in enumerate(retransmission_counts[1:], start=1):
+            logger.info("%d: %d", i, count)
+        logger.info(
+            "Pakiety przesłane powyżej %d razy: %d",
+            self.max_retries, retransmission_counts[self.max_retries] + retransmission_counts[self.max_retries + 1],
+        )
 
-            success = False
+        # Wyświetlanie statystyk kanału
+        if results["channel_statistics"] is not None:
+            logger.info("Tyle %% czasu kanał przebywał w stanie dobrym: %.2f%%",
+                        results["channel_statistics"]["good_state_percentage"])
+            logger.info("Tyle %% czasu kanał przebywał w stanie złym: %.2f%%",
+                        results["channel_statistics"]["bad_state_percentage"])
+
+        # Konwersja odebranych danych z powrotem do obrazu i zapisanie
+        if self.output_path is not None:
+            self.image_handler.bytes_to_image(header + received_pixels, self.output_path)
+            logger.info("Obraz został zapisany jako %s", self.output_path)
+        return results
+
+    def run_windowed_transmission(self, policy="selective_repeat", window_size=8, rtt=10.0, ack_loss=0.0,
+                                  use_correction=False, seed=None):
+        """Transmisja obrazu z ARQ z przesuwnym oknem (Selective-Repeat albo Go-Back-N) i opóźnieniem łącza."""
+        self._ensure_configured()
+
+        data = self.image_handler.image_to_bytes()
+        header = data[:54]
+        pixel_data = data[54:]
+        logger.info("Uruchamianie symulacji transmisji obrazu (%s, okno %d, RTT %s)...", policy, window_size, rtt)
+
+        arq = SlidingWindowARQ(
+            self.channel,
+            self.error_detection_code,
+            self.error_correction_code if use_correction else None,
+            policy=policy,
+            window_size=window_size,
+            rtt=rtt,
+            ack_loss=ack_loss,
+            max_retries=self.max_retries,
+            seed=seed if seed is not None else self.seed,
+            frame_trace=self.frame_trace,
+            metrics=self.metrics,
+        )
+        received_pixels, results = arq.transmit_data(pixel_data, self.packet_size)
+        results["channel_statistics"] = self._channel_statistics()
+        if self.metrics is not None:
+            results["metrics"] = self.metrics.snapshot()
+
+        logger.info("Ilość pakietów przepuszczonych z błędem: %d", results["errors_detected"])
+        logger.info("Liczba transmisji: %d, czas: %.0f ramek", results["transmissions"], results["elapsed"])
+        logger.info("Przepustowość: %.4f, goodput: %.4f ramki na jednostkę czasu", results["throughput"],
+                    results["goodput"])
+        if results["latency"]["mean"] is not None:
+            logger.info("Opóźnienie: średnie %.1f, 95. percentyl %.1f", results["latency"]["mean"],
+                        results["latency"]["p95"])
+
+        if self.output_path is not None:
+            self.image_handler.bytes_to_image(header + received_pixels, self.output_path)
+            logger.info("Obraz został zapisany jako %s", self.output_path)
+        return results
+
+    def run_incremental_redundancy_transmission(self, parity_symbols=32, increment=8):
+        """Transmisja obrazu z hybrydowym ARQ typu II (przyrostowe bloki symboli RS i łączenie kopii)."""
+        self._ensure_configured()
+
+        data = self.image_handler.image_to_bytes()
+        header = data[:54]
+        pixel_data = data[54:]
+        logger.info("Uruchamianie symulacji transmisji obrazu (HARQ IR, %d symboli w blokach po %d)...",
+                    parity_symbols, increment)
+
+        harq = IncrementalRedundancyHARQ(
+            self.channel,
+            self.error_detection_code,
+            parity_symbols=parity_symbols,
+            increment=increment,
+            max_retries=self.max_retries,
+            seed=self.seed,
+            frame_trace=self.frame_trace,
+            metrics=self.metrics,
+        )
+        received_pixels, results = harq.transmit_data(pixel_data, self.packet_size)
+        results["channel_statistics"] = self._channel_statistics()
+        if self.metrics is not None:
+            results["metrics"] = self.metrics.snapshot()
+
+        logger.info("Ilość pakietów przepuszczonych z błędem: %d", results["errors_detected"])
+        logger.info("Statystyka pakietów przesyłanych za X razem:")
+        for i, count in enumerate(results["retransmission_counts"][1:], start=1):
+            logger.info("%d: %d", i, count)
+        logger.info("Bajty retransmitowane na dostarczony pakiet: %s", results["retransmitted_bytes_per_packet"])
+
+        if self.output_path is not None:
+            self.image_handler.bytes_to_image(header + received_pixels, self.output_path)
+            logger.info("Obraz został zapisany jako %s", self.output_path)
+        return results
+
+    def run_staged_transmission(self, batch_size=256, queue_size=4, propagation_delay=0.0, rs_workers=2):
+        """Transmisja obrazu potokiem współbieżnych etapów (nadajnik, kanał, odbiornik) połączonych kolejkami."""
+        self._ensure_configured()
+
+        data = self.image_handler.image_to_bytes()
+        header = data[:54]
+        pixel_data = data[54:]
+        logger.info("Uruchamianie symulacji transmisji obrazu (potok etapów, partie po %d ramek)...", batch_size)
+
+        staged = StagedPipeline(
+            self.channel,
+            self.error_detection_code,
+            self.error_correction_code,
+            packet_size=self.packet_size,
+            max_retries=self.max_retries,
+            batch_size=batch_size,
+            queue_size=queue_size,
+            propagation_delay=propagation_delay,
+            rs_workers=rs_workers,
+            seed=self.seed,
+            metrics=self.metrics,
+            frame_trace=self.frame_trace,
+        )
+        received_pixels, results = staged.transmit_data(pixel_data)
+        results["channel_statistics"] = self._channel_statistics()
+        if self.metrics is not None:
+            results["metrics"] = self.metrics.snapshot()
+
+        logger.info("Ilość pakietów przepuszczonych z błędem: %d", results["errors_detected"])
+        logger.info("Statystyka pakietów przesyłanych za X razem:")
+        for i, count in enumerate(results["retransmission_counts"][1:], start=1):
+            logger.info("%d: %d", i, count)
+        logger.info("Czas transmisji: %.3f s", results["elapsed"])
+
+        if self.output_path is not None:
+            self.image_handler.bytes_to_image(header + received_pixels, self.output_path)
+            logger.info("Obraz został zapisany jako %s", self.output_path)
+        return results
+
+    def run_adaptive_transmission(self, packet_sizes=DEFAULT_PACKET_SIZES, rs_symbols=DEFAULT_RS_SYMBOLS,
+                                  block_packets=64, memory=16384):
+        """Transmisja obrazu z doborem rozmiaru pakietu i liczby symboli RS przed każdą porcją (do block_packets pakietów).
+
+        Wybór dokonuje AdaptiveLinkController na podstawie estymaty stopy błędów z poprzednich porcji;
+        harmonogram wyborów jest zwracany w wynikach (schedule).
+        """
+        self._ensure_configured()
+        if not isinstance(self.error_correction_code, ReedSolomonCode):
+            raise ValueError("Adaptacja łącza wymaga kodu Reed-Solomon (model goodputu dotyczy tego kodu)")
+        data = self.image_handler.image_to_bytes()
+        header = data[:54]
+        pixel_data = data[54:]
+        logger.info("Uruchamianie symulacji transmisji obrazu z adaptacją łącza...")
+
+        controller = AdaptiveLinkController(self.error_detection_code.checksum_size, self.max_retries,
+                                            packet_sizes, rs_symbols, block_packets, memory)
+        configured = (self.packet_size, self.error_correction_code)
+        codes = {}
+        results = {
+            "packets": 0,
+            "packet_size": None,  # Zmienny - zob. schedule
+            "errors_detected": 0,
+            "retransmission_counts": [0] * (self.max_retries + 2),
+            "transmitted_bytes": 0,
+            "channel_statistics": None,
+        }
+        received_data = bytearray()
+        position = 0
+        self.link_controller = controller
+        try:
+            while position < len(pixel_data):
+                self.packet_size, symbols = controller.select()
+                if symbols not in codes:
+                    codes[symbols] = ReedSolomonCode(symbols)
+                self.error_correction_code = codes[symbols]
+                chunk = pixel_data[position:position + controller.block_packets * self.packet_size]
+                received_chunk, chunk_results = self.transmit_data(chunk, results["packets"] + 1)
+                controller.record(results["packets"] + 1, chunk_results["packets"])
+                received_data.extend(received_chunk)
+                position += len(chunk)
+
+                results["packets"] += chunk_results["packets"]
+                results["errors_detected"] += chunk_results["errors_detected"]
+                results["transmitted_bytes"] += chunk_results["transmitted_bytes"]
+                for i, count in enumerate(chunk_results["retransmission_counts"]):
+                    results["retransmission_counts"][i] += count
+                results["channel_statistics"] = chunk_results["channel_statistics"]
+        finally:
+            self.link_controller = None
+            self.packet_size, self.error_correction_code = configured
+        results["schedule"] = controller.schedule
+        if self.metrics is not None:
+            results["metrics"] = self.metrics.snapshot()
+
+        logger.info("Ilość pakietów przepuszczonych z błędem: %d", results["errors_detected"])
+        logger.info("Liczba zmian parametrów łącza: %d", len(controller.schedule) - 1)
+        if self.output_path is not None:
+            self.image_handler.bytes_to_image(header + bytes(received_data), self.output_path)
+            logger.info("Obraz został zapisany jako %s", self.output_path)
+        return results
+
+    def run_streaming_transmission(self, chunk_packets=4096):
+        """Transmisja obrazu porcjami: dane pikseli są mapowane z pliku, a wynik zapisywany na bieżąco do pliku.
+
+        Zużycie pamięci zależy od rozmiaru porcji (chunk_packets pakietów), a nie od rozmiaru obrazu.
+        Wynik jest zapisywany bajt po bajcie z nagłówkiem wejścia, więc plik wyjściowy musi mieć rozszerzenie
+        .bmp - konwersja do innego formatu wymagałaby wczytania całego obrazu do pamięci.
+        """
+        self._ensure_configured()
+        if self.output_path is not None and Path(self.output_path).suffix.lower() != ".bmp":
+            raise ValueError(f"Transmisja strumieniowa zapisuje obraz tylko w formacie BMP, a nie {self.output_path}")
+        chunk_size = self.packet_size * chunk_packets
+        results = {
+            "packets": 0,
+            "packet_size": self.packet_size,
+            "errors_detected": 0,
+            "retransmission_counts": [0] * (self.max_retries + 2),
+            "transmitted_bytes": 0,
+            "channel_statistics": None,
+        }
+
+        with self.image_handler.open_pixel_data() as (header, pixel_data):
+            logger.info("Uruchamianie strumieniowej symulacji transmisji obrazu...")
+            output = None
+            if self.output_path is not None:
+                output = self.image_handler.create_output_image(self.output_path, header, len(pixel_data))
+            position = len(header)
+            for chunk in self.image_handler.iter_packets(pixel_data, chunk_size):
+                received_chunk, chunk_results = self.transmit_data(chunk.tobytes(), results["packets"] + 1)
+                if output is not None:
+                    output[position:position + len(received_chunk)] = np.frombuffer(received_chunk, dtype=np.uint8)
+                position += len(received_chunk)
+
+                results["packets"] += chunk_results["packets"]
+                results["errors_detected"] += chunk_results["errors_detected"]
+                results["transmitted_bytes"] += chunk_results["transmitted_bytes"]
+                for i, count in enumerate(chunk_results["retransmission_counts"]):
+                    results["retransmission_counts"][i] += count
+                results["channel_statistics"] = chunk_results["channel_statistics"]  # Statystyki kanału są narastające
+
+            if output is not None:
+                output.flush()
+                del output
+                logger.info("Obraz został zapisany jako %s", self.output_path)
+
+        if self.metrics is not None:
+            results["metrics"] = self.metrics.snapshot()
+        logger.info("Ilość pakietów przepuszczonych z błędem: %d", results["errors_detected"])
+        return results
+
+    def transmit_data(self, pixel_data, first_packet_num=1):
+        """Transmisja danych pakietami z retransmisjami (Hybrid ARQ); zwraca odebrane dane i statystyki."""
+        packet_size = self.packet_size
+        packets = list(ImageHandler.iter_packets(pixel_data, packet_size))  # Dzielenie danych na pakiety
+        trace = self.frame_trace
+        pool = self._frame_pool()
+        padding = self.interleaver_padding
+        logger.debug("Rozmiar danych: %d bajtów", len(pixel_data))
+        logger.debug("Liczba pakietów: %d", len(packets))
+        retransmission_counts = [0] * (self.max_retries + 2)  # Licznik transmisji za X razem
+        errors_detected = 0  # Liczba pakietów, które nie zostały poprawnie odebrane
+        received_data = bytearray()
+
+        # Pierwsza próba dla wszystkich pełnych pakietów naraz - kodowanie, kanał i detekcja wsadowo
+        full_packets = len(pixel_data) // packet_size
+        frames = np.frombuffer(pixel_data, dtype=np.uint8, count=full_packets * packet_size).reshape(
+            full_packets, packet_size
+        )
+        with self._stage("edc_encode", full_packets):
+            encoded_frames = self.error_detection_code.encode_batch(frames)
+        transmitted_frames, frame_reliability = self._channel_transmit(encoded_frames, batch=True, reliability=True)
+        with self._stage("edc_decode", full_packets):
+            first_decoded, first_valid = self.error_detection_code.decode_batch(transmitted_frames)
+        logger.debug("Pakiety odebrane poprawnie przy pierwszej próbie: %d", np.count_nonzero(first_valid))
+
+        # Korekcja wsadowa (Reed-Solomon) dla pakietów, które nie przeszły detekcji w pierwszej próbie
+        failed = np.flatnonzero(~first_valid)
+        with self._stage("rs_encode", len(failed)):
+            correction_frames = self.error_correction_code.encode_batch(encoded_frames[failed])
+        # Transmisja samych kodów korekcyjnych - dekoder korzysta z symboli odebranych z kanału
+        transmitted_correction, correction_reliability, checksums = self._send_correction(
+            encoded_frames[failed], correction_frames, batch=True
+        )
+        transmitted_bytes = encoded_frames.size + correction_frames.size
+        if checksums is not None:
+            transmitted_bytes += checksums.size  # Sumy kontrolne bloków
+        with self._stage("rs_decode", len(failed)):
+            corrected_frames, rs_valid = self._decode_correction(
+                np.hstack((transmitted_frames[failed], transmitted_correction)),
+                None if frame_reliability is None else np.hstack((frame_reliability[failed], correction_reliability)),
+                checksums,
+            )
+        with self._stage("edc_decode", len(failed)):
+            corrected_data, checksum_valid = self.error_detection_code.decode_batch(corrected_frames)
+        corrected_valid = rs_valid & checksum_valid
+        corrected_rows = dict(zip(failed.tolist(), range(len(failed))))
+        if self.link_controller is not None:
+            decoded = np.flatnonzero(rs_valid)
+            corrected_bytes = np.count_nonzero(transmitted_frames[failed[decoded]] != corrected_frames[decoded])
+            self._observe_link(encoded_frames.shape[1], full_packets, len(failed), corrected_bytes,
+                               len(failed) - len(decoded))
+        logger.debug("Pakiety poprawione kodem korekcyjnym przy pierwszej próbie: %d", np.count_nonzero(corrected_valid))
+
+        if self.metrics is not None:
+            # Pakiety przyjęte przez odbiorcę, których dane różnią się od wysłanych - błąd niewykryty przez EDC
+            undetected = np.count_nonzero((first_decoded[first_valid] != frames[first_valid]).any(axis=1))
+            accepted = corrected_valid.nonzero()[0]
+            undetected += np.count_nonzero((corrected_data[accepted] != frames[failed[accepted]]).any(axis=1))
+            self.metrics.count("undetected_errors", undetected)
+            self.metrics.count("rs_corrections", np.count_nonzero(corrected_valid))
+            self.metrics.count("frames_delivered", np.count_nonzero(first_valid) + np.count_nonzero(corrected_valid))
+
+        if trace is not None:
+            first_results = np.full(full_packets, "ok", dtype=object)
+            first_results[failed] = np.where(corrected_valid, "corrected", np.where(rs_valid, "edc_failed", "rs_failed"))
+            for index, result in enumerate(first_results):
+                trace.record(first_packet_num + index, 1, result)
+
+        for packet_num, packet in enumerate(packets, start=first_packet_num):
             retries = 0
+            index = packet_num - first_packet_num
+            if index < full_packets:
+                if first_valid[index]:
+                    received_data.extend(first_decoded[index].tobytes())
+                    retransmission_counts[1] += 1
+                    continue
+                if corrected_valid[corrected_rows[index]]:
+                    received_data.extend(corrected_data[corrected_rows[index]].tobytes())
+                    retransmission_counts[2] += 1
+                    continue
+                retries = 1  # Pierwsza próba (wsadowa) zakończyła się niepowodzeniem
+
+            logger.debug("--- Pakiet nr %d ---", packet_num)
+            logger.debug("Dane oryginalne: %s", packet)
+
+            # Kodowanie detekcyjne - ramka (dane i suma kontrolna) jest budowana w buforze z puli
+            with self._stage("edc_encode"):
+                frame = pool.acquire(packet_num, packet)
+            detected_data = frame.encoded
+            logger.debug("Dane po kodowaniu detekcyjnym: %s", detected_data)
 
-            while not success and retries < 10:
-                retries += 1
-                print(f"Próba nr {retries} dla pakietu {packet_num}")
+            success = False
 
-                # Kodowanie detekcyjne
-                detected_data = self.error_detection_code.encode(packet)
-                print("Dane po kodowaniu detekcyjnym:", detected_data)
+            while not success and retries < self.max_retries:
+                retries += 1
+                logger.debug("Próba nr %d dla pakietu %d", retries, packet_num)
 
                 # Transmisja przez kanał
-                transmitted_data = self.channel.channel_transmit(detected_data)
-                print("Dane po transmisji przez kanał:", transmitted_data)
+                transmitted_data, data_reliability = self._channel_transmit(detected_data, reliability=True)
+                transmitted_bytes += len(detected_data)
+                logger.debug("Dane po transmisji przez kanał: %s", transmitted_data)
 
                 # Dekodowanie detekcyjne - aby sprawdzić czy potrzebna jest retransmisja z kodami korekcyjnymi
-                decoded_data = self.error_detection_code.decode(transmitted_data)
+                with self._stage("edc_decode"):
+                    decoded_data = self.error_detection_code.decode(transmitted_data)
                 if decoded_data is None:
                     # Kodowanie detekcyjne ponownie
                     # detected_data = self.error_detection_code.encode(packet)
-                    # print("Dane po kodowaniu detekcyjnym:", detected_data)
 
                     # Kodowanie korekcyjne (Reed-Solomon)
-                    correction_data = self.error_correction_code.encode(
-                        packet
-                    )  # Koduje dane korekcyjne na podstawie oryginalnych danych
-                    print("Suma Kontrolna zakodowoana: ", correction_data)
+                    with self._stage("rs_encode"):
+                        # Koduje dane korekcyjne na podstawie ramki z sumą kontrolną
+                        correction_data = frame.encode_correction(self.error_correction_code)
+                    logger.debug("Suma Kontrolna zakodowoana: %s", correction_data)
 
                     # Transmisja samych kodów korekcyjnych
-                    transmitted_correction_codes = self.channel.channel_transmit(correction_data)
-                    print("Suma kontrolna po transmisji przez kanał:", transmitted_correction_codes)
+                    transmitted_correction_codes, correction_reliability, checksums = self._send_correction(
+                        detected_data, correction_data
+                    )
+                    logger.debug("Suma kontrolna po transmisji przez kanał: %s", transmitted_correction_codes)
+                    transmitted_bytes += len(correction_data)
+                    if checksums is not None:
+                        transmitted_bytes += checksums.size
 
-                    # Dodanie kodów korekcyjnych do całości
-                    combined_data = transmitted_data + correction_data
+                    # Dodanie odebranych kodów korekcyjnych do całości (w obszarze odbiorczym ramki)
+                    combined_data = frame.receive(transmitted_data, transmitted_correction_codes)
 
                     # Krok 4: Dekodowanie korekcyjne
-                    decoded_data = self.error_correction_code.decode(combined_data)
-                    print(f"Dane po dekodowaniu korekcyjnym (bez kodów korekcyjnych): {decoded_data}")
+                    with self._stage("rs_decode"):
+                        if self.erasures is None:
+                            decoded_data = self.error_correction_code.decode(combined_data)
+                        else:
+                            decoded_frames, rs_valid = self._decode_correction(
+                                np.frombuffer(combined_data, dtype=np.uint8)[None, :],
+                                None if data_reliability is None
+                                else np.concatenate((data_reliability, correction_reliability))[None, :],
+                                checksums,
+                            )
+                            decoded_data = decoded_frames[0].tobytes() if rs_valid[0] else None
+                    logger.debug("Dane po dekodowaniu korekcyjnym (bez kodów korekcyjnych): %s", decoded_data)
                     if decoded_data is None:
-                        print(f"Błąd korekcji Reed-Solomon dla pakietu {packet_num} przy próbie {retries}")
+                        self._observe_link(len(detected_data), rs_failures=1)
+                        logger.debug("Błąd korekcji Reed-Solomon dla pakietu %d przy próbie %d", packet_num, retries)
+                        if trace is not None:
+                            trace.record(packet_num, retries, "rs_failed")
                         continue
 
-                    print("Dane po dekodowaniu korekcyjnym (RS):", decoded_data)
+                    logger.debug("Dane po dekodowaniu korekcyjnym (RS): %s", decoded_data)
+                    if self.link_controller is not None:
+                        corrected_bytes = np.count_nonzero(
+                            np.frombuffer(transmitted_data, dtype=np.uint8) != np.frombuffer(decoded_data, dtype=np.uint8)
+                        )
+                        self._observe_link(len(detected_data), corrected_bytes=corrected_bytes)
 
                     # Dekodowanie detekcyjne
-                    final_data = self.error_detection_code.decode(decoded_data)
+                    with self._stage("edc_decode"):
+                        final_data = self.error_detection_code.decode(decoded_data)
                     if final_data is not None:
                         # Weryfikacja sumy kontrolnej na ramce
                         if frame.checksum == self.error_detection_code.calculate_checksum(final_data):
-                            print("Suma kontrolna jest poprawna.")
+                            logger.debug("Suma kontrolna jest poprawna.")
                             success = True
                             retransmission_counts[retries + 1] += 1
                             received_data.extend(final_data)  # Dodajemy pakiet po transmisji do skumulowanych danych
-                            print(f"Pakiet nr {packet_num} poprawnie odebrany przy próbie nr {retries + 1}.\n")
+                            self._count_delivered(final_data, packet, corrected=True)
+                            logger.debug("Pakiet nr %d poprawnie odebrany przy próbie nr %d.", packet_num, retries + 1)
+                            if trace is not None:
+                                trace.record(packet_num, retries, "corrected")
                         else:
-                            print(
-                                f"Błąd detekcji w pakiecie nr {packet_num} po transmisji - nieprawidłowa suma kontrolna."
+                            logger.debug(
+                                "Błąd detekcji w pakiecie nr %d po transmisji - nieprawidłowa suma kontrolna.", packet_num
                             )
+                            if trace is not None:
+                                trace.record(packet_num, retries, "edc_failed")
                     else:
-                        print(f"Błąd detekcji w pakiecie nr {packet_num} po transmisji.")
+                        logger.debug("Błąd detekcji w pakiecie nr %d po transmisji.", packet_num)
+                        if trace is not None:
+                            trace.record(packet_num, retries, "edc_failed")
                 else:
                     success = True
+                    self._observe_link(len(detected_data), failed_frames=0)
                     received_data.extend(decoded_data)
                     retransmission_counts[retries] += 1
-                    print(f"Pakiet nr {packet_num} został odebrany poprawnie bez użycia kodów detekcyjnych")
+                    self._count_delivered(decoded_data, packet)
+                    logger.debug("Pakiet nr %d został odebrany poprawnie bez użycia kodów detekcyjnych", packet_num)
+                    if trace is not None:
+                        trace.record(packet_num, retries, "ok")
 
             if not success:
-                # received_data.extend([0] * 64) # Tutaj było na czarno
-                received_data.extend([random.randint(0, 255) for _ in range(64)])  # Tutaj bardziej losowy jest szum
+                # received_data.extend([0] * len(packet)) # Tutaj było na czarno
+                received_data.extend(self.rng.bytes(len(packet)))  # Tutaj bardziej losowy jest szum
                 errors_detected += 1
-                print(f"Pakiet nr {packet_num} nie udało się poprawnie przesłać po 10 próbach.\n")
-
-        # Wyświetlanie wyników
-        print(f"\nIlość pakietów przepuszczonych z błędem: {errors_detected}")
-        print("Statystyka pakietów przesyłanych za X razem:")
-        for i, count in enumerate(retransmission_counts[1:], start=1):
-            print(f"{i}: {count}")
-        print(f"Pakiety przesłane powyżej 10 razy: {retransmission_counts[10] + retransmission_counts[11]}")
-
-        # Wyświetlanie statystyk kanału
-        if isinstance(self.channel.channel, GilbertElliottChannel):
-            good_percentage, bad_percentage = self.channel.channel.get_channel_statistics()
-            print(f"\nTyle % czasu kanał przebywał w stanie dobrym: {good_percentage:.2f}%")
-            print(f"Tyle % czasu kanał przebywał w stanie złym: {bad_percentage:.2f}%")
-
-        # Konwersja odebranych danych z powrotem do obrazu i zapisanie
-        self.image_handler.bytes_to_image(bytes(received_data), self.output_path)
-        print(f"Obraz został zapisany jako {self.output_path}")
+                if self.metrics is not None:
+                    self.metrics.count("frames_lost")
+                logger.debug("Pakiet nr %d nie udało się poprawnie przesłać po %d próbach.", packet_num, self.max_retries)
+                if trace is not None:
+                    trace.record(packet_num, retries, "lost")
+            pool.release(frame)
+
+        transmitted_bytes += self.interleaver_padding - padding
+        results = {
+            "packets": len(packets),
+            "packet_size": packet_size,
+            "errors_detected": errors_detected,
+            "retransmission_counts": retransmission_counts,
+            "transmitted_bytes": transmitted_bytes,
+            "channel_statistics": self._channel_statistics(),
+        }
+        if self.metrics is not None:
+            results["metrics"] = self.metrics.snapshot()
+        return bytes(received_data), results
+
+    def _frame_pool(self):
+        """Pula ramek dla bieżącej konfiguracji; tworzona ponownie po zmianie kodów lub rozmiaru pakietu."""
+        pool = self.frame_pool
+        if (pool is None or pool.error_detection_code is not self.error_detection_code
+                or pool.packet_size != self.packet_size or pool.parity_size != self.error_correction_code.symbols):
+            self.frame_pool = FramePool(self.error_detection_code, self.packet_size, self.error_correction_code.symbols)
+        return self.frame_pool
+
+    def _stage(self, stage, frames=1):
+        """Pomiar czasu etapu przetwarzania, jeśli zbierane są metryki."""
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.time(stage, frames)
+
+    def _channel_transmit(self, data, batch=False, reliability=False):
+        """Transmisja przez kanał (pojedynczej ramki albo wsadu) z pomiarem czasu i liczbą przekłamanych bitów.
+
+        Z reliability=True zwraca także wiarygodność odebranych bajtów - albo None, jeśli wymazania
+        nie pochodzą z kanału.
+        """
+        soft = reliability and self.erasures == "channel"
+        if soft:
+            def transmit(frames):
+                return self.channel.channel_transmit_reliability(frames, batch)
+        else:
+            transmit = self.channel.channel_transmit_batch if batch else self.channel.channel_transmit
+        # Pojedyncze ramki (np. retransmisje jednego pakietu) idą bez przeplotu - przeplot splotowy dodałby do
+        # każdej z nich pełne opróżnienie linii opóźniających
+        if batch and self.interleaver is not None and len(data) > 1:
+            transmit = self._interleaved(transmit, soft)
+        if self.metrics is None:
+            transmitted = transmit(data)
+        else:
+            with self.metrics.time("channel", len(data) if batch else 1):
+                transmitted = transmit(data)
+            self.metrics.count_channel(data, transmitted[0] if soft else transmitted)
+        if reliability and not soft:
+            return transmitted, None
+        return transmitted
+
+    def _interleaved(self, transmit, soft=False):
+        """Transmisja wsadu z przeplotem przed kanałem i rozplotem odebranych bajtów (i ich wiarygodności)."""
+        interleaver = self.interleaver
+
+        def interleaved_transmit(frames):
+            frames = np.asarray(frames, dtype=np.uint8)
+            stream = interleaver.interleave(frames)
+            self.interleaver_padding += len(stream) - frames.size
+            received = transmit(stream[None, :])
+            if soft:
+                received_stream, reliability = received
+                return (interleaver.deinterleave(received_stream[0], frames.shape),
+                        interleaver.deinterleave(reliability[0], frames.shape))
+            return interleaver.deinterleave(received[0], frames.shape)
+
+        return interleaved_transmit
+
+    def _send_correction(self, encoded, correction, batch=False):
+        """Transmisja symboli korekcyjnych (dla wymazań "subblock" razem z sumami kontrolnymi bloków).
+
+        Zwraca odebrane symbole korekcyjne, ich wiarygodność (albo None) i odebrane sumy kontrolne (albo None).
+        """
+        if self.subblock_checksums is None:
+            transmitted, reliability = self._channel_transmit(correction, batch, reliability=True)
+            return transmitted, reliability, None
+        correction = np.atleast_2d(np.frombuffer(bytes(correction), dtype=np.uint8) if not batch else correction)
+        encoded = np.atleast_2d(np.frombuffer(bytes(encoded), dtype=np.uint8) if not batch else encoded)
+        checksums = self.subblock_checksums.calculate_batch(np.hstack((encoded, correction)))
+        transmitted = self._channel_transmit(np.hstack((correction, checksums)), batch=True)
+        parity_size = correction.shape[1]
+        transmitted_correction = transmitted[:, :parity_size]
+        if not batch:
+            transmitted_correction = transmitted_correction[0].tobytes()
+        return transmitted_correction, None, transmitted[:, parity_size:]
+
+    def _decode_correction(self, codewords, reliability=None, checksums=None):
+        """Wsadowe dekodowanie RS, z wymazaniami według self.erasures; zwraca ramki i maskę poprawności."""
+        if self.erasures is None:
+            return self.error_correction_code.decode_batch(codewords)
+        symbols = self.error_correction_code.symbols
+        if self.erasures == "channel":
+            attempts = reliability_erasures(reliability, symbols)
+        else:
+            attempts = self.subblock_checksums.erasures(codewords, checksums, symbols)
+        frames, rs_valid, rescued = decode_with_erasures(
+            self.error_correction_code, self.error_detection_code, codewords, attempts
+        )
+        if self.metrics is not None:
+            self.metrics.count("erasure_corrections", np.count_nonzero(rescued))
+        return frames, rs_valid
+
+    def _observe_link(self, frame_length, frames=1, failed_frames=1, corrected_bytes=0, rs_failures=0):
+        """Przekazuje kontrolerowi adaptacji łącza wynik detekcji i korekcji ramek (domyślnie jednej z błędem)."""
+        if self.link_controller is None:
+            return
+        self.link_controller.observe(frame_length, self.error_correction_code.symbols, frames, failed_frames,
+                                     corrected_bytes, rs_failures)
+
+    def _count_delivered(self, data, packet, corrected=False):
+        if self.metrics is None:
+            return
+        self.metrics.count("frames_delivered")
+        if corrected:
+            self.metrics.count("rs_corrections")
+        if bytes(data) != bytes(packet):
+            self.metrics.count("undetected_errors")
+
+    def _channel_statistics(self):
+        if not isinstance(self.channel.channel, GilbertElliottChannel):
+            return None
+        good_percentage, bad_percentage = self.channel.channel.get_channel_statistics()
+        return {"good_state_percentage": good_percentage, "bad_state_percentage": bad_percentage}
@@ -0,0 +1,273 @@
+from functools import lru_cache
+import numpy as np
+
+PRIMITIVE_POLY = 0x11d  # Wielomian pierwotny GF(256), zgodny z reedsolo
+GENERATOR = 2  # Element pierwotny alfa
+
+
+class ReedSolomonError(Exception):
+    pass
+
+
+def _build_gf_tables():
+    """Buduje tablice antylogarytmów, logarytmów i pełną tablicę mnożenia GF(256)."""
+    gf_exp = np.zeros(512, dtype=np.int64)
+    gf_log = np.zeros(256, dtype=np.int64)
+    x = 1
+    for i in range(255):
+        gf_exp[i] = x
+        gf_log[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= PRIMITIVE_POLY
+    gf_exp[255:510] = gf_exp[:255]
+
+    # GF_MUL[a, b] = a * b w GF(256); pozwala mnożyć całe tablice jednym indeksowaniem
+    logs = gf_log[:, None] + gf_log[None, :]
+    gf_mul = gf_exp[logs].astype(np.uint8)
+    gf_mul[0, :] = 0
+    gf_mul[:, 0] = 0
+    return gf_exp, gf_log, gf_mul
+
+
+GF_EXP, GF_LOG, GF_MUL = _build_gf_tables()
+# Kopie tablic jako listy Pythona - szybsze dla pojedynczych operacji w ścieżce korekcji
+_EXP = GF_EXP.tolist()
+_LOG = GF_LOG.tolist()
+
+
+def gf_mul(x, y):
+    if x == 0 or y == 0:
+        return 0
+    return _EXP[_LOG[x] + _LOG[y]]
+
+
+def gf_inverse(x):
+    return _EXP[255 - _LOG[x]]
+
+
+def gf_pow(x, power):
+    return _EXP[(_LOG[x] * power) % 255]
+
+
+def gf_poly_scale(p, x):
+    return [gf_mul(coef, x) for coef in p]
+
+
+def gf_poly_add(p, q):
+    r = [0] * max(len(p), len(q))
+    r[len(r) - len(p):] = p
+    for i, coef in enumerate(q):
+        r[i + len(r) - len(q)] ^= coef
+    return r
+
+
+def gf_poly_mul(p, q):
+    r = [0] * (len(p) + len(q) - 1)
+    for j, q_coef in enumerate(q):
+        for i, p_coef in enumerate(p):
+            r[i + j] ^= gf_mul(p_coef, q_coef)
+    return r
+
+
+def gf_poly_eval(poly, x):
+    """Wartość wielomianu (współczynniki od najwyższej potęgi) w punkcie x - schemat Hornera."""
+    y = poly[0]
+    for coef in poly[1:]:
+        y = gf_mul(y, x) ^ coef
+    return y
+
+
+def gf_poly_eval_many(poly, xs):
+    """Wartości wielomianu w wielu punktach naraz (wektorowy schemat Hornera)."""
+    y = np.full(len(xs), poly[0], dtype=np.uint8)
+    for coef in poly[1:]:
+        y = GF_MUL[y, xs] ^ np.uint8(coef)
+    return y
+
+
+@lru_cache(maxsize=None)
+def _codec_tables(symbols):
+    """Wielomian generujący i potęgi alfa dla syndromów - liczone raz dla danej liczby symboli."""
+    generator = [1]
+    for i in range(symbols):
+        generator = gf_poly_mul(generator, [1, gf_pow(GENERATOR, i)])
+    generator = np.array(generator, dtype=np.uint8)
+    syndrome_powers = GF_EXP[np.arange(symbols)].astype(np.uint8)
+    generator.flags.writeable = False
+    syndrome_powers.flags.writeable = False
+    return generator, syndrome_powers
+
+
+class ReedSolomonCodec:
+    """Systematyczny kod RS(255) nad GF(256), zgodny z reedsolo.RSCodec(symbols), działający wsadowo."""
+
+    def __init__(self, symbols):
+        if not 0 < symbols < 255:
+            raise ValueError("Liczba symboli korekcyjnych musi być z zakresu 1-254")
+        self.symbols = symbols
+        self.generator, self.syndrome_powers = _codec_tables(symbols)
+
+    def _check_length(self, length):
+        if length > 255:
+            raise ValueError(f"Słowo kodowe ({length} bajtów) przekracza 255 bajtów")
+
+    def parity_batch(self, messages):
+        """Symbole korekcyjne dla wielu wiadomości naraz (rejestr LFSR liczony kolumnami)."""
+        messages = np.atleast_2d(np.asarray(messages, dtype=np.uint8))
+        self._check_length(messages.shape[1] + self.symbols)
+        remainder = np.zeros((messages.shape[0], self.symbols), dtype=np.uint8)
+        generator = self.generator[1:]
+        for column in messages.T:
+            feedback = column ^ remainder[:, 0]
+            remainder[:, :-1] = remainder[:, 1:]
+            remainder[:, -1] = 0
+            remainder ^= GF_MUL[feedback[:, None], generator[None, :]]
+        return remainder
+
+    def encode_batch(self, messages):
+        """Pełne słowa kodowe (wiadomość + symbole korekcyjne) dla wielu wiadomości naraz."""
+        messages = np.atleast_2d(np.asarray(messages, dtype=np.uint8))
+        return np.hstack((messages, self.parity_batch(messages)))
+
+    def syndromes_batch(self, codewords):
+        """Syndromy wszystkich słów kodowych naraz; zerowe syndromy oznaczają brak błędów."""
+        codewords = np.atleast_2d(np.asarray(codewords, dtype=np.uint8))
+        syndromes = np.zeros((codewords.shape[0], self.symbols), dtype=np.uint8)
+        powers = self.syndrome_powers[None, :]
+        for column in codewords.T:
+            syndromes = GF_MUL[syndromes, powers] ^ column[:, None]
+        return syndromes
+
+    def decode_batch(self, codewords, erase_pos=None):
+        """Dekoduje wiele słów kodowych naraz.
+
+        Zwraca (wiadomości, maska poprawnie zdekodowanych, liczba poprawionych bajtów).
+        erase_pos to opcjonalna lista pozycji wymazań dla każdego słowa kodowego.
+        """
+        codewords = np.array(np.atleast_2d(codewords), dtype=np.uint8)
+        self._check_length(codewords.shape[1])
+        count = codewords.shape[0]
+        valid = np.ones(count, dtype=bool)
+        corrections = np.zeros(count, dtype=np.int64)
+
+        if erase_pos is None:
+            erase_pos = [()] * count
+        for row, positions in enumerate(erase_pos):
+            if len(positions):
+                codewords[row, list(positions)] = 0
+
+        syndromes = self.syndromes_batch(codewords)
+        # Szybka ścieżka: słowa z zerowymi syndromami nie wymagają korekcji
+        erroneous = np.flatnonzero(syndromes.any(axis=1))
+        for row in erroneous:
+            try:
+                corrected = self._correct(codewords[row], syndromes[row], list(erase_pos[row]))
+            except ReedSolomonError:
+                valid[row] = False
+                continue
+            corrections[row] = int(np.count_nonzero(corrected != codewords[row]))
+            codewords[row] = corrected
+
+        # Poprawione słowa muszą mieć zerowe syndromy - sprawdzane jednym wywołaniem dla całego wsadu
+        corrected_rows = erroneous[valid[erroneous]]
+        if len(corrected_rows):
+            failed = self.syndromes_batch(codewords[corrected_rows]).any(axis=1)
+            valid[corrected_rows[failed]] = False
+            corrections[corrected_rows[failed]] = 0
+        return codewords[:, :-self.symbols], valid, corrections
+
+    def encode(self, data):
+        """Koduje pojedynczą wiadomość; zwraca pełne słowo kodowe."""
+        message = np.frombuffer(bytes(data), dtype=np.uint8)
+        return self.encode_batch(message[None, :])[0].tobytes()
+
+    def decode(self, data, erase_pos=None):
+        """Dekoduje pojedyncze słowo kodowe; zwraca wiadomość bez symboli korekcyjnych."""
+        codeword = np.frombuffer(bytes(data), dtype=np.uint8)
+        messages, valid, _ = self.decode_batch(codeword[None, :], [erase_pos or ()])
+        if not valid[0]:
+            raise ReedSolomonError("Nie udało się poprawić słowa kodowego")
+        return messages[0].tobytes()
+
+    def _correct(self, codeword, syndromes, erase_pos):
+        """Korekcja błędów i wymazań (Berlekamp-Massey, Chien, Forney) dla jednego słowa kodowego.
+
+        Wynik musi zostać jeszcze zweryfikowany syndromami (robi to decode_batch dla całego wsadu).
+        """
+        length = len(codeword)
+        if len(erase_pos) > self.symbols:
+            raise ReedSolomonError("Zbyt wiele wymazań do poprawienia")
+        synd = [0] + [int(s) for s in syndromes]
+        forney_synd = self._forney_syndromes(synd, erase_pos, length)
+        err_loc = self._find_error_locator(forney_synd, len(erase_pos))
+        err_pos = self._find_errors(err_loc[::-1], length)
+        return self._correct_errata(codeword, synd, erase_pos + err_pos)
+
+    def _forney_syndromes(self, synd, erase_pos, length):
+        forney_synd = synd[1:]
+        for position in erase_pos:
+            x = gf_pow(GENERATOR, length - 1 - position)
+            for j in range(len(forney_synd) - 1):
+                forney_synd[j] = gf_mul(forney_synd[j], x) ^ forney_synd[j + 1]
+        return forney_synd
+
+    def _find_error_locator(self, synd, erase_count):
+        """Algorytm Berlekampa-Masseya dla syndromów Forneya."""
+        err_loc = [1]
+        old_loc = [1]
+        for k in range(self.symbols - erase_count):
+            delta = synd[k]
+            for j in range(1, len(err_loc)):
+                delta ^= gf_mul(err_loc[-(j + 1)], synd[k - j])
+            old_loc = old_loc + [0]
+            if delta != 0:
+                if len(old_loc) > len(err_loc):
+                    new_loc = gf_poly_scale(old_loc, delta)
+                    old_loc = gf_poly_scale(err_loc, gf_inverse(delta))
+                    err_loc = new_loc
+                err_loc = gf_poly_add(err_loc, gf_poly_scale(old_loc, delta))
+        while err_loc and err_loc[0] == 0:
+            del err_loc[0]
+        errors = len(err_loc) - 1
+        if errors * 2 + erase_count > self.symbols:
+            raise ReedSolomonError("Zbyt wiele błędów do poprawienia")
+        return err_loc
+
+    def _find_errors(self, err_loc, length):
+        """Przeszukiwanie Chiena - pierwiastki wielomianu lokalizatora dla wszystkich pozycji naraz."""
+        errors = len(err_loc) - 1
+        if errors == 0:
+            return []
+        points = GF_EXP[np.arange(length)].astype(np.uint8)
+        roots = np.flatnonzero(gf_poly_eval_many(err_loc, points) == 0)
+        if len(roots) != errors:
+            raise ReedSolomonError("Przeszukiwanie Chiena znalazło niewłaściwą liczbę błędów")
+        return [length - 1 - int(i) for i in roots]
+
+    def _correct_errata(self, codeword, synd, errata_pos):
+        """Algorytm Forneya - wyznacza wartości błędów na znanych pozycjach i je koryguje."""
+        length = len(codeword)
+        coef_pos = [length - 1 - p for p in errata_pos]
+        errata_loc = [1]
+        for i in coef_pos:
+            errata_loc = gf_poly_mul(errata_loc, gf_poly_add([1], [gf_pow(GENERATOR, i), 0]))
+
+        # Wielomian ewaluatora błędów: (S(x) * Lambda(x)) mod x^(v+1)
+        errata_count = len(errata_loc) - 1
+        product = gf_poly_mul(synd[::-1], errata_loc)
+        err_eval = product[len(product) - (errata_count + 1):][::-1]
+
+        locators = [gf_pow(GENERATOR, i) for i in coef_pos]
+        magnitudes = np.zeros(length, dtype=np.uint8)
+        for i, x in enumerate(locators):
+            x_inv = gf_inverse(x)
+            err_loc_prime = 1
+            for j, other in enumerate(locators):
+                if j != i:
+                    err_loc_prime = gf_mul(err_loc_prime, 1 ^ gf_mul(x_inv, other))
+            if err_loc_prime == 0:
+                raise ReedSolomonError("Nie można wyznaczyć wartości błędu")
+            y = gf_mul(x, gf_poly_eval(err_eval[::-1], x_inv))
+            magnitudes[errata_pos[i]] = gf_mul(y, gf_inverse(err_loc_prime))
+        return codeword ^ magnitudes
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from functools import lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 2  # Zwiększane, gdy zmiana kodu zmienia wyniki symulacji - stare wpisy przestają pasować
+
+# Pola scenariusza, które nie wpływają na wyniki symulacji
+IGNORED_KEYS = ("output", "results")
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path, size, mtime):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    """Skrót zawartości pliku wejściowego (liczony ponownie tylko po zmianie rozmiaru lub czasu modyfikacji)."""
+    stat = Path(path).stat()
+    return _file_digest(str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+def scenario_content(scenario, defaults=None):
+    """Parametry scenariusza wpływające na wyniki: tylko wartości różne od domyślnych (defaults).
+
+    Dzięki temu dodanie nowego parametru z wartością domyślną nie zmienia kluczy ani ziaren istniejących
+    scenariuszy. Obraz wejściowy jest reprezentowany skrótem zawartości, więc ten sam obraz pod inną ścieżką
+    daje ten sam klucz, a zmieniony plik - inny (liczba ramek wynika z obrazu i rozmiaru pakietu).
+    """
+    defaults = defaults or {}
+    content = {key: value for key, value in scenario.items()
+               if key not in IGNORED_KEYS and (key not in defaults or value != defaults[key])}
+    if scenario.get("mode") == "image" and scenario.get("input") is not None:
+        content["input"] = file_digest(scenario["input"])
+    return content
+
+
+def content_digest(content):
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def scenario_key(scenario, defaults=None):
+    """Klucz wyniku: skrót parametrów scenariusza różnych od domyślnych i wersji pamięci wyników."""
+    return content_digest(dict(scenario_content(scenario, defaults), cache_version=CACHE_VERSION))
+
+
+class ResultCache:
+    """Trwała pamięć wyników symulacji (SQLite) z usuwaniem najdawniej używanych wpisów.
+
+    Wpisy starsze niż max_age sekund są usuwane; jeśli łączny rozmiar wyników przekracza max_bytes
+    albo liczba wpisów max_entries, usuwane są wpisy najdawniej odczytane.
+    Scenariusze bez ziarna nie są zapamiętywane - ich wyników nie da się odtworzyć.
+    Klucze pomijają parametry równe wartościom domyślnym (defaults, zwykle DEFAULT_SCENARIO).
+    """
+
+    def __init__(self, path, defaults=None, max_entries=None, max_bytes=None, max_age=None):
+        self.path = path
+        self.defaults = defaults
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, scenario TEXT NOT NULL, results TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def cacheable(scenario):
+        return scenario["channel"].get("seed") is not None
+
+    def get(self, scenario):
+        """Zapamiętane wyniki scenariusza albo None."""
+        if not self.cacheable(scenario):
+            return None
+        key = scenario_key(scenario, self.defaults)
+        row = self.connection.execute("SELECT results, created FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.max_age is not None and row[1] < time.time() - self.max_age):
+            self.misses += 1
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, scenario, results):
+        if not self.cacheable(scenario):
+            return
+        encoded = json.dumps(results, ensure_ascii=False)
+        now = time.time()
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results (key, scenario, results, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (scenario_key(scenario, self.defaults), json.dumps(scenario, ensure_ascii=False), encoded, len(encoded), now, now),
+            )
+        self.evict()
+
+    def evict(self):
+        """Usuwa wpisy zbyt stare, a potem najdawniej używane ponad limit liczby wpisów i rozmiaru."""
+        with self.connection:
+            if self.max_age is not None:
+                self.connection.execute("DELETE FROM results WHERE created < ?", (time.time() - self.max_age,))
+            if self.max_entries is not None:
+                self.connection.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            if self.max_bytes is not None:
+                # Suma narastająca od najświeższych wpisów; usuwane są te, które przekraczają limit
+                self.connection.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM (SELECT key, SUM(size) OVER "
+                    "(ORDER BY accessed DESC, key) AS total FROM results) WHERE total > ?)",
+                    (self.max_bytes,),
+                )
+
+    def stats(self):
+        entries, size = self.connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+
+def add_cache_arguments(parser):
+    """Flagi pamięci wyników wspólne dla programów uruchomieniowych."""
+    parser.add_argument("--cache", help="plik SQLite z zapamiętanymi wynikami; scenariusze już policzone są pomijane")
+    parser.add_argument("--cache-max-entries", type=int, help="maksymalna liczba zapamiętanych wyników")
+    parser.add_argument("--cache-max-mb", type=float, help="maksymalny łączny rozmiar zapamiętanych wyników [MB]")
+    parser.add_argument("--cache-max-age", type=float, help="maksymalny wiek zapamiętanego wyniku [dni]")
+
+
+def open_cache(args, defaults=None):
+    """ResultCache według flag z add_cache_arguments albo None, jeśli pamięć wyników nie jest używana."""
+    if not args.cache:
+        return None
+    return ResultCache(
+        args.cache,
+        defaults=defaults,
+        max_entries=args.cache_max_entries,
+        max_bytes=int(args.cache_max_mb * 1e6) if args.cache_max_mb is not None else None,
+        max_age=args.cache_max_age * 86400 if args.cache_max_age is not None else None,
+    )
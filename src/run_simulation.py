@@ -0,0 +1,328 @@
+import argparse
+import copy
+import json
+import logging
+import tomllib
+from pathlib import Path
+from codec_registry import ERROR_CORRECTION_CODES, ERROR_DETECTION_CODES, codec_throughput
+from erasures import ERASURE_SOURCES
+from frame_trace import FrameTrace
+from interleaver import INTERLEAVERS
+from link_adaptation import DEFAULT_PACKET_SIZES, DEFAULT_RS_SYMBOLS
+from metrics import MetricsCollector
+from pipeline import Pipeline
+from result_cache import add_cache_arguments, open_cache
+from seeding import new_seed
+from sliding_window_arq import ARQ_POLICIES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCENARIO = {
+    "mode": "image",  # "image" albo "bits"
+    "input": "../data/input/sample1.bmp",
+    "output": None,  # Ścieżka obrazu po transmisji (None - obraz nie jest zapisywany)
+    "bits": None,  # Tablica bitów dla trybu "bits", np. [1, 0, 1, 1]
+    "channel": {"type": "BSC", "ber": 0.01},
+    "edc": "CRC32",
+    "ecc": "RS",  # Kod korekcyjny z rejestru: "RS", "Hamming", "BCH", "Convolutional" albo kod z wtyczki
+    "rs_symbols": 10,  # Liczba bajtów korekcyjnych na ramkę (dla RS - symboli)
+    "packet_size": 64,
+    "max_retries": 10,
+    "erasures": None,  # Wymazania w dekoderze RS: None, "channel" (wiarygodność z kanału) albo "subblock"
+    "subblock_size": 8,  # Rozmiar bloku z własną sumą kontrolną CRC8 dla wymazań "subblock"
+    "interleaver": None,  # Przeplot wsadów ramek przed kanałem: None, "block" albo "convolutional"
+    "interleaver_depth": 8,  # Liczba ramek w bloku przeplotu albo gałęzi przeplotu splotowego
+    "interleaver_delay": None,  # Opóźnienie gałęzi przeplotu splotowego (None - według długości ramki)
+    "stream": False,  # Strumieniowa transmisja obrazu (ograniczone zużycie pamięci)
+    "chunk_packets": 4096,  # Liczba pakietów w porcji w trybie strumieniowym
+    "arq": "stop_and_wait",  # "stop_and_wait", "selective_repeat", "go_back_n" albo "incremental_redundancy"
+    "window_size": 8,  # Rozmiar okna ARQ z przesuwnym oknem
+    "rtt": 10.0,  # Czas obiegu w jednostkach czasu nadawania ramki
+    "ack_loss": 0.0,  # Prawdopodobieństwo utraty potwierdzenia
+    "arq_correction": False,  # Kod Reeda-Solomona dołączany do każdej ramki w ARQ z przesuwnym oknem
+    "ir_parity_symbols": 32,  # Liczba symboli korekcyjnych kodu macierzystego w HARQ typu II
+    "ir_increment": 8,  # Liczba symboli korekcyjnych wysyłanych w jednej retransmisji HARQ typu II
+    "staged": False,  # Stop-and-wait jako potok współbieżnych etapów (nadajnik, kanał, odbiornik)
+    "batch_size": 256,  # Liczba ramek w partii przekazywanej między etapami potoku
+    "queue_size": 4,  # Pojemność kolejek między etapami (w partiach) - backpressure
+    "propagation_delay": 0.0,  # Opóźnienie propagacji w kanale [s]
+    "rs_workers": 2,  # Liczba wątków dekodera Reeda-Solomona
+    "adaptive": False,  # Dobór rozmiaru pakietu i liczby symboli RS na podstawie estymaty stanu kanału
+    "adaptive_packet_sizes": list(DEFAULT_PACKET_SIZES),  # Rozmiary pakietów dostępne dla adaptacji
+    "adaptive_rs_symbols": list(DEFAULT_RS_SYMBOLS),  # Liczby symboli RS dostępne dla adaptacji
+    "adaptation_interval": 64,  # Liczba pakietów między decyzjami kontrolera adaptacji
+    "adaptation_memory": 16384,  # Pamięć estymaty stopy błędów kontrolera [bajty]
+    "results": None,  # Ścieżka pliku z wynikami (None - wyniki na standardowe wyjście)
+}
+
+# Flagi CLI nadpisujące parametry kanału
+CHANNEL_OPTIONS = ("ber", "good_to_bad", "bad_to_good", "good_error_prob", "bad_error_prob", "ebn0_db", "modulation",
+                   "code_rate", "seed")
+
+
+def load_scenario(path):
+    """Wczytuje scenariusz z pliku TOML lub JSON."""
+    path = Path(path)
+    if path.suffix == ".toml":
+        with path.open("rb") as file:
+            return tomllib.load(file)
+    with path.open(encoding="utf-8") as file:
+        return json.load(file)
+
+
+def build_scenario(args, generate_seed=True):
+    """Łączy wartości domyślne, plik scenariusza i flagi CLI (w tej kolejności ważności).
+
+    Przy generate_seed scenariusz bez ziarna kanału dostaje nowe, losowe ziarno.
+    """
+    scenario = copy.deepcopy(DEFAULT_SCENARIO)
+    if args.config:
+        loaded = load_scenario(args.config)
+        scenario.update({key: value for key, value in loaded.items() if key != "channel"})
+        if "channel" in loaded:
+            scenario["channel"] = dict(loaded["channel"])
+
+    for key in ("mode", "input", "output", "edc", "ecc", "rs_symbols", "packet_size", "max_retries", "chunk_packets",
+                "arq", "window_size", "rtt", "ack_loss", "ir_parity_symbols", "ir_increment", "batch_size",
+                "queue_size", "propagation_delay", "rs_workers", "erasures", "subblock_size", "interleaver", "interleaver_depth",
+                "interleaver_delay", "adaptive_packet_sizes",
+                "adaptive_rs_symbols", "adaptation_interval", "adaptation_memory", "results"):
+        value = getattr(args, key)
+        if value is not None:
+            scenario[key] = value
+    if args.stream:
+        scenario["stream"] = True
+    if args.arq_correction:
+        scenario["arq_correction"] = True
+    if args.staged:
+        scenario["staged"] = True
+    if args.adaptive:
+        scenario["adaptive"] = True
+    if args.bits is not None:
+        scenario["bits"] = [int(bit) for bit in args.bits.split()]
+    if args.channel is not None and args.channel != scenario["channel"].get("type"):
+        scenario["channel"] = {"type": args.channel}
+    for key in CHANNEL_OPTIONS:
+        value = getattr(args, key)
+        if value is not None:
+            scenario["channel"][key] = value
+    if generate_seed and scenario["channel"].get("seed") is None:
+        scenario["channel"]["seed"] = new_seed()  # Zapisane w wynikach, aby symulację dało się powtórzyć
+    return scenario
+
+
+def configure_logging(verbosity=0):
+    """Poziom logowania: 0 - ostrzeżenia, 1 (-v) - podsumowania, 2 (-vv) - śledzenie każdej ramki."""
+    level = {0: logging.WARNING, 1: logging.INFO}.get(verbosity, logging.DEBUG)
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+def build_pipeline(scenario):
+    """Tworzy skonfigurowany Pipeline na podstawie scenariusza."""
+    channel_params = {key: value for key, value in scenario["channel"].items() if key != "type"}
+    pipeline = Pipeline(image_path=scenario["input"], output_path=scenario["output"])
+    pipeline.configure(
+        channel_type=scenario["channel"]["type"],
+        channel_params=channel_params,
+        error_detection_code=scenario["edc"],
+        error_correction_code=scenario["ecc"],
+        rs_symbols=scenario["rs_symbols"],
+        packet_size=scenario["packet_size"],
+        max_retries=scenario["max_retries"],
+        erasures=scenario["erasures"],
+        subblock_size=scenario["subblock_size"],
+        interleaver=scenario["interleaver"],
+        interleaver_depth=scenario["interleaver_depth"],
+        interleaver_delay=scenario["interleaver_delay"],
+    )
+    return pipeline
+
+
+def run_scenario(scenario, trace_path=None, metrics=None):
+    """Uruchamia symulację opisaną scenariuszem i zwraca wyniki; metrics to opcjonalny MetricsCollector."""
+    pipeline = build_pipeline(scenario)
+    pipeline.metrics = metrics
+    if trace_path is not None:
+        with FrameTrace(trace_path) as trace:
+            pipeline.frame_trace = trace
+            return _run_pipeline(pipeline, scenario)
+    return _run_pipeline(pipeline, scenario)
+
+
+def _run_pipeline(pipeline, scenario):
+    if scenario["erasures"] is not None and (scenario["arq"] != "stop_and_wait" or scenario["staged"]):
+        raise ValueError("Dekodowanie z wymazaniami jest dostępne tylko w sekwencyjnym stop-and-wait")
+    if scenario["interleaver"] is not None and (scenario["arq"] != "stop_and_wait" or scenario["staged"]):
+        raise ValueError("Przeplot jest dostępny tylko w sekwencyjnym stop-and-wait")
+    if scenario["adaptive"] and (scenario["mode"] != "image" or scenario["arq"] != "stop_and_wait"):
+        raise ValueError("Adaptacja łącza jest dostępna tylko przy transmisji obrazu w stop-and-wait")
+    if scenario["mode"] == "image":
+        if scenario["arq"] == "incremental_redundancy":
+            if scenario["ecc"] != "RS":
+                raise ValueError("HARQ typu II korzysta z kodu Reed-Solomon")
+            if scenario["stream"]:
+                raise ValueError("HARQ typu II nie obsługuje transmisji strumieniowej")
+            return pipeline.run_incremental_redundancy_transmission(scenario["ir_parity_symbols"],
+                                                                    scenario["ir_increment"])
+        if scenario["arq"] != "stop_and_wait":
+            if scenario["stream"]:
+                raise ValueError("ARQ z przesuwnym oknem nie obsługuje transmisji strumieniowej")
+            return pipeline.run_windowed_transmission(
+                policy=scenario["arq"],
+                window_size=scenario["window_size"],
+                rtt=scenario["rtt"],
+                ack_loss=scenario["ack_loss"],
+                use_correction=scenario["arq_correction"],
+                seed=scenario["channel"].get("seed"),
+            )
+        if scenario["adaptive"]:
+            if scenario["stream"] or scenario["staged"]:
+                raise ValueError("Adaptacja łącza działa tylko w sekwencyjnej transmisji całego obrazu")
+            return pipeline.run_adaptive_transmission(scenario["adaptive_packet_sizes"], scenario["adaptive_rs_symbols"],
+                                                      scenario["adaptation_interval"], scenario["adaptation_memory"])
+        if scenario["staged"]:
+            if scenario["stream"]:
+                raise ValueError("Potok etapów nie obsługuje transmisji strumieniowej")
+            return pipeline.run_staged_transmission(scenario["batch_size"], scenario["queue_size"],
+                                                    scenario["propagation_delay"], scenario["rs_workers"])
+        if scenario["stream"]:
+            return pipeline.run_streaming_transmission(scenario["chunk_packets"])
+        return pipeline.run_image_transmission()
+    if scenario["mode"] == "bits":
+        if not scenario["bits"]:
+            raise ValueError("Tryb 'bits' wymaga podania tablicy bitów")
+        if pipeline.metrics is not None:
+            raise ValueError("Tryb 'bits' nie zbiera metryk")
+        return pipeline.bit_array_transmission(scenario["bits"])
+    raise ValueError(f"Nieznany tryb symulacji: {scenario['mode']}")
+
+
+def build_parser(**kwargs):
+    """Parser flag scenariusza; wykorzystywany także przez inne programy uruchomieniowe."""
+    parser = argparse.ArgumentParser(**kwargs)
+    parser.add_argument("--config", help="plik scenariusza (.toml lub .json)")
+    parser.add_argument("--mode", choices=("image", "bits"))
+    parser.add_argument("--input", help="obraz wejściowy")
+    parser.add_argument("--output", help="ścieżka obrazu po transmisji")
+    parser.add_argument("--bits", help="bity do transmisji oddzielone spacjami, np. '1 0 1 1'")
+    parser.add_argument("--channel", choices=("BSC", "GilbertElliott", "AWGN"))
+    parser.add_argument("--ber", type=float)
+    parser.add_argument("--good-to-bad", type=float)
+    parser.add_argument("--bad-to-good", type=float)
+    parser.add_argument("--good-error-prob", type=float)
+    parser.add_argument("--bad-error-prob", type=float)
+    parser.add_argument("--ebn0-db", type=float, help="Eb/N0 kanału AWGN [dB]")
+    parser.add_argument("--modulation", choices=("BPSK", "QPSK"), help="modulacja w kanale AWGN")
+    parser.add_argument("--code-rate", type=float, help="sprawność kodowania uwzględniana w Eb/N0 kanału AWGN")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--edc", choices=sorted(ERROR_DETECTION_CODES))
+    parser.add_argument("--ecc", choices=sorted(ERROR_CORRECTION_CODES), help="kod korekcyjny")
+    parser.add_argument("--rs-symbols", type=int, help="liczba bajtów korekcyjnych na ramkę (symboli RS)")
+    parser.add_argument("--packet-size", type=int)
+    parser.add_argument("--max-retries", type=int)
+    parser.add_argument("--erasures", choices=ERASURE_SOURCES,
+                        help="wymazania w dekoderze RS: wiarygodność bajtów z kanału albo sumy kontrolne bloków")
+    parser.add_argument("--subblock-size", type=int, help="rozmiar bloku z sumą kontrolną dla --erasures subblock")
+    parser.add_argument("--stream", action="store_true",
+                        help="strumieniowa transmisja obrazu z pliku (--output musi mieć rozszerzenie .bmp)")
+    parser.add_argument("--chunk-packets", type=int, help="liczba pakietów w porcji w trybie strumieniowym")
+    parser.add_argument("--arq", choices=("stop_and_wait",) + ARQ_POLICIES + ("incremental_redundancy",),
+                        help="strategia ARQ")
+    parser.add_argument("--window-size", type=int, help="rozmiar okna ARQ")
+    parser.add_argument("--rtt", type=float, help="czas obiegu w jednostkach czasu nadawania ramki")
+    parser.add_argument("--ack-loss", type=float, help="prawdopodobieństwo utraty potwierdzenia ACK/NACK")
+    parser.add_argument("--arq-correction", action="store_true", help="kod Reeda-Solomona w każdej ramce ARQ z oknem")
+    parser.add_argument("--ir-parity-symbols", type=int, help="symbole korekcyjne kodu macierzystego HARQ typu II")
+    parser.add_argument("--ir-increment", type=int, help="symbole korekcyjne w jednej retransmisji HARQ typu II")
+    parser.add_argument("--staged", action="store_true", help="stop-and-wait jako potok współbieżnych etapów")
+    parser.add_argument("--batch-size", type=int, help="liczba ramek w partii przekazywanej między etapami potoku")
+    parser.add_argument("--queue-size", type=int, help="pojemność kolejek między etapami potoku (w partiach)")
+    parser.add_argument("--propagation-delay", type=float, help="opóźnienie propagacji w kanale potoku [s]")
+    parser.add_argument("--rs-workers", type=int, help="liczba wątków dekodera Reeda-Solomona w potoku")
+    parser.add_argument("--interleaver", choices=INTERLEAVERS, help="przeplot wsadów ramek przed kanałem")
+    parser.add_argument("--interleaver-depth", type=int, help="liczba ramek w bloku albo gałęzi przeplotu splotowego")
+    parser.add_argument("--interleaver-delay", type=int, help="opóźnienie gałęzi przeplotu splotowego [bajty]")
+    parser.add_argument("--adaptive", action="store_true", help="dobór rozmiaru pakietu i kodu RS w trakcie transmisji")
+    parser.add_argument("--adaptive-packet-sizes", type=int, nargs="+", help="rozmiary pakietów dostępne dla adaptacji")
+    parser.add_argument("--adaptive-rs-symbols", type=int, nargs="+", help="liczby symboli RS dostępne dla adaptacji")
+    parser.add_argument("--adaptation-interval", type=int, help="liczba pakietów między decyzjami adaptacji")
+    parser.add_argument("--adaptation-memory", type=int, help="pamięć estymaty stopy błędów adaptacji [bajty]")
+    parser.add_argument("--results", help="plik wynikowy JSON (domyślnie standardowe wyjście)")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="więcej komunikatów (-vv: każda ramka)")
+    parser.add_argument("--trace", help="plik JSON Lines z przebiegiem transmisji każdej ramki")
+    parser.add_argument("--metrics", help="plik z licznikami i czasami etapów po symulacji (.csv albo format Prometheus)")
+    parser.add_argument("--metrics-live", help="plik z metrykami aktualizowany w trakcie symulacji (.csv albo .prom)")
+    parser.add_argument("--metrics-interval", type=float, default=5.0, help="odstęp aktualizacji --metrics-live [s]")
+    return parser
+
+
+def parse_args(argv=None):
+    parser = build_parser(
+        description="Nieinteraktywna symulacja transmisji Hybrid ARQ.",
+        epilog="Przykład: python run_simulation.py --config scenario.toml --results results.json",
+    )
+    parser.add_argument("--list-codecs", action="store_true",
+                        help="wypisz kody z rejestru z przepustowością kodowania i dekodowania dla ramki scenariusza")
+    add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def list_codecs(scenario):
+    """Kody detekcyjne oraz przepustowość i skuteczność kodów korekcyjnych dla ramek scenariusza.
+
+    Stopa błędów bitu pochodzi z kanału BSC scenariusza (dla innych kanałów 1e-3).
+    """
+    frame_length = scenario["packet_size"] + ERROR_DETECTION_CODES[scenario["edc"]].checksum_size
+    bit_error_rate = scenario["channel"].get("ber", 1e-3) if scenario["channel"]["type"] == "BSC" else 1e-3
+    return {
+        "error_detection_codes": sorted(ERROR_DETECTION_CODES),
+        "frame_length": frame_length,
+        "correction_bytes": scenario["rs_symbols"],
+        "bit_error_rate": bit_error_rate,
+        "error_correction_codes": codec_throughput(frame_length, scenario["rs_symbols"], bit_error_rate),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(args.verbose)  # Komunikaty trafiają na stderr, standardowe wyjście zawiera tylko wyniki
+    scenario = build_scenario(args, generate_seed=False)
+    # Wyniki z wylosowanym ziarnem nie trafią drugi raz pod ten sam klucz - nie są zapamiętywane
+    seeded = scenario["channel"].get("seed") is not None
+    if not seeded:
+        scenario["channel"]["seed"] = new_seed()
+    if args.list_codecs:
+        print(json.dumps(list_codecs(scenario), indent=2, ensure_ascii=False))
+        return
+    metrics = MetricsCollector() if args.metrics or args.metrics_live else None
+    if args.metrics_live:
+        metrics.start_reporter(args.metrics_live, args.metrics_interval)
+    cache = open_cache(args, DEFAULT_SCENARIO) if seeded else None
+    if args.cache and not seeded:
+        logger.warning("Scenariusz bez ziarna (--seed) nie jest zapamiętywany w %s", args.cache)
+    # Obraz wynikowy, przebieg ramek i metryki wymagają przeprowadzenia symulacji
+    results = None
+    if cache is not None and not (scenario["output"] or args.trace or metrics):
+        results = cache.get(scenario)
+    if results is None:
+        try:
+            results = run_scenario(scenario, trace_path=args.trace, metrics=metrics)
+        finally:
+            if metrics is not None:
+                metrics.stop_reporter()
+        if args.metrics:
+            metrics.export(args.metrics)
+        if cache is not None:
+            cache.put(scenario, {key: value for key, value in results.items() if key != "metrics"})
+    if cache is not None:
+        cache.close()
+
+    output = json.dumps({"scenario": scenario, "results": results}, indent=2, ensure_ascii=False)
+    if scenario["results"]:
+        Path(scenario["results"]).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
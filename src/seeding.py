@@ -0,0 +1,43 @@
+import secrets
+import numpy as np
+
+# Strumienie liczb losowych wyprowadzane z jednego ziarna symulacji
+STREAMS = {
+    "channel": 0,  # Błędy wprowadzane przez kanał
+    "noise": 1,  # Szum wstawiany w miejsce utraconych pakietów
+    "feedback": 2,  # Utrata potwierdzeń w kanale zwrotnym
+    "payload": 3,  # Losowe dane użytkowe (Monte-Carlo)
+    "worker": 4,  # Ziarna punktów siatki i procesów roboczych
+}
+
+
+def seed_sequence(seed=None):
+    """SeedSequence dla ziarna: liczby całkowitej, istniejącej SeedSequence albo None (losowa entropia)."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def derive(seed, *key):
+    """Ziarno potomne o podanym kluczu.
+
+    W przeciwieństwie do SeedSequence.spawn wynik zależy tylko od ziarna i klucza, a nie od kolejności
+    wywołań, więc każdy proces wyznacza te same strumienie niezależnie od pozostałych.
+    """
+    root = seed_sequence(seed)
+    return np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + key, pool_size=root.pool_size)
+
+
+def generator(seed, stream, *key):
+    """Niezależny generator dla nazwanego strumienia (np. "channel") i opcjonalnych indeksów, np. numeru kanału."""
+    return np.random.Generator(np.random.PCG64(derive(seed, STREAMS[stream], *key)))
+
+
+def child_seed(seed, index):
+    """Ziarno całkowite punktu siatki lub procesu roboczego o numerze index (do zapisania w scenariuszu)."""
+    return int(derive(seed, STREAMS["worker"], index).generate_state(1, np.uint64)[0])
+
+
+def new_seed():
+    """Losowe ziarno dla symulacji uruchomionej bez ziarna - zapisywane w wynikach, aby dało się ją powtórzyć."""
+    return secrets.randbits(63)
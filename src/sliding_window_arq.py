@@ -0,0 +1,313 @@
+import contextlib
+import heapq
+import logging
+import numpy as np
+from frame import FramePool
+from image_handler import ImageHandler
+from seeding import generator
+
+logger = logging.getLogger(__name__)
+
+ARQ_POLICIES = ("selective_repeat", "go_back_n")
+
+
+class SlidingWindowARQ:
+    """Symulacja ARQ z przesuwnym oknem (Selective-Repeat albo Go-Back-N) w czasie dyskretnym.
+
+    Jednostką czasu jest czas nadawania jednej ramki. Ramka wysłana w chwili t dociera do odbiorcy
+    w chwili t + 1 + rtt / 2, a potwierdzenie (ACK/NACK) wraca do nadawcy w chwili t + 1 + rtt.
+    Potwierdzenia giną z prawdopodobieństwem ack_loss - wtedy retransmisję wymusza upływ czasu timeout.
+    Nadawca porzuca ramkę po max_retries próbach bez potwierdzenia - także wtedy, gdy odbiorca ją ma,
+    a giną tylko potwierdzenia; ramka, której odbiorca nie dostał, jest zastępowana szumem.
+    Opcjonalny error_correction_code dodaje do każdej ramki symbole Reeda-Solomona (hybrydowe ARQ typu I).
+    Opcjonalny metrics (MetricsCollector) zbiera liczniki i czasy etapów tak jak w Pipeline.
+    """
+
+    def __init__(self, channel, error_detection_code, error_correction_code=None, policy="selective_repeat",
+                 window_size=8, rtt=10.0, ack_loss=0.0, timeout=None, max_retries=10, seed=None, frame_trace=None,
+                 metrics=None):
+        if policy not in ARQ_POLICIES:
+            raise ValueError(f"Nieznana strategia ARQ: {policy}")
+        if window_size < 1:
+            raise ValueError("Rozmiar okna musi być dodatni")
+        if not 0 <= ack_loss < 1:
+            raise ValueError("Prawdopodobieństwo utraty potwierdzenia musi być z zakresu [0, 1)")
+        self.channel = channel
+        self.error_detection_code = error_detection_code
+        self.error_correction_code = error_correction_code
+        self.policy = policy
+        self.window_size = window_size
+        self.rtt = rtt
+        self.ack_loss = ack_loss
+        self.timeout = timeout if timeout is not None else rtt + 2  # Czas oczekiwania liczony od początku nadawania
+        self.max_retries = max_retries
+        self.rng = generator(seed, "feedback")  # Generator utraty potwierdzeń
+        self.noise_rng = generator(seed, "noise")
+        self.frame_trace = frame_trace
+        self.metrics = metrics
+
+    def transmit_data(self, data, packet_size, first_packet_num=1):
+        """Przesyła dane pakietami; zwraca odebrane dane i statystyki (czasy w jednostkach czasu ramki)."""
+        packets = list(ImageHandler.iter_packets(data, packet_size))
+        # Wszystkie ramki pozostają w buforach jednej puli do końca transmisji
+        parity_size = self.error_correction_code.symbols if self.error_correction_code is not None else 0
+        pool = FramePool(self.error_detection_code, packet_size, parity_size, capacity=max(1, len(packets)))
+        frames = [pool.acquire(num, packet) for num, packet in enumerate(packets, start=first_packet_num)]
+        self._start(frames)
+        if self.policy == "selective_repeat":
+            self._run_selective_repeat()
+        else:
+            self._run_go_back_n()
+
+        received_data = bytearray()
+        for frame, payload in zip(frames, self.received):
+            if payload is None:
+                payload = self.noise_rng.bytes(len(frame.data))  # Szum zamiast utraconej ramki
+            elif self.metrics is not None and payload != bytes(frame.data):
+                self.metrics.count("undetected_errors")
+            received_data.extend(payload)
+        if self.metrics is not None:
+            delivered = sum(payload is not None for payload in self.received)
+            self.metrics.count("frames_delivered", delivered)
+            self.metrics.count("frames_lost", len(frames) - delivered)
+        return bytes(received_data), self._results(packet_size)
+
+    def _start(self, frames):
+        count = len(frames)
+        self.frames = frames
+        self.first_packet_num = frames[0].packet_num if frames else 0
+        self.encoded = [self._encode(frame) for frame in frames]
+        self.sent = np.zeros(count, dtype=np.int64)  # Liczba nadań ramki (łącznie z odrzuconymi przez Go-Back-N)
+        # Próby liczone przez nadawcę do limitu max_retries: w Go-Back-N tylko nadania ramki jako początku okna,
+        # bo wcześniejsze nadania odbiorca odrzuca z powodu utraty poprzednich ramek
+        self.tries = np.zeros(count, dtype=np.int64)
+        self.attempts = np.zeros(count, dtype=np.int64)  # Próby, w których odbiorca oczekiwał tej ramki
+        self.first_sent = np.full(count, np.nan)
+        self.last_sent = np.full(count, -np.inf)
+        self.done = np.zeros(count, dtype=bool)  # Ramka potwierdzona albo porzucona przez nadawcę
+        self.received = [None] * count  # Dane przyjęte przez odbiorcę
+        self.delivered_at = np.full(count, np.nan)  # Chwila przekazania ramki (w kolejności) do warstwy wyższej
+        self.rx_expected = 0  # Pierwsza ramka, na którą czeka odbiorca
+        self.feedback = []  # Kolejka potwierdzeń: (chwila dotarcia, numer kolejny, indeks ramki, ACK?, chwila nadania)
+        self.feedback_order = 0
+        self.now = 0.0
+        self.base = 0  # Najstarsza niepotwierdzona ramka (początek okna)
+
+    def _stage(self, stage, frames=1):
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.time(stage, frames)
+
+    def _encode(self, frame):
+        if self.error_correction_code is None:
+            return frame.encoded
+        with self._stage("rs_encode"):
+            frame.encode_correction(self.error_correction_code)
+        return frame.codeword
+
+    def _decode(self, transmitted):
+        """Dekoduje odebraną ramkę; zwraca (dane albo None, czy kod korekcyjny zmienił ramkę)."""
+        corrected = False
+        if self.error_correction_code is not None:
+            with self._stage("rs_decode"):
+                frame = self.error_correction_code.decode(transmitted)
+            if frame is None:
+                return None, False
+            corrected = frame != transmitted[:len(frame)]
+            transmitted = frame
+        with self._stage("edc_decode"):
+            return self.error_detection_code.decode(transmitted), corrected
+
+    def _send(self, index):
+        """Nadaje ramkę w bieżącej chwili; zwraca dane odebrane poprawnie albo None."""
+        frame = self.frames[index]
+        in_order = self.policy == "selective_repeat" or index == self.rx_expected
+        self.sent[index] += 1
+        self.tries[index] += self.policy == "selective_repeat" or index == self.base
+        self.attempts[index] += in_order
+        if np.isnan(self.first_sent[index]):
+            self.first_sent[index] = self.now
+        self.last_sent[index] = self.now
+        with self._stage("channel"):
+            transmitted = self.channel.channel_transmit(self.encoded[index])
+        if self.metrics is not None:
+            self.metrics.count_channel(self.encoded[index], transmitted)
+        decoded, corrected = self._decode(transmitted)
+        if self.metrics is not None and corrected and decoded is not None and in_order and self.received[index] is None:
+            self.metrics.count("rs_corrections")
+        if self.frame_trace is not None:
+            result = "ok" if decoded is not None else "edc_failed"
+            self.frame_trace.record(frame.packet_num, int(self.attempts[index]),
+                                    result if in_order else "out_of_order", time_slot=self.now)
+        return decoded
+
+    def _reply(self, index, positive, sent_at):
+        """Odbiorca wysyła ACK/NACK z numerem pakietu; potwierdzenie może zginąć w kanale zwrotnym."""
+        if self.rng.random() < self.ack_loss:
+            return
+        packet_num = self.first_packet_num + index
+        heapq.heappush(self.feedback, (sent_at + 1 + self.rtt, self.feedback_order, packet_num, positive, sent_at))
+        self.feedback_order += 1
+
+    def _next_feedback(self):
+        """Zdejmuje najbliższe potwierdzenie; zwraca (indeks ramki, ACK?, chwila nadania ramki)."""
+        _, _, packet_num, positive, sent_at = heapq.heappop(self.feedback)
+        return packet_num - self.first_packet_num, positive, sent_at
+
+    def _deliver_in_order(self, arrival):
+        while self.rx_expected < len(self.frames) and (
+                self.received[self.rx_expected] is not None or self.done[self.rx_expected]):
+            if np.isnan(self.delivered_at[self.rx_expected]):
+                self.delivered_at[self.rx_expected] = arrival
+            self.rx_expected += 1
+
+    def _abandon(self, index):
+        """Porzucenie ramki po max_retries próbach nadawcy; odbiorca przestaje na nią czekać."""
+        self.done[index] = True
+        logger.debug("Pakiet nr %d nie udało się przesłać po %d próbach.", self.frames[index].packet_num,
+                     self.max_retries)
+        if self.frame_trace is not None:
+            result = "lost" if self.received[index] is None else "unacknowledged"
+            self.frame_trace.record(self.frames[index].packet_num, int(self.tries[index]), result)
+        self._deliver_in_order(self.now)
+
+    def _advance_base(self):
+        while self.base < len(self.frames) and self.done[self.base]:
+            self.base += 1
+
+    def _wait(self, timers):
+        """Przesuwa czas do najbliższego zdarzenia: potwierdzenia albo upływu czasu oczekiwania."""
+        candidates = [self.feedback[0][0]] if self.feedback else []
+        candidates += [sent + self.timeout for sent in timers]
+        self.now = max(self.now, min(candidates))
+
+    def _run_selective_repeat(self):
+        count = len(self.frames)
+        next_new = 0
+        retransmit = []  # Kopiec indeksów ramek do retransmisji
+        pending = set()
+        while self.base < count:
+            while self.feedback and self.feedback[0][0] <= self.now:
+                index, positive, sent_at = self._next_feedback()
+                if self.done[index] or sent_at < self.last_sent[index]:
+                    continue  # Potwierdzenie nieaktualne (ramka już potwierdzona lub wysłana ponownie)
+                if positive:
+                    self.done[index] = True
+                elif index not in pending:
+                    pending.add(index)
+                    heapq.heappush(retransmit, index)
+            self._advance_base()
+            for index in range(self.base, next_new):
+                if not self.done[index] and index not in pending and self.last_sent[index] + self.timeout <= self.now:
+                    pending.add(index)
+                    heapq.heappush(retransmit, index)
+
+            index = None
+            while retransmit:
+                candidate = heapq.heappop(retransmit)
+                pending.discard(candidate)
+                if self.done[candidate]:
+                    continue
+                if self.tries[candidate] >= self.max_retries:
+                    self._abandon(candidate)
+                    continue
+                index = candidate
+                break
+            self._advance_base()
+            if index is None and next_new < min(count, self.base + self.window_size):
+                index = next_new
+                next_new += 1
+            if index is None:
+                if self.base < count:
+                    outstanding = [self.last_sent[i] for i in range(self.base, next_new) if not self.done[i]]
+                    self._wait(outstanding)
+                continue
+
+            sent_at = self.now
+            decoded = self._send(index)
+            self.now += 1
+            arrival = sent_at + 1 + self.rtt / 2
+            if decoded is not None:
+                if self.received[index] is None:
+                    self.received[index] = decoded
+                    self._deliver_in_order(arrival)
+                self._reply(index, True, sent_at)
+            else:
+                self._reply(index, False, sent_at)
+
+    def _run_go_back_n(self):
+        count = len(self.frames)
+        next_send = 0
+        while self.base < count:
+            while self.feedback and self.feedback[0][0] <= self.now:
+                index, positive, sent_at = self._next_feedback()
+                if positive:
+                    # Potwierdzenie skumulowane: odbiorca ma wszystkie ramki przed index
+                    self.done[self.base:index] = True
+                    self._advance_base()
+                    next_send = max(next_send, self.base)
+                elif index == self.base and sent_at >= self.last_sent[index]:
+                    next_send = self.base  # NACK najstarszej ramki - powrót do początku okna
+            if self.base >= count:
+                break
+            if self.last_sent[self.base] + self.timeout <= self.now and next_send > self.base:
+                next_send = self.base
+            # Limit prób liczony po stronie nadawcy: gdy giną potwierdzenia, odbiorca już nie czeka na ramkę base
+            if next_send == self.base and self.tries[self.base] >= self.max_retries:
+                self._abandon(self.base)
+                self._advance_base()
+                next_send = max(next_send, self.base)
+                continue
+
+            if next_send >= min(count, self.base + self.window_size):
+                self._wait([self.last_sent[self.base]])
+                continue
+
+            index = next_send
+            next_send += 1
+            sent_at = self.now
+            decoded = self._send(index)
+            self.now += 1
+            arrival = sent_at + 1 + self.rtt / 2
+            if index != self.rx_expected:
+                # Odbiorca odrzuca ramki spoza kolejności i powtarza potwierdzenie skumulowane
+                self._reply(self.rx_expected, True, sent_at)
+                continue
+            if decoded is not None:
+                self.received[index] = decoded
+                self._deliver_in_order(arrival)
+                self._reply(self.rx_expected, True, sent_at)
+            else:
+                self._reply(index, False, sent_at)
+
+    def _results(self, packet_size):
+        count = len(self.frames)
+        delivered = np.array([payload is not None for payload in self.received], dtype=bool)
+        retransmission_counts = [0] * (self.max_retries + 2)
+        for attempts in self.attempts[delivered]:
+            retransmission_counts[min(int(attempts), self.max_retries + 1)] += 1
+
+        elapsed = float(np.nanmax(self.delivered_at)) if count else 0.0
+        transmissions = int(self.sent.sum())
+        latency = self.delivered_at[delivered] - self.first_sent[delivered]
+        return {
+            "policy": self.policy,
+            "window_size": self.window_size,
+            "rtt": self.rtt,
+            "ack_loss": self.ack_loss,
+            "packets": count,
+            "packet_size": packet_size,
+            "errors_detected": int(count - np.count_nonzero(delivered)),
+            "retransmission_counts": retransmission_counts,
+            "transmissions": transmissions,
+            "elapsed": elapsed,
+            # Przepustowość: zajętość łącza (ramki nadane na jednostkę czasu), goodput: ramki dostarczone poprawnie
+            "throughput": transmissions / elapsed if elapsed else 0.0,
+            "goodput": int(np.count_nonzero(delivered)) / elapsed if elapsed else 0.0,
+            "latency": {
+                "mean": float(latency.mean()) if len(latency) else None,
+                "p50": float(np.percentile(latency, 50)) if len(latency) else None,
+                "p95": float(np.percentile(latency, 95)) if len(latency) else None,
+                "max": float(latency.max()) if len(latency) else None,
+            },
+        }
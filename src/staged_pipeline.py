@@ -0,0 +1,296 @@
+import contextlib
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from seeding import generator
+
+logger = logging.getLogger(__name__)
+
+_STOP = None  # Znacznik końca transmisji przekazywany przez kolejne etapy
+
+
+class StagedPipeline:
+    """Hybrid ARQ (stop-and-wait dla każdego pakietu) jako potok etapów działających współbieżnie.
+
+    Nadajnik, kanał i odbiornik to osobne wątki połączone kolejkami o pojemności queue_size partii
+    po batch_size ramek - pełna kolejka wstrzymuje etap poprzedzający (backpressure). Kanał opóźnia
+    każdą partię o propagation_delay sekund; partie w drodze zajmują miejsca w kolejce odbiornika,
+    więc queue_size ogranicza też liczbę partii "w locie" (iloczyn przepustowości i opóźnienia łącza).
+    Odbiornik odsyła nadajnikowi żądania symboli korekcyjnych i retransmisji; dekodowanie Reeda-Solomona
+    wykonuje pula rs_workers wątków, więc odbiornik w tym czasie przyjmuje kolejne partie.
+    Przebieg prób jest taki sam jak w Pipeline.transmit_data: ramka, a po błędzie detekcji symbole RS.
+    Kolejność partii w kanale zależy od szeregowania wątków, więc przebieg z tym samym ziarnem
+    nie jest powtarzalny bit w bit (w przeciwieństwie do Pipeline.transmit_data).
+    """
+
+    def __init__(self, channel, error_detection_code, error_correction_code, packet_size=64, max_retries=10,
+                 batch_size=256, queue_size=4, propagation_delay=0.0, rs_workers=2, seed=None, metrics=None,
+                 frame_trace=None):
+        if batch_size < 1 or queue_size < 1 or rs_workers < 1:
+            raise ValueError("Rozmiar partii, pojemność kolejek i liczba wątków dekodera muszą być dodatnie")
+        if propagation_delay < 0:
+            raise ValueError("Opóźnienie propagacji nie może być ujemne")
+        self.channel = channel
+        self.error_detection_code = error_detection_code
+        self.error_correction_code = error_correction_code
+        self.packet_size = packet_size
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.propagation_delay = propagation_delay
+        self.rs_workers = rs_workers
+        self.rng = generator(seed, "noise")  # Szum w miejsce utraconych pakietów
+        self.metrics = metrics
+        self.frame_trace = frame_trace
+
+    def transmit_data(self, data, first_packet_num=1):
+        """Przesyła dane pakietami; zwraca odebrane dane i statystyki (jak Pipeline.transmit_data)."""
+        data = np.frombuffer(bytes(data), dtype=np.uint8)
+        full_packets = len(data) // self.packet_size
+        self.packets = [data[:full_packets * self.packet_size].reshape(full_packets, self.packet_size)]
+        if len(data) % self.packet_size:
+            self.packets.append(data[full_packets * self.packet_size:][None, :])  # Krótszy ostatni pakiet
+        self.first_packet_num = first_packet_num
+        self.count = -(-len(data) // self.packet_size)
+
+        self.received = [None] * self.count
+        self.attempts = np.zeros(self.count, dtype=np.int64)
+        self.corrected = np.zeros(self.count, dtype=bool)
+        self.transmitted_bytes = 0
+        self.buffered = {}  # Ramki odebrane z błędem, czekające na symbole korekcyjne (odbiornik)
+        self.link = queue.Queue(self.queue_size)  # Nadajnik -> kanał
+        self.rx = queue.Queue()  # Kanał -> odbiornik oraz wyniki dekodera RS
+        self.rx_slots = threading.Semaphore(self.queue_size)  # Pojemność kolejki odbiornika dla partii z kanału
+        self.feedback = queue.Queue()  # Odbiornik -> nadajnik; nieograniczona, aby etapy nie zakleszczyły się
+        self.failed = threading.Event()
+        self.errors = []
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.rs_workers, thread_name_prefix="rs-decoder") as self.decoder:
+            threads = [threading.Thread(target=self._guard, args=(stage,), name=f"stage-{stage.__name__[1:]}")
+                       for stage in (self._transmitter, self._channel, self._receiver)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        if self.errors:
+            raise self.errors[0]
+        elapsed = time.perf_counter() - start
+        return self._collect(elapsed)
+
+    def _guard(self, stage):
+        """Błąd jednego etapu zatrzymuje pozostałe i jest zgłaszany przez transmit_data."""
+        try:
+            stage()
+        except _Stopped:
+            pass
+        except Exception as error:
+            self.errors.append(error)
+            self.failed.set()
+
+    def _put(self, target, item):
+        while not self.failed.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Stopped
+
+    def _acquire(self, semaphore):
+        while not self.failed.is_set():
+            if semaphore.acquire(timeout=0.1):
+                return
+        raise _Stopped
+
+    def _get(self, source):
+        while not self.failed.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        raise _Stopped
+
+    def _stage(self, stage, frames=1):
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.time(stage, frames)
+
+    def _transmitter(self):
+        """Wysyła nowe partie ramek; żądania odbiornika (symbole RS, retransmisje) mają pierwszeństwo."""
+        batches = ((group, offset, min(offset + self.batch_size, len(self.packets[group]))) for group in
+                   range(len(self.packets)) for offset in range(0, len(self.packets[group]), self.batch_size))
+        encoded = {}  # Zakodowane ramki partii, które nie zostały jeszcze zakończone
+        remaining = {}  # Liczba niezakończonych pakietów partii
+        while True:
+            try:
+                request = self.feedback.get_nowait()
+            except queue.Empty:
+                request = None
+            if request is None:
+                batch = next(batches, None)
+                if batch is not None:
+                    group, first, last = batch
+                    with self._stage("edc_encode", last - first):
+                        encoded[group, first] = self.error_detection_code.encode_batch(
+                            self.packets[group][first:last])
+                    remaining[group, first] = last - first
+                    self._send("data", (group, first), np.arange(last - first), encoded[group, first])
+                    continue
+                if not remaining:
+                    break
+                request = self._get(self.feedback)
+
+            kind, key, rows = request
+            if kind == "done":
+                remaining[key] -= len(rows)
+                if not remaining[key]:
+                    del remaining[key], encoded[key]
+                continue
+            self._send(kind, key, rows, encoded[key])
+
+        self._put(self.link, _STOP)
+
+    def _send(self, kind, key, rows, frames):
+        """Wysyła wiersze rows partii: ramki (kind="data") albo ich symbole korekcyjne (kind="parity")."""
+        payload = frames[rows]
+        if kind == "parity":
+            with self._stage("rs_encode", len(rows)):
+                payload = self.error_correction_code.encode_batch(payload)
+        self._put(self.link, (kind, key, rows, payload))
+
+    def _channel(self):
+        """Przepuszcza partie przez kanał i opóźnia je o czas propagacji."""
+        while True:
+            item = self._get(self.link)
+            self._acquire(self.rx_slots)
+            if item is _STOP:
+                self.rx.put(_STOP)
+                return
+            kind, key, rows, payload = item
+            with self._stage("channel", len(payload)):
+                transmitted = self.channel.channel_transmit_batch(payload)
+            if self.metrics is not None:
+                self.metrics.count_channel(payload, transmitted)
+            self.transmitted_bytes += payload.size
+            self.rx.put((kind, key, rows, transmitted, time.perf_counter() + self.propagation_delay))
+
+    def _receiver(self):
+        while True:
+            item = self._get(self.rx)
+            if item is _STOP:
+                return
+            kind, key, rows, payload, arrival = item
+            if kind != "corrected":
+                self.rx_slots.release()
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)  # Partia jeszcze "w drodze"
+            if kind == "data":
+                self._receive_frames(key, rows, payload)
+            elif kind == "parity":
+                codewords = np.hstack((self.buffered.pop((key, tuple(rows))), payload))
+                future = self.decoder.submit(self._decode_correction, codewords)
+                future.add_done_callback(lambda done, key=key, rows=rows: self._decoded(key, rows, done))
+            else:
+                self._receive_corrected(key, rows, *payload)
+
+    def _decoded(self, key, rows, future):
+        """Wynik dekodera RS wraca do kolejki odbiornika (poza limitem pojemności, aby nie zakleszczyć odbiornika)."""
+        try:
+            self.rx.put(("corrected", key, rows, future.result(), 0.0))
+        except Exception as error:
+            self.errors.append(error)
+            self.failed.set()
+
+    def _decode_correction(self, codewords):
+        with self._stage("rs_decode", len(codewords)):
+            decoded, rs_valid = self.error_correction_code.decode_batch(codewords)
+        with self._stage("edc_decode", len(codewords)):
+            data, checksum_valid = self.error_detection_code.decode_batch(decoded)
+        return data, rs_valid & checksum_valid, rs_valid
+
+    def _receive_frames(self, key, rows, frames):
+        indices = self._indices(key, rows)
+        self.attempts[indices] += 1
+        with self._stage("edc_decode", len(frames)):
+            data, valid = self.error_detection_code.decode_batch(frames)
+        self._accept(key, rows[valid], data[valid], corrected=False)
+        if not valid.all():
+            self.buffered[key, tuple(rows[~valid])] = frames[~valid]
+            self.feedback.put(("parity", key, rows[~valid]))
+
+    def _receive_corrected(self, key, rows, data, valid, rs_valid):
+        self._accept(key, rows[valid], data[valid], corrected=True)
+        failed = rows[~valid]
+        if self.frame_trace is not None:
+            for index, rs_ok in zip(self._indices(key, failed), rs_valid[~valid]):
+                self.frame_trace.record(self.first_packet_num + int(index), int(self.attempts[index]),
+                                        "edc_failed" if rs_ok else "rs_failed")
+        retry = failed[self.attempts[self._indices(key, failed)] < self.max_retries]
+        lost = failed[self.attempts[self._indices(key, failed)] >= self.max_retries]
+        if len(retry):
+            self.feedback.put(("data", key, retry))
+        if len(lost):
+            if self.frame_trace is not None:
+                for index in self._indices(key, lost):
+                    self.frame_trace.record(self.first_packet_num + int(index), int(self.attempts[index]), "lost")
+            if self.metrics is not None:
+                self.metrics.count("frames_lost", len(lost))
+            self.feedback.put(("done", key, lost))
+
+    def _accept(self, key, rows, data, corrected):
+        if not len(rows):
+            return
+        group, first = key
+        indices = self._indices(key, rows)
+        self.corrected[indices] = corrected
+        for index, row_data in zip(indices, data):
+            self.received[index] = row_data.tobytes()
+        if self.frame_trace is not None:
+            for index in indices:
+                self.frame_trace.record(self.first_packet_num + int(index), int(self.attempts[index]),
+                                        "corrected" if corrected else "ok")
+        if self.metrics is not None:
+            original = self.packets[group][first + rows]
+            self.metrics.count("frames_delivered", len(rows))
+            self.metrics.count("undetected_errors", np.count_nonzero((data != original).any(axis=1)))
+            if corrected:
+                self.metrics.count("rs_corrections", len(rows))
+        self.feedback.put(("done", key, rows))
+
+    def _indices(self, key, rows):
+        """Numery pakietów (od zera) dla wierszy partii."""
+        group, first = key
+        return (len(self.packets[0]) if group else 0) + first + rows
+
+    def _collect(self, elapsed):
+        retransmission_counts = [0] * (self.max_retries + 2)
+        errors_detected = 0
+        received_data = bytearray()
+        for index, payload in enumerate(self.received):
+            if payload is None:
+                errors_detected += 1
+                length = self.packets[-1].shape[1] if index == self.count - 1 else self.packet_size
+                payload = self.rng.bytes(length)  # Szum zamiast utraconego pakietu
+            else:
+                retransmission_counts[int(self.attempts[index]) + int(self.corrected[index])] += 1
+            received_data.extend(payload)
+        logger.debug("Potok etapów: %d pakietów w %.3f s", self.count, elapsed)
+        results = {
+            "packets": self.count,
+            "packet_size": self.packet_size,
+            "errors_detected": errors_detected,
+            "retransmission_counts": retransmission_counts,
+            "transmitted_bytes": self.transmitted_bytes,
+            "elapsed": elapsed,
+            "channel_statistics": None,
+        }
+        return bytes(received_data), results
+
+
+class _Stopped(Exception):
+    """Przerwanie etapu po błędzie w innym etapie."""
@@ -0,0 +1,219 @@
+import argparse
+import contextlib
+import copy
+import csv
+import itertools
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from gilbert_elliott_estimator import estimate_scenario
+from result_cache import add_cache_arguments, content_digest, open_cache, scenario_content
+from run_simulation import DEFAULT_SCENARIO, configure_logging, load_scenario, run_scenario
+from seeding import child_seed
+
+logger = logging.getLogger(__name__)
+
+# Kolumny tabeli wyników przeglądu
+RESULT_FIELDS = (
+    "index", "channel", "channel_params", "edc", "ecc", "rs_symbols", "packet_size", "max_retries", "interleaver",
+    "interleaver_depth", "seed",
+    "packets", "errors_detected", "transmissions", "transmissions_per_packet", "throughput", "residual_error_rate",
+    "elapsed", "cached",
+)
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def expand_grid(grid):
+    """Rozwija siatkę parametrów (kanały x kody detekcyjne x kody korekcyjne x liczba bajtów korekcyjnych
+    x głębokość przeplotu) w scenariusze."""
+    base = copy.deepcopy(DEFAULT_SCENARIO)
+    base.update(grid.get("base", {}))
+    base["mode"] = "image"
+    base["output"] = None
+    base["results"] = None
+
+    channels = grid.get("channels") or [grid.get("channel", base["channel"])]
+    scenarios = []
+    for channel in channels:
+        names = [key for key in channel if key != "type"]
+        for values in itertools.product(*(_as_list(channel[name]) for name in names)):
+            channel_params = dict(zip(names, values), type=channel["type"])
+            codes = itertools.product(*(_as_list(grid.get(key, base[key]))
+                                        for key in ("edc", "ecc", "rs_symbols", "interleaver_depth")))
+            for edc, ecc, rs_symbols, depth in codes:
+                scenario = copy.deepcopy(base)
+                scenario.update(channel=channel_params, edc=edc, ecc=ecc, rs_symbols=rs_symbols, interleaver_depth=depth)
+                scenarios.append(scenario)
+    return scenarios
+
+
+def point_seed(root_seed, scenario):
+    """Niezależne ziarno dla punktu siatki - zależy tylko od ziarna głównego i parametrów punktu.
+
+    Ziarno nie zależy od położenia punktu w siatce, więc po dodaniu punktów pozostałe zachowują swoje
+    ziarna (i wyniki zapamiętane w ResultCache). Liczą się tylko parametry różne od DEFAULT_SCENARIO, więc
+    nowy parametr z wartością domyślną nie zmienia ziaren istniejących punktów. Nie zależy też od parametrów
+    przeplotu: punkty różniące się tylko przeplotem widzą ten sam przebieg kanału, co zmniejsza rozrzut
+    porównania głębokości przeplotu.
+    """
+    channel_scenario = {key: value for key, value in scenario.items() if not key.startswith("interleaver")}
+    return child_seed(root_seed, int(content_digest(scenario_content(channel_scenario, DEFAULT_SCENARIO)), 16))
+
+
+def summarize(scenario, results):
+    """Sprowadza wyniki symulacji do jednego wiersza tabeli."""
+    counts = results["retransmission_counts"]
+    transmissions = sum(attempt * count for attempt, count in enumerate(counts))
+    transmissions += results["errors_detected"] * scenario["max_retries"]
+    delivered = results["packets"] - results["errors_detected"]
+    channel_params = {key: value for key, value in scenario["channel"].items() if key not in ("type", "seed")}
+    return {
+        "channel": scenario["channel"]["type"],
+        "channel_params": json.dumps(channel_params, sort_keys=True),
+        "edc": scenario["edc"],
+        "ecc": scenario["ecc"],
+        "rs_symbols": scenario["rs_symbols"],
+        "packet_size": scenario["packet_size"],
+        "max_retries": scenario["max_retries"],
+        "interleaver": scenario["interleaver"],
+        "interleaver_depth": scenario["interleaver_depth"],
+        "seed": scenario["channel"].get("seed"),
+        "packets": results["packets"],
+        "errors_detected": results["errors_detected"],
+        "transmissions": transmissions,
+        "transmissions_per_packet": transmissions / results["packets"] if results["packets"] else 0.0,
+        "throughput": delivered / transmissions if transmissions else 0.0,
+        "residual_error_rate": results["errors_detected"] / results["packets"] if results["packets"] else 0.0,
+    }
+
+
+def run_point(index, scenario):
+    """Zadanie wykonywane w osobnym procesie: jeden punkt siatki; zwraca wiersz tabeli i pełne wyniki."""
+    start = time.perf_counter()
+    results = run_scenario(scenario)
+    row = summarize(scenario, results)
+    row.update(index=index, elapsed=time.perf_counter() - start, cached=False)
+    return row, results
+
+
+def estimate_point(index, scenario):
+    """Punkt siatki wyznaczony analitycznie (łańcuch Markowa stanów kanału) zamiast symulacji.
+
+    Estymacja nie zna liczby pakietów, więc kolumny zliczeń (packets, errors_detected, transmissions) pozostają
+    puste, a oczekiwana liczba transmisji trafia do transmissions_per_packet.
+    """
+    start = time.perf_counter()
+    estimate = estimate_scenario(scenario)
+    channel_params = {key: value for key, value in scenario["channel"].items() if key not in ("type", "seed")}
+    return {
+        "index": index,
+        "channel": scenario["channel"]["type"],
+        "channel_params": json.dumps(channel_params, sort_keys=True),
+        "edc": scenario["edc"],
+        "ecc": scenario["ecc"],
+        "rs_symbols": scenario["rs_symbols"],
+        "packet_size": scenario["packet_size"],
+        "max_retries": scenario["max_retries"],
+        "interleaver": scenario["interleaver"],
+        "interleaver_depth": scenario["interleaver_depth"],
+        "seed": None,
+        "packets": None,
+        "errors_detected": None,
+        "transmissions": None,
+        "transmissions_per_packet": estimate["expected_transmissions"],
+        "throughput": estimate["throughput"],
+        "residual_error_rate": estimate["residual_error_rate"],
+        "elapsed": time.perf_counter() - start,
+        "cached": False,
+    }
+
+
+def run_sweep(grid, workers=None, results_path=None, cache=None):
+    """Uruchamia wszystkie punkty siatki; wiersze są zapisywane do CSV w miarę ukończenia.
+
+    Przy method = "analytic" punkty są wyznaczane analitycznie w bieżącym procesie, w przeciwnym razie
+    symulowane równolegle w procesach roboczych. Jeśli podano cache (ResultCache), symulowane są tylko
+    punkty, których wyników nie ma w pamięci wyników; nowe wyniki są do niej dopisywane.
+    """
+    method = grid.get("method", "simulation")
+    if method not in ("simulation", "analytic"):
+        raise ValueError(f"Nieznana metoda przeglądu: {method}")
+    root_seed = grid.get("root_seed", 0)
+    scenarios = expand_grid(grid)
+    for scenario in scenarios:
+        if scenario["channel"].get("seed") is None:
+            scenario["channel"]["seed"] = point_seed(root_seed, scenario)
+
+    rows = []
+    with contextlib.ExitStack() as stack:
+        writer = None
+        if results_path is not None:
+            file = stack.enter_context(open(results_path, "w", newline="", encoding="utf-8"))
+            writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+        if method == "analytic":
+            completed = (estimate_point(index, scenario) for index, scenario in enumerate(scenarios))
+        else:
+            completed = _simulate_points(stack, scenarios, workers, cache)
+        for row in completed:
+            rows.append(row)
+            logger.info("[%d/%d] punkt %d: przepustowość %.4f, błędy resztkowe %.4f",
+                        len(rows), len(scenarios), row["index"], row["throughput"], row["residual_error_rate"])
+            if writer is not None:
+                writer.writerow(row)
+                file.flush()
+    rows.sort(key=lambda row: row["index"])
+    return rows
+
+
+def _simulate_points(stack, scenarios, workers, cache):
+    """Wiersze punktów siatki: najpierw zapamiętane w cache, potem symulowane w miarę ukończenia."""
+    pending = []
+    for index, scenario in enumerate(scenarios):
+        results = cache.get(scenario) if cache is not None else None
+        if results is None:
+            pending.append(index)
+            continue
+        row = summarize(scenario, results)
+        row.update(index=index, elapsed=0.0, cached=True)
+        yield row
+    if not pending:
+        return
+    executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+    futures = {executor.submit(run_point, index, scenarios[index]): index for index in pending}
+    for future in as_completed(futures):
+        row, results = future.result()
+        if cache is not None:
+            cache.put(scenarios[futures[future]], results)
+        yield row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Równoległy przegląd parametrów kanału i kodów.",
+        epilog="Plik siatki: method (\"simulation\" albo \"analytic\"), root_seed, edc, ecc, rs_symbols i interleaver_depth (wartości lub listy), tabela [base] ze wspólnymi "
+               "parametrami scenariusza oraz [channel] lub [[channels]] z listami wartości parametrów kanału.",
+    )
+    parser.add_argument("grid", help="plik siatki parametrów (.toml lub .json)")
+    parser.add_argument("--workers", type=int, default=None, help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument("--results", default="sweep_results.csv", help="plik wynikowy CSV")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="więcej komunikatów symulacji")
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+    configure_logging(args.verbose)
+    logger.setLevel(logging.INFO)  # Postęp przeglądu jest raportowany zawsze
+    cache = open_cache(args, DEFAULT_SCENARIO)
+    try:
+        run_sweep(load_scenario(args.grid), workers=args.workers, results_path=args.results, cache=cache)
+    finally:
+        if cache is not None:
+            logger.info("Pamięć wyników: %s", cache.stats())
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Moduły symulatora leżą płasko w src/ i importują się nawzajem po nazwie
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from bch_code import BCHCode, HammingCode
+from codec_registry import codec_throughput
+from convolutional_code import ConvolutionalCode
+from error_correction_code import ReedSolomonCode
+from pipeline import Pipeline
+
+FRAME_LENGTH = 68
+# Kod i liczba bajtów korekcyjnych dla ramki FRAME_LENGTH bajtów
+CODES = [(ReedSolomonCode, 10), (HammingCode, 10), (BCHCode, 10), (ConvolutionalCode, 19), (ConvolutionalCode, 80)]
+
+
+def _frames(count, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, size=(count, FRAME_LENGTH), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("code_class, symbols", CODES)
+def test_round_trip(code_class, symbols):
+    code = code_class(symbols)
+    frames = _frames(64)
+    parity = code.encode_batch(frames)
+    assert parity.shape == (len(frames), symbols)
+    decoded, valid = code.decode_batch(np.hstack((frames, parity)))
+    assert valid.all()
+    np.testing.assert_array_equal(decoded, frames)
+
+    # Pojedyncza ramka przez encode/decode daje to samo co wsad
+    assert code.encode(frames[0].tobytes()) == parity[0].tobytes()
+    assert code.decode(frames[0].tobytes() + parity[0].tobytes()) == frames[0].tobytes()
+
+
+@pytest.mark.parametrize("code_class, symbols", CODES)
+def test_every_single_bit_error_is_corrected(code_class, symbols):
+    """Przekłamanie dowolnego jednego bitu słowa kodowego (danych albo części korekcyjnej) jest poprawiane."""
+    code = code_class(symbols)
+    frame = _frames(1, seed=1)
+    codeword = np.hstack((frame, code.encode_batch(frame)))[0]
+    positions = np.arange(codeword.size * 8)
+    codewords = np.tile(codeword, (len(positions), 1))
+    codewords[positions, positions // 8] ^= (0x80 >> (positions % 8)).astype(np.uint8)
+    decoded, valid = code.decode_batch(codewords)
+    assert valid.all()
+    np.testing.assert_array_equal(decoded, np.tile(frame, (len(positions), 1)))
+
+
+def test_convolutional_rejects_weak_puncturing():
+    """Zbyt mało bajtów korekcyjnych dałoby kod o odległości swobodnej poniżej 3 - kodowanie zgłasza błąd."""
+    with pytest.raises(ValueError, match="co najmniej 19"):
+        ConvolutionalCode(10).encode_batch(_frames(1))
+
+
+
+def test_configure_rejects_unsupported_frame_length():
+    """Niewykonalne połączenie kodu i liczby bajtów korekcyjnych jest zgłaszane przed transmisją."""
+    pipeline = Pipeline(None, None)
+    with pytest.raises(ValueError, match="co najmniej 19"):
+        pipeline.configure(error_correction_code="Convolutional", rs_symbols=10, packet_size=64)
+    pipeline.configure(error_correction_code="Convolutional", rs_symbols=19, packet_size=64)
+
+
+def test_codec_throughput_reports_skipped_codes():
+    report = codec_throughput(FRAME_LENGTH, 10, frames=16)
+    assert report["Convolutional"]["minimum_symbols"] == 19
+    assert "code_rate" in report["BCH"]
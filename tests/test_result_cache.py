@@ -0,0 +1,42 @@
+import copy
+from pathlib import Path
+import pytest
+import sweep
+from result_cache import ResultCache, scenario_key
+from run_simulation import DEFAULT_SCENARIO
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+@pytest.fixture(autouse=True)
+def in_src(monkeypatch):
+    monkeypatch.chdir(SRC)  # Domyślna ścieżka obrazu wejściowego jest względna wobec src/
+
+
+def test_new_default_keeps_keys_and_seeds(monkeypatch):
+    """Nowy parametr z wartością domyślną nie zmienia kluczy pamięci wyników ani ziaren punktów siatki."""
+    grid = {"channel": {"type": "BSC", "ber": 0.01}, "root_seed": 0}
+    scenario = sweep.expand_grid(grid)[0]
+    seed = sweep.point_seed(0, scenario)
+    key = scenario_key(dict(scenario, channel=dict(scenario["channel"], seed=seed)), DEFAULT_SCENARIO)
+
+    monkeypatch.setitem(DEFAULT_SCENARIO, "new_option", "off")
+    extended = sweep.expand_grid(grid)[0]
+    assert extended["new_option"] == "off"
+    assert sweep.point_seed(0, extended) == seed
+    assert scenario_key(dict(extended, channel=dict(extended["channel"], seed=seed)), DEFAULT_SCENARIO) == key
+
+
+def test_non_default_value_changes_key():
+    scenario = copy.deepcopy(DEFAULT_SCENARIO)
+    scenario["channel"] = {"type": "BSC", "ber": 0.01, "seed": 1}
+    assert scenario_key(scenario, DEFAULT_SCENARIO) != scenario_key(dict(scenario, rs_symbols=12), DEFAULT_SCENARIO)
+
+
+def test_cache_round_trip(tmp_path):
+    scenario = copy.deepcopy(DEFAULT_SCENARIO)
+    scenario["channel"] = {"type": "BSC", "ber": 0.01, "seed": 1}
+    with ResultCache(tmp_path / "cache.sqlite", defaults=DEFAULT_SCENARIO) as cache:
+        assert cache.get(scenario) is None
+        cache.put(scenario, {"packets": 3})
+        assert cache.get(dict(scenario, output="elsewhere.png")) == {"packets": 3}
@@ -0,0 +1,32 @@
+import pytest
+from channel import Channel
+from error_detection_code import CRC32
+from sliding_window_arq import ARQ_POLICIES, SlidingWindowARQ
+
+DATA = bytes(range(256)) * 2
+
+
+@pytest.mark.parametrize("policy", ARQ_POLICIES)
+def test_lossy_feedback_terminates(policy):
+    """Przy ginących potwierdzeniach nadawca porzuca ramki po max_retries nadaniach zamiast nadawać bez końca."""
+    arq = SlidingWindowARQ(Channel("BSC", ber=0.0, seed=1), CRC32(), policy=policy, window_size=2, rtt=0,
+                           ack_loss=0.99, max_retries=2, seed=1)
+    received, results = arq.transmit_data(DATA, packet_size=128)
+    assert received == DATA  # Kanał bez błędów - odbiorca ma wszystkie ramki mimo braku potwierdzeń
+    assert results["errors_detected"] == 0
+    assert results["transmissions"] <= results["packets"] * arq.window_size * arq.max_retries
+
+
+@pytest.mark.parametrize("policy", ARQ_POLICIES)
+def test_lossy_channel_and_feedback_terminates(policy):
+    arq = SlidingWindowARQ(Channel("BSC", ber=0.01, seed=2), CRC32(), policy=policy, window_size=4, rtt=2,
+                           ack_loss=0.5, max_retries=3, seed=2)
+    received, results = arq.transmit_data(DATA, packet_size=64)
+    assert len(received) == len(DATA)
+    assert results["transmissions"] <= results["packets"] * arq.window_size * arq.max_retries
+
+
+@pytest.mark.parametrize("ack_loss", [-0.1, 1.0])
+def test_ack_loss_out_of_range(ack_loss):
+    with pytest.raises(ValueError):
+        SlidingWindowARQ(Channel("BSC", ber=0.0), CRC32(), ack_loss=ack_loss)